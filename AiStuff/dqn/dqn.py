@@ -2,7 +2,6 @@
 #Original https://github.com/sherjilozair/dqn
 
 
-import random
 import numpy
 from keras.models import Model
 from keras.layers import Convolution2D, Dense, Flatten, Input, merge
@@ -10,22 +9,29 @@ from keras.optimizers import RMSprop
 from keras import backend as K
 from theano import printing
 from theano.gradient import disconnected_grad
+from replay_buffer import ReplayBuffer, transition_dtype
+
+# the in-memory replay buffer is sized to this when memory isn't given
+MEMORY_BYTES = 1 << 30
 
 class Agent:
     def __init__(self, state_size=None, number_of_actions=1,
-                 epsilon=0.1, mbsz=32, discount=0.9, memory=50,
-                 save_name='basic', save_freq=10):
+                 epsilon=0.1, mbsz=32, discount=0.9, memory=None,
+                 save_name='basic', save_freq=10, memory_file=None):
         self.state_size = state_size
         self.number_of_actions = number_of_actions
         self.epsilon = epsilon
         self.mbsz = mbsz
         self.discount = discount
+        if memory is None:
+            memory = max(mbsz, MEMORY_BYTES // transition_dtype(state_size).itemsize)
         self.memory = memory
         self.save_name = save_name
-        self.states = []
-        self.actions = []
-        self.rewards = []
-        self.experience = []
+        # memory is the number of transitions kept, memory_file keeps them on disk between runs
+        self.replay = ReplayBuffer(memory, state_size, file_name=memory_file)
+        self.last_state = None
+        self.last_action = None
+        self.last_index = None
         self.i = 1
         self.save_freq = save_freq
         self.build_functions()
@@ -69,50 +75,36 @@ class Agent:
 
 
     def new_episode(self):
-        self.states.append([])
-        self.actions.append([])
-        self.rewards.append([])
-        self.states = self.states[-self.memory:]
-        self.actions = self.actions[-self.memory:]
-        self.rewards = self.rewards[-self.memory:]
+        self.last_state = None
+        self.last_index = None
         self.i += 1
         if self.i % self.save_freq == 0:
             self.model.save_weights('{}.h5'.format(self.save_name), True)
+            self.replay.flush()
 
     def end_episode(self):
         pass
 
     def act(self, state):
-        self.states[-1].append(state)
+        if self.last_index is not None:
+            self.replay.set_next_state(self.last_index, state)
+        self.last_state = state
         slice = [state[None:]]
         values = self.value_fn(slice)
         if numpy.random.random() < self.epsilon:
             action = numpy.random.randint(self.number_of_actions)
         else:
             action = values.argmax()
-        self.actions[-1].append(action)
+        self.last_action = action
         return action, values
 
     def observe(self, reward):
-        self.rewards[-1].append(reward)
+        # the transition stays terminal until act sees the state that follows it
+        self.last_index = self.replay.add(self.last_state, self.last_action, reward, 0, 1)
         return self.iterate()
 
     def iterate(self):
-        N = len(self.states)
-        S = numpy.zeros((self.mbsz,) + self.state_size)
-        NS = numpy.zeros((self.mbsz,) + self.state_size)
-        A = numpy.zeros((self.mbsz, 1), dtype=numpy.int32)
-        R = numpy.zeros((self.mbsz, 1), dtype=numpy.float32)
-        T = numpy.zeros((self.mbsz, 1), dtype=numpy.int32)
-        for i in range(self.mbsz):
-            episode = random.randint(max(0, N-50), N-1)
-            num_frames = len(self.states[episode])
-            frame = random.randint(0, num_frames-1)
-            S[i] = self.states[episode][frame]
-            T[i] = 1 if frame == num_frames - 1 else 0
-            if frame < num_frames - 1:
-                NS[i] = self.states[episode][frame+1]
-            A[i] = self.actions[episode][frame]
-            R[i] = self.rewards[episode][frame]
+        # the newest transition has no next state yet, so it isn't trained on
+        S, NS, A, R, T, _ = self.replay.sample(self.mbsz, exclude=self.last_index)
         cost = self.train_fn([S, NS, A, R, T])
         return cost
@@ -0,0 +1,174 @@
+"""
+Offline training environment built from frame recordings. A recording is
+decoded once into numpy arrays of observations, the actions the player took
+and the rewards they got, then VectorReplayEnv steps any number of
+environments through those histories in lockstep without the game running.
+"""
+
+from collections import namedtuple
+
+import numpy
+
+from constants.input import InputAttack, InputDirection
+
+FrameHistory = namedtuple('FrameHistory', ['observations', 'actions', 'rewards', 'terminals'])
+
+DIRECTIONS = list(InputDirection)
+BUTTONS = list(InputAttack)
+NUMBER_OF_ACTIONS = len(DIRECTIONS) * len(BUTTONS)
+
+PLAYER_FEATURES = (
+    lambda bot: bot.move_timer,
+    lambda bot: bot.recovery,
+    lambda bot: bot.startup,
+    lambda bot: bot.startup_end,
+    lambda bot: bot.attack_damage,
+    lambda bot: bot.damage_taken,
+    lambda bot: bot.combo_counter,
+    lambda bot: bot.attack_type.value,
+    lambda bot: bot.simple_state.value,
+    lambda bot: bot.complex_state.value,
+    lambda bot: bot.stun_state.value,
+    lambda bot: bot.throw_tech.value,
+    lambda bot: bot.hit_outcome.value,
+    lambda bot: DIRECTIONS.index(bot.input_direction),
+    lambda bot: BUTTONS.index(bot.input_button),
+    lambda bot: bot.technical_states,
+    lambda bot: bot.rage_flag,
+    lambda bot: bot.is_jump,
+    lambda bot: bot.is_recovering,
+    lambda bot: bot.is_starting,
+    lambda bot: bot.wins,
+)
+GAME_FEATURES = (
+    lambda snapshot: snapshot.distance,
+    lambda snapshot: snapshot.timer_frames_remaining,
+)
+OBSERVATION_SIZE = 2 * len(PLAYER_FEATURES) + len(GAME_FEATURES)
+
+
+def encode_action(input_direction, input_button):
+    return DIRECTIONS.index(input_direction) * len(BUTTONS) + BUTTONS.index(input_button)
+
+
+def decode_action(action):
+    return DIRECTIONS[action // len(BUTTONS)], BUTTONS[action % len(BUTTONS)]
+
+
+def observe(snapshot, observation=None):
+    """
+    Writes the features of the bot, the opponent and the game into a float32
+    vector of OBSERVATION_SIZE.
+    """
+    if observation is None:
+        observation = numpy.empty(OBSERVATION_SIZE, dtype=numpy.float32)
+    i = 0
+    for player in (snapshot.bot, snapshot.opp):
+        for feature in PLAYER_FEATURES:
+            observation[i] = feature(player)
+            i += 1
+    for feature in GAME_FEATURES:
+        observation[i] = feature(snapshot)
+        i += 1
+    return observation
+
+
+def history_from_snapshots(snapshots):
+    """
+    One transition per snapshot: the observation, the input the bot held on
+    that frame and the damage it dealt minus the damage it took until the
+    next frame. An episode ends on the last frame of a round, when the frame
+    count goes back or the damage taken by either player is reset.
+    """
+    snapshots = list(snapshots)
+    count = len(snapshots)
+    observations = numpy.empty((count, OBSERVATION_SIZE), dtype=numpy.float32)
+    actions = numpy.empty(count, dtype=numpy.int32)
+    rewards = numpy.zeros(count, dtype=numpy.float32)
+    terminals = numpy.zeros(count, dtype=numpy.int32)
+    for i, snapshot in enumerate(snapshots):
+        observe(snapshot, observations[i])
+        actions[i] = encode_action(snapshot.bot.input_direction, snapshot.bot.input_button)
+        if i + 1 == count:
+            terminals[i] = 1
+            continue
+        following = snapshots[i + 1]
+        dealt = following.opp.damage_taken - snapshot.opp.damage_taken
+        taken = following.bot.damage_taken - snapshot.bot.damage_taken
+        if following.frame_count <= snapshot.frame_count or dealt < 0 or taken < 0:
+            terminals[i] = 1
+        else:
+            rewards[i] = dealt - taken
+    return FrameHistory(observations, actions, rewards, terminals)
+
+
+def load_frame_history(file_path, is_player_one=True, memory_config=None, movelist_cache=None):
+    """
+    Decodes a FrameRecorder recording the way ReplayDriver does, from the
+    point of view of player one or player two.
+    """
+    from tekken.recording import FrameRecording
+    from tekken.replay_driver import ReplayIOManager
+
+    io_manager = ReplayIOManager(memory_config, movelist_cache)
+    io_manager.set_records(iter(FrameRecording(file_path)))
+
+    def snapshots():
+        while io_manager.has_records():
+            snapshot = io_manager.update()['battle']
+            if snapshot is not None:
+                yield snapshot if is_player_one else snapshot.from_mirrored()
+
+    return history_from_snapshots(snapshots())
+
+
+def concatenate_histories(histories):
+    return FrameHistory(*(numpy.concatenate(arrays) for arrays in zip(*histories)))
+
+
+class VectorReplayEnv:
+    """
+    Steps number_of_envs environments through the recorded episodes together.
+    Every environment starts at the first frame of a random episode and starts
+    over on another one after its terminal frame, so a step always returns a
+    full batch. The action taken does not change what was recorded, the
+    recorded action is returned with every step for offline training.
+    """
+
+    def __init__(self, history, number_of_envs=8, seed=None):
+        if isinstance(history, (list, tuple)) and not isinstance(history, FrameHistory):
+            history = concatenate_histories(history)
+        self.history = history
+        self.number_of_envs = number_of_envs
+        self.number_of_actions = NUMBER_OF_ACTIONS
+        self.observation_shape = history.observations.shape[1:]
+        self.episode_starts = numpy.concatenate(([0], numpy.flatnonzero(history.terminals[:-1]) + 1))
+        self.random = numpy.random.RandomState(seed)
+        self.positions = numpy.zeros(number_of_envs, dtype=numpy.int64)
+        self.steps = 0
+
+    def reset(self):
+        self.positions = self.__random_starts(self.number_of_envs)
+        return self.history.observations[self.positions]
+
+    def step(self, actions=None):
+        """
+        Returns the next observations, the rewards, the terminal flags and the
+        recorded actions of the frames just left, one row per environment.
+        """
+        history = self.history
+        positions = self.positions
+        rewards = history.rewards[positions]
+        terminals = history.terminals[positions]
+        recorded_actions = history.actions[positions]
+
+        positions = positions + 1
+        done = numpy.flatnonzero(terminals)
+        if len(done):
+            positions[done] = self.__random_starts(len(done))
+        self.positions = positions
+        self.steps += 1
+        return history.observations[positions], rewards, terminals, recorded_actions
+
+    def __random_starts(self, count):
+        return self.episode_starts[self.random.randint(0, len(self.episode_starts), size=count)]
@@ -0,0 +1,219 @@
+"""
+Fixed-capacity experience replay kept in one preallocated numpy structured
+array. Inserting overwrites the oldest transition once the buffer is full and
+minibatches are gathered with a single fancy index.
+
+Given a file name the array is a memory-mapped .npy file instead, so a buffer
+can be larger than RAM and is picked up again by the next run.
+"""
+
+import json
+import os
+
+import numpy
+
+
+def transition_dtype(state_shape, state_dtype=numpy.float32):
+    return numpy.dtype([
+        ('state', state_dtype, state_shape),
+        ('next_state', state_dtype, state_shape),
+        ('action', numpy.int32),
+        ('reward', numpy.float32),
+        ('terminal', numpy.int32),
+    ])
+
+
+class ReplayBuffer:
+    def __init__(self, capacity, state_shape, state_dtype=numpy.float32, seed=None, file_name=None):
+        self.capacity = capacity
+        self.state_shape = tuple(state_shape)
+        self.file_name = file_name
+        self.position = 0
+        self.size = 0
+        self.random = numpy.random.RandomState(seed)
+        dtype = transition_dtype(self.state_shape, state_dtype)
+        if file_name is None:
+            self.data = numpy.zeros(capacity, dtype=dtype)
+        else:
+            self.data = self.__open_file(file_name, dtype)
+
+    def __open_file(self, file_name, dtype):
+        """
+        Reopens the buffer a previous run left in file_name when its layout
+        matches, otherwise starts a new one there.
+        """
+        if os.path.exists(file_name):
+            data = numpy.lib.format.open_memmap(file_name, mode='r+')
+            if data.dtype == dtype and data.shape == (self.capacity,):
+                try:
+                    with open(file_name + '.json') as meta_file:
+                        meta = json.load(meta_file)
+                    self.position = meta['position']
+                    self.size = meta['size']
+                except (OSError, ValueError, KeyError):
+                    print("replay buffer {} has no valid metadata, starting empty".format(file_name))
+                return data
+            del data
+        return numpy.lib.format.open_memmap(file_name, mode='w+', dtype=dtype, shape=(self.capacity,))
+
+    def flush(self):
+        """
+        Writes a memory-mapped buffer and its position to disk.
+        """
+        if self.file_name is None:
+            return
+        self.data.flush()
+        with open(self.file_name + '.json', 'w') as meta_file:
+            json.dump({'position': self.position, 'size': self.size}, meta_file)
+
+    def __len__(self):
+        return self.size
+
+    def add(self, state, action, reward, next_state, terminal):
+        index = self.position
+        entry = self.data[index]
+        entry['state'] = state
+        entry['next_state'] = next_state
+        entry['action'] = action
+        entry['reward'] = reward
+        entry['terminal'] = terminal
+        self.position = (index + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        return index
+
+    def set_next_state(self, index, next_state):
+        """
+        Completes a transition added as terminal before its next state was known.
+        """
+        entry = self.data[index]
+        entry['next_state'] = next_state
+        entry['terminal'] = 0
+
+    def add_batch(self, states, actions, rewards, next_states, terminals):
+        """
+        Inserts one transition per environment of a lockstep step and returns
+        the indices they were written to.
+        """
+        count = len(actions)
+        indices = (self.position + numpy.arange(count)) % self.capacity
+        self.data['state'][indices] = states
+        self.data['next_state'][indices] = next_states
+        self.data['action'][indices] = actions
+        self.data['reward'][indices] = rewards
+        self.data['terminal'][indices] = terminals
+        self.position = (self.position + count) % self.capacity
+        self.size = min(self.size + count, self.capacity)
+        return indices
+
+    def sample(self, batch_size, exclude=None):
+        """
+        Uniform minibatch, returned as S, NS, A, R, T in the shapes
+        Agent.train_fn takes, followed by the sampled indices. The exclude
+        index is left out while anything else is stored.
+        """
+        if exclude is None or self.size < 2:
+            return self.gather(self.random.randint(0, self.size, size=batch_size))
+        indices = self.random.randint(0, self.size - 1, size=batch_size)
+        indices += indices >= exclude
+        return self.gather(indices)
+
+    def gather(self, indices):
+        batch = self.data[indices]
+        return (
+            batch['state'], batch['next_state'],
+            batch['action'][:, None], batch['reward'][:, None], batch['terminal'][:, None],
+            indices
+        )
+
+
+class SumTree:
+    """
+    Binary tree of priority sums over a power of two number of leaves, stored
+    in one array with the root at 1. Updates and lookups of a whole batch walk
+    the levels together.
+    """
+
+    def __init__(self, capacity):
+        self.leaves = 1
+        while self.leaves < capacity:
+            self.leaves *= 2
+        self.nodes = numpy.zeros(2 * self.leaves, dtype=numpy.float64)
+
+    def total(self):
+        return self.nodes[1]
+
+    def get(self, indices):
+        return self.nodes[self.leaves + indices]
+
+    def set(self, indices, values):
+        nodes = self.nodes
+        parents = self.leaves + numpy.asarray(indices)
+        nodes[parents] = values
+        parents = numpy.unique(parents // 2)
+        while parents[0] >= 1:
+            nodes[parents] = nodes[2 * parents] + nodes[2 * parents + 1]
+            parents = numpy.unique(parents // 2)
+
+    def find(self, values):
+        """
+        Leaf index of every value in [0, total), each leaf covering a span as
+        wide as its priority.
+        """
+        nodes = self.nodes
+        positions = numpy.ones(len(values), dtype=numpy.int64)
+        values = numpy.array(values, dtype=numpy.float64)
+        while positions[0] < self.leaves:
+            left = 2 * positions
+            go_right = values >= nodes[left]
+            values -= numpy.where(go_right, nodes[left], 0)
+            positions = left + go_right
+        return positions - self.leaves
+
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    """
+    Proportional prioritized replay: a transition is sampled with probability
+    priority ** alpha over the sum, new transitions get the highest priority
+    seen so far and update_priorities takes the new TD errors of a minibatch.
+    """
+
+    def __init__(self, capacity, state_shape, state_dtype=numpy.float32, seed=None, file_name=None,
+                 alpha=0.6, beta=0.4, epsilon=1e-6):
+        ReplayBuffer.__init__(self, capacity, state_shape, state_dtype, seed, file_name)
+        self.alpha = alpha
+        self.beta = beta
+        self.epsilon = epsilon
+        self.max_priority = 1.0
+        self.tree = SumTree(capacity)
+        if self.size:
+            # priorities are not persisted, a reopened buffer starts them even
+            self.tree.set(numpy.arange(self.size), self.max_priority ** self.alpha)
+
+    def add(self, state, action, reward, next_state, terminal):
+        index = ReplayBuffer.add(self, state, action, reward, next_state, terminal)
+        self.tree.set([index], self.max_priority ** self.alpha)
+        return index
+
+    def add_batch(self, states, actions, rewards, next_states, terminals):
+        indices = ReplayBuffer.add_batch(self, states, actions, rewards, next_states, terminals)
+        self.tree.set(indices, self.max_priority ** self.alpha)
+        return indices
+
+    def sample(self, batch_size):
+        """
+        Stratified over batch_size equal spans of the priority sum. Returns the
+        uniform sample's tuple with the importance sampling weights appended.
+        """
+        total = self.tree.total()
+        span = total / batch_size
+        values = (numpy.arange(batch_size) + self.random.random_sample(batch_size)) * span
+        indices = numpy.minimum(self.tree.find(numpy.minimum(values, total * (1 - 1e-12))), self.size - 1)
+        probabilities = self.tree.get(indices) / total
+        weights = (self.size * probabilities) ** -self.beta
+        weights = (weights / weights.max()).astype(numpy.float32)
+        return self.gather(indices) + (weights[:, None],)
+
+    def update_priorities(self, indices, errors):
+        priorities = numpy.abs(numpy.ravel(errors)) + self.epsilon
+        self.max_priority = max(self.max_priority, priorities.max())
+        self.tree.set(indices, priorities ** self.alpha)
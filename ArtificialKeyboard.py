@@ -2,11 +2,20 @@
 Uses DirectInput scan codes to send 'real' keyboard commands to the currently focused window. Has the same input delay
 as the user pressing a button or key, 4 frames maybe.
 
+Key transitions can be queued on a BatchedKeyboard and flushed once per frame so every press and release of that frame
+reaches the game through a single SendInput call. The sink that receives the batch is pluggable: RecordingSink keeps
+the transitions in memory instead, for tests and benchmarks on machines without user32.
+
 """
 
 import ctypes
 
-SendInput = ctypes.windll.user32.SendInput
+SendInput = ctypes.windll.user32.SendInput if hasattr(ctypes, 'windll') else None
+
+INPUT_KEYBOARD = 1
+KEYEVENTF_KEYUP = 0x0002
+KEYEVENTF_SCANCODE = 0x0008
+
 # C struct redefinitions
 PUL = ctypes.POINTER(ctypes.c_ulong)
 class KeyBdInput(ctypes.Structure):
@@ -42,13 +51,98 @@ class ArtificalKeyboard:
     def PressKey(hexKeyCode):
         extra = ctypes.c_ulong(0)
         ii_ = Input_I()
-        ii_.ki = KeyBdInput( 0, hexKeyCode, 0x0008, 0, ctypes.pointer(extra) )
-        x = Input( ctypes.c_ulong(1), ii_ )
-        ctypes.windll.user32.SendInput(1, ctypes.pointer(x), ctypes.sizeof(x))
+        ii_.ki = KeyBdInput( 0, hexKeyCode, KEYEVENTF_SCANCODE, 0, ctypes.pointer(extra) )
+        x = Input( ctypes.c_ulong(INPUT_KEYBOARD), ii_ )
+        SendInput(1, ctypes.pointer(x), ctypes.sizeof(x))
 
     def ReleaseKey(hexKeyCode):
         extra = ctypes.c_ulong(0)
         ii_ = Input_I()
-        ii_.ki = KeyBdInput( 0, hexKeyCode, 0x0008 | 0x0002, 0, ctypes.pointer(extra) )
-        x = Input( ctypes.c_ulong(1), ii_ )
-        ctypes.windll.user32.SendInput(1, ctypes.pointer(x), ctypes.sizeof(x))
\ No newline at end of file
+        ii_.ki = KeyBdInput( 0, hexKeyCode, KEYEVENTF_SCANCODE | KEYEVENTF_KEYUP, 0, ctypes.pointer(extra) )
+        x = Input( ctypes.c_ulong(INPUT_KEYBOARD), ii_ )
+        SendInput(1, ctypes.pointer(x), ctypes.sizeof(x))
+
+
+class SendInputSink:
+    """
+    Submits a batch of (scan code, is release) transitions with one SendInput call, reusing a preallocated INPUT array.
+    """
+
+    MAX_INPUTS = 32
+
+    def __init__(self, capacity = MAX_INPUTS):
+        if SendInput is None:
+            raise OSError("SendInput is only available on Windows, use a RecordingSink instead")
+        self.capacity = capacity
+        self.extra = ctypes.c_ulong(0)
+        self.inputs = (Input * capacity)()
+        self.inputSize = ctypes.sizeof(Input)
+        for entry in self.inputs:
+            entry.type = INPUT_KEYBOARD
+            entry.ii.ki.dwExtraInfo = ctypes.pointer(self.extra)
+        self.sendCount = 0
+
+    def Send(self, transitions):
+        start = 0
+        while start < len(transitions):
+            batch = transitions[start:start + self.capacity]
+            for i, (hexKeyCode, isRelease) in enumerate(batch):
+                ki = self.inputs[i].ii.ki
+                ki.wScan = hexKeyCode
+                ki.dwFlags = KEYEVENTF_SCANCODE | KEYEVENTF_KEYUP if isRelease else KEYEVENTF_SCANCODE
+            sent = SendInput(len(batch), self.inputs, self.inputSize)
+            if sent != len(batch):
+                print("SendInput was blocked after {} of {} inputs".format(sent, len(batch)))
+            self.sendCount += 1
+            start += self.capacity
+
+
+class RecordingSink:
+    """
+    A virtual keyboard: keeps every submitted batch and the set of keys it leaves pressed.
+    """
+
+    def __init__(self):
+        self.batches = []
+        self.pressedKeys = set()
+        self.sendCount = 0
+
+    def Send(self, transitions):
+        self.batches.append(tuple(transitions))
+        for hexKeyCode, isRelease in transitions:
+            if isRelease:
+                self.pressedKeys.discard(hexKeyCode)
+            else:
+                self.pressedKeys.add(hexKeyCode)
+        self.sendCount += 1
+
+    def IsPressed(self, hexKeyCode):
+        return hexKeyCode in self.pressedKeys
+
+    def Clear(self):
+        self.batches = []
+        self.sendCount = 0
+
+
+class BatchedKeyboard:
+    """
+    Queues key transitions until Flush, which hands them to the sink as one batch.
+    """
+
+    def __init__(self, sink = None):
+        self.sink = sink if sink is not None else SendInputSink()
+        self.pending = []
+
+    def PressKey(self, hexKeyCode):
+        self.pending.append((hexKeyCode, False))
+
+    def ReleaseKey(self, hexKeyCode):
+        self.pending.append((hexKeyCode, True))
+
+    def HasPending(self):
+        return len(self.pending) > 0
+
+    def Flush(self):
+        if self.pending:
+            self.sink.Send(self.pending)
+            self.pending = []
@@ -9,10 +9,10 @@ performing it. UniversalCommands contains a few general sequences. They are also
 or read from a file.
 """
 
+from collections import deque, namedtuple
 import random
 from ButtonCommandEnum import Command
 from tekken_game_state import TekkenGameState
-from MoveInfoEnums import InputAttackCodes, InputDirectionCodes
 
 class UniversalCommands:
     BACKDASH = list(zip(
@@ -80,7 +80,17 @@ class UniversalCommands:
         [4, 4]
     ))
 
+CommandTiming = namedtuple('CommandTiming', ['command', 'target_frame', 'fired_frame'])
+
 class BotCommands:
+    """
+    Commands are scheduled against the game's frame count rather than counted in updates. The delay of a command counts
+    from the frame the previous command was due, so an update that polls the same frame twice or skips frames doesn't
+    shift the rest of the buffer.
+    """
+    TIMING_LOG_SIZE = 600
+    MAX_INPUT_DELAY = 8
+
     def __init__(self, inputController, is_playback_mode = False):
         self.updateFrame = 0
         self.is_playback_mode = is_playback_mode
@@ -88,12 +98,11 @@ class BotCommands:
         self.inputController = inputController
         self.commandBuffer = []
         self.commandIndex = 0
-        self.inputDelay = 0
-        self.inputDelayCode = None
+        self.baseFrame = None
+        self.lastFrame = None
+        self.timingLog = deque(maxlen=BotCommands.TIMING_LOG_SIZE)
 
     def Update(self, gameState: TekkenGameState):
-        #self.UpdateInputDelay(gameState)
-
         if self.updateFrame > 120 and not self.is_playback_mode:
             self.ClearCommands()
 
@@ -105,18 +114,49 @@ class BotCommands:
 
 
     def UpdateCommandBuffer(self, gameState: TekkenGameState):
-        if not self.IsAvailable():
-            if self.updateFrame == self.commandBuffer[self.commandIndex][1]:
-                command = self.commandBuffer[self.commandIndex][0]
-                self.commandIndex += 1
-                self.ProcessCommand(command, gameState)
-                self.updateFrame = 0
-                self.UpdateCommandBuffer(gameState)
+        frame = gameState.stateLog[-1].frame_count
+        if frame == self.lastFrame:
+            return
+        if self.baseFrame is None or self.lastFrame is None or frame < self.lastFrame:
+            self.baseFrame = frame
+        self.lastFrame = frame
+
+        requeued = set()
+        while not self.IsAvailable():
+            command, delay = self.commandBuffer[self.commandIndex]
+            targetFrame = self.baseFrame + delay
+            if frame < targetFrame:
+                break
+            index = self.commandIndex
+            self.commandIndex += 1
+            self.ProcessCommand(command, gameState)
+            if self.commandIndex <= index:
+                # the command waits on the game state, it is due again counting from now
+                self.baseFrame = frame
+                if index in requeued:
+                    break
+                requeued.add(index)
             else:
-                self.updateFrame += 1
+                self.baseFrame = targetFrame
+                self.timingLog.append(CommandTiming(command, targetFrame, frame))
+
+        self.updateFrame = 0 if self.IsAvailable() else frame - self.baseFrame
 
         #print(self.updateFrame)
 
+    def GetTimingReport(self):
+        """
+        Frames each recent command fired after it was due, and their mean and worst.
+        """
+        errors = [timing.fired_frame - timing.target_frame for timing in self.timingLog]
+        return {
+            'commands': len(errors),
+            'late': sum(1 for error in errors if error > 0),
+            'mean_error': sum(errors) / len(errors) if errors else 0,
+            'max_error': max(errors, default=0),
+            'timings': list(self.timingLog),
+        }
+
 
 
     def IsAvailable(self):
@@ -183,10 +223,9 @@ class BotCommands:
             self.commandBuffer = list(buffer)
             self.updateFrame = 0
             self.commandIndex = 0
+            self.baseFrame = None
 
     def ProcessCommand(self, command, gameState:TekkenGameState):
-        self.CheckForInputDelay(command)
-
         if command == Command.TapForward:
             self.inputController.TapForward()
         if command == Command.TapBack:
@@ -294,8 +333,7 @@ class BotCommands:
 
         if command == Command.Recovery:
             self.commandIndex -= 1
-            inputDelay = 0
-            self.commandBuffer[self.commandIndex] = (Command.Wait, max(0, gameState.GetBotFramesUntilRecoveryEnds() - 6 - inputDelay))
+            self.commandBuffer[self.commandIndex] = (Command.Wait, max(0, gameState.GetBotFramesUntilRecoveryEnds() - 6 - self.GetInputDelay()))
 
         if command == Command.FullRecovery:
 
@@ -305,28 +343,19 @@ class BotCommands:
                 self.commandIndex -= 1
                 self.commandBuffer[self.commandIndex] = (Command.FullRecovery, 1)
 
-    def CheckForInputDelay(self, command):
-        if self.inputDelayCode == None:
-            self.inputDelay = 0
-            if command == Command.Tap1:
-                self.inputDelayCode = [InputAttackCodes.x1, InputAttackCodes.x1x2, InputAttackCodes.x1x3, InputAttackCodes.x1x4, InputAttackCodes.x1x2x3, InputAttackCodes.x1x2x4, InputAttackCodes.x1x3x4]
-            else:
-                self.inputDelayCode = None
-
-    def UpdateInputDelay(self, gameState: TekkenGameState):
-        if self.inputDelayCode != None:
-            #if any((True for x in self.inputDelayCode if x in botInputState)):
-            if gameState.DidBotIdChangeXMovesAgo(1):
-                print(self.inputDelay)
-                self.inputDelayCode = None
-                self.inputDelay = 0
-            else:
-                self.inputDelay += 1
-                if self.inputDelay > 40:
-                    self.inputDelayCode = None
-                    self.inputDelay = 0
+    def GetInputDelay(self):
+        """
+        Frames between sending an input and the game reading it, as measured by the controller's latency probe, or 0
+        until it has samples. Clamped, so an outlier can't make Recovery waits fire before the game accepts inputs.
+        """
+        latencyProbe = getattr(self.inputController, 'latencyProbe', None)
+        inputDelay = latencyProbe.get_measured_input_delay() if latencyProbe != None else None
+        if inputDelay == None:
+            inputDelay = 0
+        return min(max(0, inputDelay), BotCommands.MAX_INPUT_DELAY)
 
     def ClearCommands(self):
         self.commandBuffer = []
         self.inputController.Release()
         self.updateFrame = 0
+        self.baseFrame = None
@@ -3,6 +3,7 @@ from tkinter.ttk import *
 import time
 from datetime import date
 from MatchRecorder import MatchRecorder
+from tekken.recording import MatchReplay
 from tekken_game_state import TekkenGameState
 
 from GameInputter import *
@@ -18,6 +19,7 @@ class BotRecorder():
         self.playback_going = False
         self.is_recording = False #set this to true to record some matches
         self.is_playback_mode = True
+        self.toplevel.protocol("WM_DELETE_WINDOW", self.on_close)
 
 
 
@@ -43,7 +45,10 @@ class BotRecorder():
                 self.playback("2017_Jul_20_22.15.36S_ALISAvKING")
                 print("ticking begins")
                 if self.is_recording:
-                    self.recorder = MatchRecorder()
+                    if self.game_state.GetRoundNumber() == 1:
+                        self.recorder.Close()
+                        self.recorder = MatchRecorder()
+                    self.recorder.StartRound()
                 self.playback_going = True
 
             if len(self.game_state.stateLog) > 2:
@@ -56,23 +61,32 @@ class BotRecorder():
                 self.p1_bot.Update(self.game_state)
                 self.p2_bot.Update(self.game_state)
 
+                self.p1_controller.Flush()
+                self.p2_controller.Flush()
+
         time2 = time.time()
         elapsed_time = 1000 * (time2 - time1)
         self.toplevel.after(max(2, 8 - int(round(elapsed_time))), self.update_launcher)
 
+    def stop_recording(self):
+        self.is_recording = False
+        self.recorder.Close()
+
+    def on_close(self):
+        self.stop_recording()
+        self.toplevel.destroy()
+
 
 
 
-    def playback(self, filename):
+    def playback(self, filename, round_index=0):
         p1_controller = GameControllerInputter(False)
         p2_controller = GameControllerInputter(True)
 
         p1_bot = BotCommands(p1_controller, True)
         p2_bot = BotCommands(p2_controller, True)
 
-        with open("TekkenData/Replays/" + filename) as fr:
-            p1_commands = fr.readline().strip()
-            p2_commands = fr.readline().strip()
+        p1_commands, p2_commands = MatchReplay("TekkenData/Replays/" + filename).read_round(round_index)
 
         p1_bot.AddCommand([(Command.ReleaseAll, 0), (Command.Wait, 1)] + ParseMoveList(p1_commands) + [(Command.ReleaseAll, 1)])
         p2_bot.AddCommand([(Command.ReleaseAll, 0), (Command.Wait, 1)] + ParseMoveList(p2_commands) + [(Command.ReleaseAll, 1)])
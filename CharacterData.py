@@ -1,6 +1,6 @@
 import json
 import os
-from NotationParser import ParseMoveList
+from NotationParser import CompileMoveList
 
 from enum import Enum
 
@@ -13,6 +13,7 @@ class ResponseTypes(Enum):
 class Gameplan:
     def __init__(self, json_data:dict):
         self.move_index = {}
+        self.punish_tables = {}
         self.json_data = json_data
 
         #print(json_data["punishes"])
@@ -23,28 +24,84 @@ class Gameplan:
         if tag_name.name in self.json_data:
             moves = {}
             for key in self.json_data[tag_name.name]:
-                moves[int(key)] = ParseMoveList(self.json_data[tag_name.name][key])
+                moves[int(key)] = CompileMoveList(self.json_data[tag_name.name][key])
             self.move_index[tag_name.name] = moves
+            self.punish_tables[tag_name.name] = Gameplan.BuildPunishTable(moves)
+
+    @staticmethod
+    def BuildPunishTable(moves:dict):
+        """
+        Entry n holds the punish of the most frames that fits in n frames,
+        the last entry holds the slowest punish.
+        """
+        table = [None] * (max(max(moves, default=0), 0) + 1)
+        best_move = None
+        for frames in range(1, len(table)):
+            best_move = moves.get(frames, best_move)
+            table[frames] = best_move
+        return table
 
     def GetMoveByFrame(self, tag_name:ResponseTypes, frames:int):
-        if tag_name.name in self.move_index:
-            moves = self.move_index[tag_name.name]
-            for i in range(frames):
-                punishKey = frames - i
-                if punishKey in moves :
-                    return moves[punishKey]
-        return None
+        table = self.punish_tables.get(tag_name.name)
+        if table is None or frames < 1:
+            return None
+        return table[min(frames, len(table) - 1)]
+
+
+class GameplanRegistry:
+    """
+    Gameplans of every file in the directory indexed by char_id. A file is
+    only read again when its modification time changes.
+    """
+    DIRECTORY = "TekkenData/CharacterData/"
+    DEFAULT_CHAR_ID = -9999
+
+    def __init__(self, directory=DIRECTORY):
+        self.directory = directory
+        self.file_mtimes = {}
+        self.file_gameplans = {}
+        self.gameplans = {}
+
+    def Refresh(self):
+        file_names = sorted(filename for filename in os.listdir(self.directory) if filename.endswith(".txt"))
+        changed = False
+        for filename in set(self.file_mtimes) - set(file_names):
+            del self.file_mtimes[filename]
+            self.file_gameplans.pop(filename, None)
+            changed = True
+
+        for filename in file_names:
+            mtime = os.stat(os.path.join(self.directory, filename)).st_mtime
+            if self.file_mtimes.get(filename) == mtime:
+                continue
+            self.file_mtimes[filename] = mtime
+            self.file_gameplans.pop(filename, None)
+            changed = True
+            try:
+                with open(os.path.join(self.directory, filename)) as data_file:
+                    data = json.load(data_file)
+                self.file_gameplans[filename] = (int(data['char_id']), Gameplan(data))
+            except (OSError, ValueError, KeyError) as e:
+                print("Gameplan " + filename + " could not be loaded: " + str(e))
+
+        if changed:
+            self.gameplans = {}
+            for filename in file_names:
+                if filename in self.file_gameplans:
+                    char_id, gameplan = self.file_gameplans[filename]
+                    self.gameplans.setdefault(char_id, gameplan)
+
+    def GetGameplan(self, char_id):
+        self.Refresh()
+        gameplan = self.gameplans.get(int(char_id))
+        if gameplan is not None:
+            print('Gameplan located: ' + str(gameplan.json_data['name']))
+            return gameplan
+        print("Gameplan not found for char_id: " + str(char_id) + " Using default gameplan.")
+        return self.gameplans.get(GameplanRegistry.DEFAULT_CHAR_ID)
+
 
+GAMEPLANS = GameplanRegistry()
 
 def GetGameplan(char_id):
-    directory = "TekkenData/CharacterData/"
-    for filename in os.listdir(directory):
-        if filename.endswith(".txt"):
-            #print(os.path.join(directory, filename))
-            with open(os.path.join(directory, filename)) as data_file:
-                data = json.load(data_file)
-                if int(data['char_id']) == int(char_id):
-                    print('Gameplan located: ' + str(data['name']))
-                    return Gameplan(data)
-    print("Gameplan not found for char_id: " + str(char_id) + " Using default gameplan.")
-    return GetGameplan(-9999)
+    return GAMEPLANS.GetGameplan(char_id)
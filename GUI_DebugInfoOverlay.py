@@ -13,12 +13,13 @@ class TextRedirector(object):
         pass
 
 class GUI_DebugInfoOverlay(GUI_Overlay.Overlay):
-    def __init__(self, master, launcher):
+    def __init__(self, master, launcher, latency_probe=None):
 
         GUI_Overlay.Overlay.__init__(self, master, (1200, 120), "Tekken Bot: Match Stats Overlay")
 
         #self.launcher = FrameDataLauncher(self.enable_nerd_data)
         self.launcher = launcher
+        self.latency_probe = latency_probe
 
         Grid.columnconfigure(self.toplevel, 0, weight=1)
         Grid.rowconfigure(self.toplevel, 0, weight=1)
@@ -27,7 +28,7 @@ class GUI_DebugInfoOverlay(GUI_Overlay.Overlay):
         self.canvas.configure(background=self.background_color)
         self.canvas.pack()
 
-        self.textbox_width = 10
+        self.textbox_width = 11
 
         self.textbox_names = [
             'p1_tracking',
@@ -35,8 +36,10 @@ class GUI_DebugInfoOverlay(GUI_Overlay.Overlay):
             'p1_movename',
             'p1_moveindex',
             'p1_stun_state',
-            'p2_stun_state',
 
+            'input_latency',
+
+            'p2_stun_state',
             'p2_moveindex',
             'p2_movename',
             'p2_???',
@@ -79,6 +82,15 @@ class GUI_DebugInfoOverlay(GUI_Overlay.Overlay):
             textbox.configure(state="disabled")
             textbox.see('end')
 
+    def set_textbox(self, textbox_index, out):
+        if out != self.textboxes_last_inputs[textbox_index]:
+            self.textboxes_last_inputs[textbox_index] = out
+            textbox = self.textboxes[textbox_index]
+            textbox.configure(state="normal")
+            textbox.delete("1.0", "end")
+            textbox.insert("end", out)
+            textbox.configure(state="disabled")
+
     def update_state(self):
         gameState = self.launcher.gameState
 
@@ -87,6 +99,9 @@ class GUI_DebugInfoOverlay(GUI_Overlay.Overlay):
             self.draw_debug_info_for_bot(gameState.state_log[-1].bot, gameState.get_current_bot_move_name(), 10, W, True)
             self.draw_debug_info_for_bot(gameState.state_log[-1].opp, gameState.get_current_opp_move_name(), self.w - 10, E, False)
 
+        if self.latency_probe != None:
+            self.set_textbox(self.textbox_names.index('input_latency'), self.latency_probe.get_overlay_text())
+
         move_id = gameState.state_log[-1].opp.move_id
         if self.prev_move_id != move_id:
             self.prev_move_id = move_id
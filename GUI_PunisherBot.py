@@ -22,12 +22,17 @@ class GUI_PunisherBot(Tk):
 
         self.launcher = TekkenBotLauncher(BotPunisher, False)
 
+        self.latency_var = StringVar()
+        self.latency_label = Label(self, textvariable=self.latency_var, font=("Consolas", 18))
+        self.latency_label.grid(row=0, column=0, sticky=N + W)
+
     def update_launcher(self):
         self.update()
         self.after(5, self.update_launcher)
 
     def update(self):
         self.launcher.Update()
+        self.latency_var.set(self.launcher.latencyProbe.get_overlay_text())
 
 if __name__ == '__main__':
     app = GUI_PunisherBot()
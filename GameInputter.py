@@ -2,10 +2,14 @@
 A layer of abstraction over ArtificialKeyboard, GameInputter.py takes basic Tekken commands (forward, tap light punch,
 hold back) and turns them into the actual keypresses.
 
+Keypresses are queued and only sent when Flush is called, so call it once per frame after the bots have issued their
+commands.
+
 """
 
 from enum import Enum
-from ArtificialKeyboard import ArtificalKeyboard
+from ArtificialKeyboard import BatchedKeyboard
+from constants.input import InputAttack, InputDirection
 
 #directinput scan codes
 #https://gist.github.com/tracend/912308
@@ -92,7 +96,7 @@ class GameControllerInputter:
 
 
 
-    def __init__(self, usePlayer2Controls = True):
+    def __init__(self, usePlayer2Controls = True, sink = None, latencyProbe = None):
         if usePlayer2Controls:
             self.controls = GameControllerInputter.p2_controls
         else:
@@ -107,6 +111,8 @@ class GameControllerInputter:
         self.isOnLeft = True
         self.releasedKeyJailTime = 0
         self.isTekkenActiveWindow = False
+        self.keyboard = BatchedKeyboard(sink)
+        self.latencyProbe = latencyProbe
         self.SetControlsOnLeft()
 
 
@@ -125,12 +131,28 @@ class GameControllerInputter:
         self.forward = self.controls[Buttons.BUTTON_RIGHT]
         self.right = self.controls[Buttons.BUTTON_DOWN]
         self.left = self.controls[Buttons.BUTTON_UP]
+        self.SetKeyInputs()
 
     def SetControlsOnRight(self):
         self.back = self.controls[Buttons.BUTTON_RIGHT]
         self.forward = self.controls[Buttons.BUTTON_LEFT]
         self.right = self.controls[Buttons.BUTTON_UP]
         self.left = self.controls[Buttons.BUTTON_DOWN]
+        self.SetKeyInputs()
+
+    def SetKeyInputs(self):
+        #what the game should report for each key, used by the latency probe
+        self.keyInputs = {
+            self.back: InputDirection.BACK,
+            self.forward: InputDirection.FORWARD,
+            self.controls[Buttons.BUTTON_UP]: InputDirection.UP,
+            self.controls[Buttons.BUTTON_DOWN]: InputDirection.DOWN,
+            self.controls[Buttons.BUTTON_1]: InputAttack.B_1,
+            self.controls[Buttons.BUTTON_2]: InputAttack.B_2,
+            self.controls[Buttons.BUTTON_3]: InputAttack.B_3,
+            self.controls[Buttons.BUTTON_4]: InputAttack.B_4,
+            self.controls[Buttons.BUTTON_RB]: InputAttack.B_RAGE,
+        }
 
     def TapBack(self):
         self.TapButton(self.back)
@@ -272,24 +294,27 @@ class GameControllerInputter:
 
     def PressKeyIfActive(self, hexKeyCode):
         if (self.isTekkenActiveWindow):
-            ArtificalKeyboard.PressKey(hexKeyCode)
+            self.keyboard.PressKey(hexKeyCode)
 
     def ReleaseKeyIfActive(self, hexKeyCode):
         if (self.isTekkenActiveWindow):
-            ArtificalKeyboard.ReleaseKey(hexKeyCode)
-
+            self.keyboard.ReleaseKey(hexKeyCode)
 
+    def Flush(self):
+        if self.latencyProbe != None and self.keyboard.HasPending():
+            self.latencyProbe.on_keys_sent([(self.keyInputs[key], isRelease) for key, isRelease in self.keyboard.pending if key in self.keyInputs])
+        self.keyboard.Flush()
 
     def ReleaseAllButtons(self):
         #print("releasing all buttons")
-        ArtificalKeyboard.ReleaseKey(self.controls[Buttons.BUTTON_1])
-        ArtificalKeyboard.ReleaseKey(self.controls[Buttons.BUTTON_2])
-        ArtificalKeyboard.ReleaseKey(self.controls[Buttons.BUTTON_3])
-        ArtificalKeyboard.ReleaseKey(self.controls[Buttons.BUTTON_4])
-        ArtificalKeyboard.ReleaseKey(self.controls[Buttons.BUTTON_UP])
-        ArtificalKeyboard.ReleaseKey(self.controls[Buttons.BUTTON_DOWN])
-        ArtificalKeyboard.ReleaseKey(self.controls[Buttons.BUTTON_LEFT])
-        ArtificalKeyboard.ReleaseKey(self.controls[Buttons.BUTTON_RIGHT])
-        ArtificalKeyboard.ReleaseKey(self.controls[Buttons.BUTTON_RB])
+        self.keyboard.ReleaseKey(self.controls[Buttons.BUTTON_1])
+        self.keyboard.ReleaseKey(self.controls[Buttons.BUTTON_2])
+        self.keyboard.ReleaseKey(self.controls[Buttons.BUTTON_3])
+        self.keyboard.ReleaseKey(self.controls[Buttons.BUTTON_4])
+        self.keyboard.ReleaseKey(self.controls[Buttons.BUTTON_UP])
+        self.keyboard.ReleaseKey(self.controls[Buttons.BUTTON_DOWN])
+        self.keyboard.ReleaseKey(self.controls[Buttons.BUTTON_LEFT])
+        self.keyboard.ReleaseKey(self.controls[Buttons.BUTTON_RIGHT])
+        self.keyboard.ReleaseKey(self.controls[Buttons.BUTTON_RB])
 
 
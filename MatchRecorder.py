@@ -3,9 +3,18 @@ from tekken_game_state import TekkenGameState
 from ButtonCommandEnum import Command
 from MoveInfoEnums import InputDirectionCodes
 from MoveInfoEnums import InputAttackCodes
+from NotationParser import ParseMoveList
+import tempfile
 import time
 
+from tekken.recording import MatchReplay, MatchReplayWriter, ReplayCatalog
+
 class MatchRecorder:
+    """
+    Inputs are written as notation while they arrive, only the transitions
+    and the frames waited between them are kept. Each player streams to its
+    own temporary file, so memory stays constant over a match.
+    """
     NOTATION = {
         Command.HoldForward : 'F',
         Command.HoldBack: 'B',
@@ -28,13 +37,18 @@ class MatchRecorder:
         Command.Release4: '+4-',
 
         Command.HoldRage: 'R',
-        Command.ReleaseRage: '=R',
+        Command.ReleaseRage: '-R',
     }
 
+    NEUTRAL_INPUT = (InputDirectionCodes.N, InputAttackCodes.N, False)
+
     def __init__(self):
-        self.input_log = []
         self.p1_name = "UNKNOWN"
         self.p2_name = "UNKNOWN"
+        self.notation_files = []
+        self.StartRound()
+        self.transition_notation = {}
+        self.replay_writer = None
 
 
     def Update(self, gameState:TekkenGameState):
@@ -43,17 +57,27 @@ class MatchRecorder:
 
         bot_input = gameState.GetBotInputState()
         opp_input = gameState.GetOppInputState()
-        #self.input_log.append(bot_input[0].name + "," + bot_input[1].name + "|" + opp_input[0].name + "," + opp_input[1].name)
-        self.input_log.append((bot_input, opp_input))
+        self.AppendInput(0, bot_input)
+        self.AppendInput(1, opp_input)
+
+    def AppendInput(self, index, input):
+        transition = (self.previous_input[index], input)
+        notation = self.transition_notation.get(transition)
+        if notation is None:
+            commands = self.TransitionToCommandFromCommand(input, self.previous_input[index])
+            notation = self.GetCommandsAsNotation(commands[:-1])
+            self.transition_notation[transition] = notation
+
+        if notation:
+            if self.wait_frames[index] > 0:
+                self.notation_files[index].write(str(self.wait_frames[index]) + ', ')
+            self.notation_files[index].write(notation)
+            self.wait_frames[index] = 0
+        self.wait_frames[index] += 1
+        self.previous_input[index] = input
 
     def GetInputAsCommands(self, index):
-        commands = []
-        previous_input = [(InputDirectionCodes.N, InputAttackCodes.N, False), (InputDirectionCodes.N, InputAttackCodes.N, False)]
-        for input in self.input_log:
-            commands += self.TransitionToCommandFromCommand(input[index], previous_input[index])
-            previous_input = input
-        #print(self.CompressCommands(commands))
-        return self.CompressCommands(commands)
+        return ParseMoveList(self.GetInputAsNotation(index))
 
     def CompressCommands(self, commands):
         compressed_commands = []
@@ -73,19 +97,21 @@ class MatchRecorder:
 
 
     def GetInputAsNotation(self, index):
-        commands = self.GetInputAsCommands(index)
-        notation = self.GetCommandsAsNotation(commands)
-        return notation
+        notation_file = self.notation_files[index]
+        notation_file.seek(0)
+        notation = notation_file.read()
+        notation_file.seek(0, 2)
+        return notation + str(self.wait_frames[index]) + ', '
 
 
     def GetCommandsAsNotation(self, commands):
-        notation = ""
+        notation = []
         for command in commands:
             if command[0] == Command.Wait:
-                notation += str(command[1]) + ', '
+                notation.append(str(command[1]) + ', ')
             else:
-                notation += MatchRecorder.NOTATION[command[0]] + ', '
-        return notation
+                notation.append(MatchRecorder.NOTATION[command[0]] + ', ')
+        return ''.join(notation)
 
 
     def TransitionToCommandFromCommand(self, input, prev_input):
@@ -131,11 +157,33 @@ class MatchRecorder:
 
     REPLAY_DIR = "TekkenData/Replays/"
     def PrintInputLog(self):
+        """
+        Saves the round into the match replay.
+        """
         print("Recording match...")
 
-        with open(MatchRecorder.REPLAY_DIR + str(time.strftime('%Y_%b_%d_%H.%M.%SS_') + self.p1_name + 'v' + self.p2_name), 'w') as fw:
-            fw.write(self.GetInputAsNotation(0) + "\n")
-            fw.write(self.GetInputAsNotation(1) + "\n")
+        if self.replay_writer is None:
+            self.replay_writer = MatchReplayWriter(MatchRecorder.REPLAY_DIR + str(time.strftime('%Y_%b_%d_%H.%M.%SS_') + self.p1_name + 'v' + self.p2_name) + MatchReplay.FILE_EXTENSION, self.p1_name, self.p2_name, catalog=ReplayCatalog(MatchRecorder.REPLAY_DIR))
+        for index, notation_file in enumerate(self.notation_files):
+            notation_file.write(str(self.wait_frames[index]) + ', ')
+            notation_file.seek(0)
+        self.replay_writer.write_round(*self.notation_files)
+        self.StartRound()
         print("...match recorded")
 
+    def StartRound(self):
+        """
+        Drops the inputs recorded since the last round was saved, the round's
+        notation starts from here. The match replay is kept.
+        """
+        for notation_file in self.notation_files:
+            notation_file.close()
+        self.previous_input = [MatchRecorder.NEUTRAL_INPUT, MatchRecorder.NEUTRAL_INPUT]
+        self.wait_frames = [0, 0]
+        self.notation_files = [tempfile.TemporaryFile('w+'), tempfile.TemporaryFile('w+')]
+
+    def Close(self):
+        if self.replay_writer is not None:
+            self.replay_writer.close()
+            self.replay_writer = None
 
@@ -1,8 +1,33 @@
 class MoveDataReport:
-    def __init__(self, name, true_false_list):
+    def __init__(self, name, true_false_list=None, bitset=0, total_frames=0):
         self.name = name
-        self.start_stop_pairs = self.process_list(true_false_list)
+        if true_false_list is not None:
+            self.start_stop_pairs = self.process_list(true_false_list)
+        else:
+            self.start_stop_pairs = self.process_bitset(bitset, total_frames)
 
+    @staticmethod
+    def from_packed_frames(packed_frames, report_flags):
+        """
+        Builds one report per (name, flag) pair out of a window of packed
+        technical states ordered from the oldest to the newest frame.
+        """
+        bitsets = {}
+        for position, packed in enumerate(packed_frames):
+            while packed:
+                lowest_flag = packed & -packed
+                bitsets[lowest_flag] = (
+                    bitsets.get(lowest_flag, 0) | (1 << position)
+                )
+                packed ^= lowest_flag
+        total_frames = len(packed_frames)
+        return [
+            MoveDataReport(
+                name, bitset=bitsets.get(int(flag), 0),
+                total_frames=total_frames
+            )
+            for name, flag in report_flags
+        ]
 
     def process_list(self, true_false_list):
         total_frames = len(true_false_list)
@@ -23,6 +48,22 @@ class MoveDataReport:
 
         return start_stop_pairs
 
+    def process_bitset(self, bitset, total_frames):
+        # bit i is set when the state is present on the (i + 1)th frame
+        starts = bitset & ~(bitset << 1)
+        stops = bitset & ~(bitset >> 1)
+        start_stop_pairs = []
+        while starts:
+            start_bit = starts & -starts
+            stop_bit = stops & -stops
+            starts ^= start_bit
+            stops ^= stop_bit
+            stop = stop_bit.bit_length()
+            start_stop_pairs.append(
+                (start_bit.bit_length(), stop if stop < total_frames else '')
+            )
+        return start_stop_pairs
+
     def is_present(self):
         return len(self.start_stop_pairs) > 0
 
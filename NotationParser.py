@@ -1,182 +1,240 @@
+from functools import lru_cache
+import re
+
 from ButtonCommandEnum import Command
 
 
+#tekken.input_latency.InputLatencyProbe measures this on the running machine, see get_measured_input_delay
 INPUT_DELAY = 4
+PROGRAM_CACHE_SIZE = 256
+TERM_CACHE_SIZE = 1024
+
+# Longer lexemes are tried first, so 'pewgf' is never read as 'ewgf' and the
+# 'f' of 'qcf' or 'ff' is never read as a direction.
+LEXEME = re.compile(r"""
+    (?P<keyword>recovery|nextmove|startup|debug|pewgf|ewgf|qcb|qcf|iWS|dp|UF|ff|wr|rel|S!|L!)
+  | (?P<timing>\[\d+\])
+  | (?P<release>-[UDBFR])
+  | (?P<attack>\+[1-4])
+  | (?P<modifier>[*-])
+  | (?P<wait>\d+)
+  | (?P<recovery>>+)
+  | (?P<colon>:)
+  | (?P<direction>[udbfUDBFR])
+  | (?P<separator>[/\s])
+""", re.VERBOSE)
+
+# When a term holds several of them, the first one decides what it compiles to
+HEADS = (
+    'recovery', 'S!', 'L!', 'nextmove', 'startup', 'debug', 'dp', 'qcb', 'qcf',
+    'pewgf', 'ewgf', 'iWS', ':', 'UF', 'ff', 'wait', '>', 'wr', 'rel',
+    '-U', '-D', '-B', '-F', '-R',
+)
+TAPS = (('u', Command.TapUp), ('d', Command.TapDown), ('b', Command.TapBack), ('f', Command.TapForward))
+HOLDS = (('U', Command.HoldUp), ('D', Command.HoldDown), ('B', Command.HoldBack), ('F', Command.HoldForward), ('R', Command.HoldRage))
+RELEASES = {'-U': Command.ReleaseUp, '-D': Command.ReleaseDown, '-B': Command.ReleaseBack, '-F': Command.ReleaseForward, '-R': Command.ReleaseRage}
+ATTACKS = {
+    '*': ((1, Command.Hold1), (2, Command.Hold2), (3, Command.Hold3), (4, Command.Hold4)),
+    '-': ((1, Command.Release1), (2, Command.Release2), (3, Command.Release3), (4, Command.Release4)),
+    '': ((1, Command.Tap1), (2, Command.Tap2), (3, Command.Tap3), (4, Command.Tap4)),
+}
+
+
+class NotationTerm:
+    """
+    The lexemes of one comma separated term of a move list.
+    """
+    def __init__(self, notation:str):
+        self.notation = notation
+        self.heads = set()
+        self.directions = set()
+        self.attacks = set()
+        self.attack_mode = ''
+        self.timing = None
+        self.recoveries = 0
+        self.commands = None
+
+        position = 0
+        while position < len(notation):
+            match = LEXEME.match(notation, position)
+            if match is None:
+                raise ValueError('Unexpected {!r} in move notation {!r}'.format(notation[position], notation))
+            kind, text = match.lastgroup, match.group()
+            if kind in ('keyword', 'release'):
+                self.heads.add(text)
+            elif kind == 'timing' and self.timing is None:
+                self.timing = int(text[1:-1])
+            elif kind == 'attack':
+                self.attacks.add(int(text[1]))
+            elif kind == 'modifier':
+                if self.attack_mode != '*':
+                    self.attack_mode = text
+            elif kind == 'wait':
+                self.heads.add('wait')
+            elif kind == 'recovery':
+                self.heads.add('>')
+                self.recoveries += len(text)
+            elif kind == 'colon':
+                self.heads.add(':')
+            elif kind == 'direction':
+                self.directions.add(text)
+            position = match.end()
+        if self.heads & set(RELEASES) and self.attack_mode != '*':
+            self.attack_mode = '-'
+
+        self.head = next((head for head in HEADS if head in self.heads), None)
+
+    def GetTiming(self, default=None):
+        if self.timing is None:
+            if default is None:
+                raise ValueError('Missing [frames] timing in move notation {!r}'.format(self.notation))
+            return default
+        return self.timing
+
 
 def ParseMoveList(moveList:str):
+    return list(CompileMoveList(moveList))
+
+@lru_cache(maxsize=PROGRAM_CACHE_SIZE)
+def CompileMoveList(moveList:str):
+    """
+    Compiles a move list into a program, a tuple of (command, frames to wait)
+    pairs. Programs are memoized by their notation, gameplans and replays
+    share them, so they must not be modified.
+    """
     commands = []
-    tempTiming = None
     timingOccurances = 0
 
-    for i, moveOrTiming in enumerate(moveList.split(',')):
-        notationResult = ConvertNotationToCommands(moveOrTiming.strip(), timingOccurances)
-        timingOccurances = notationResult[1]
-        commands += notationResult[0]
-    # print(commands)
-    return commands
+    for moveOrTiming in moveList.split(','):
+        timingOccurances = CompileTerm(GetTerm(moveOrTiming.strip()), timingOccurances, commands)
+    return tuple(commands)
+
+@lru_cache(maxsize=TERM_CACHE_SIZE)
+def GetTerm(notation:str):
+    return NotationTerm(notation)
 
 def ConvertNotationToCommands(notation:str, timingOccurances:int):
     commands = []
-    occurances = 0
-    attackCommands = GetAttackCommands(notation)
-    if 'recovery' in notation:
-        commands.append((Command.FullRecovery, 0))
-    elif 'S!' in notation or 'L!' in notation:
+    timingOccurances = CompileTerm(GetTerm(notation.strip()), timingOccurances, commands)
+    return (commands, timingOccurances)
+
+def CompileTerm(term:NotationTerm, timingOccurances:int, commands:list):
+    """
+    Appends the commands of the term, returns the number of timings seen so far.
+    """
+    if term.head == '>':
+        # a move written before the recovery in the same term, as in '+2 >'
+        commands += GetTermMoveCommands(term)
+        for i in range(term.recoveries):
+            if (i + timingOccurances) % 2 == 0:
+                commands.append((Command.Recovery, 0))
+            else:
+                commands.append((Command.Nextmove, 0))
+        return timingOccurances + term.recoveries
+
+    if term.commands is None:
+        term.commands = tuple(BuildTermCommands(term))
+    commands += term.commands
+    return timingOccurances
+
+def BuildTermCommands(term:NotationTerm):
+    commands = []
+    head = term.head
+    attackCommands = GetTermAttackCommands(term)
+    if head in ('recovery', 'S!', 'L!'):
         commands.append((Command.FullRecovery, 0))
-    elif 'nextmove' in notation:
+    elif head == 'nextmove':
         commands.append((Command.Nextmove, 0))
-    elif 'startup' in notation:
+    elif head == 'startup':
         commands.append((Command.Startupmove, 0))
-    elif 'debug' in notation:
+    elif head == 'debug':
         commands.append((Command.HoldBack, 1))
         commands.append((Command.HoldDown, 2))
         commands.append((Command.ReleaseBack, 2))
         commands.append((Command.HoldForward, 2))
         commands += attackCommands
         commands.append((Command.ReleaseAll, 2))
-    elif 'dp' in notation:
+    elif head == 'dp':
         commands.append((Command.TapForward, 1))
         commands.append((Command.TapDown, 1))
         commands.append((Command.TapForward, 1))
         commands.append((Command.TapDown, 1))
         commands += attackCommands
-    elif 'qcb' in notation:
+    elif head == 'qcb':
         commands.append((Command.HoldDown, 2))
         commands.append((Command.HoldBack, 2))
         commands.append((Command.ReleaseDown, 2))
         commands += attackCommands
         commands.append((Command.ReleaseBack, 2))
-    elif 'qcf' in notation:
+    elif head == 'qcf':
         commands.append((Command.HoldDown, 1))
         commands.append((Command.HoldForward, 1))
         commands.append((Command.ReleaseDown, 1))
         commands += attackCommands
         commands.append((Command.ReleaseForward, 2))
-    elif 'pewgf' in notation:
+    elif head == 'pewgf':
         commands.append((Command.TapForward, 0))
         commands.append((Command.TapDown, 2))
         commands.append((Command.TapForward, 0))
         commands += attackCommands
         commands.append((Command.ReleaseDown, 1))
-    elif 'ewgf' in notation:
+    elif head == 'ewgf':
         commands.append((Command.TapForward, 0))
         commands.append((Command.HoldDown, 2))
         commands.append((Command.TapForward, 1))
         commands += attackCommands
         commands.append((Command.ReleaseDown, 1))
-    elif 'iWS' in notation:
+    elif head == 'iWS':
         commands.append((Command.HoldDown, 0))
         commands.append((Command.HoldForward, 2))
         commands.append((Command.ReleaseDown, 2))
         commands.append((Command.ReleaseForward, 0))
         commands.append((Command.Wait, 2))
         commands += attackCommands
-    elif ':' in notation:
-        waitFrames = int(notation.split('[')[1].split(']')[0])
-        commands.append((Command.Wait, waitFrames - INPUT_DELAY))
-    elif 'UF' in notation:
+    elif head == ':':
+        commands.append((Command.Wait, term.GetTiming() - INPUT_DELAY))
+    elif head == 'UF':
         commands.append((Command.HoldForward, 1))
         commands.append((Command.HoldUp, 0))
-        waitFrames = int(notation.split('[')[1].split(']')[0])
-        commands.append((Command.Wait, waitFrames))
+        commands.append((Command.Wait, term.GetTiming(0)))
         commands.append((Command.ReleaseForward, 1))
         commands.append((Command.ReleaseUp, 0))
-    elif 'ff' in notation:
+    elif head == 'ff':
         commands.append((Command.TapForward, 0))
         commands.append((Command.HoldForward, 2))
-        waitFrames = int(notation.split('[')[1].split(']')[0])
-        commands.append((Command.Wait, 1 + waitFrames ))
+        commands.append((Command.Wait, 1 + term.GetTiming(0)))
         commands += attackCommands
         commands.append((Command.ReleaseForward, 1))
-
-    elif notation.isdigit() and '+' not in notation:
-        commands.append((Command.Wait, int(notation)))
-    elif '>' in notation:
-        occurances = notation.count('>')
-        for i in range(occurances):
-            if (i + timingOccurances) % 2 == 0:
-                commands.append((Command.Recovery, 0))
-            else:
-                commands.append((Command.Nextmove, 0))
-    elif 'wr' in notation:
+    elif head == 'wait':
+        if not term.notation.isdigit():
+            raise ValueError('Unexpected frames in move notation {!r}'.format(term.notation))
+        commands.append((Command.Wait, int(term.notation)))
+    elif head == 'wr':
         commands.append((Command.TapForward, 0))
         commands.append((Command.Wait, 2))
         commands.append((Command.TapForward, 0))
         commands.append((Command.Wait, 2))
         commands.append((Command.HoldForward, 0))
-        waitFrames = int(notation.split('[')[1].split(']')[0])
-
-        commands.append((Command.Wait, 2 + waitFrames))
+        commands.append((Command.Wait, 2 + term.GetTiming(0)))
         commands += attackCommands
         commands.append((Command.ReleaseForward, 2))
-    elif 'rel' in notation:
+    elif head == 'rel':
         commands.append((Command.ReleaseAll, 0))
-    elif '-U' in notation:
-        commands.append((Command.ReleaseUp, 0))
-    elif '-D' in notation:
-        commands.append((Command.ReleaseDown, 0))
-    elif '-B' in notation:
-        commands.append((Command.ReleaseBack, 0))
-    elif '-F' in notation:
-        commands.append((Command.ReleaseForward, 0))
-    elif '-R' in notation:
-        commands.append((Command.ReleaseRage, 0))
+    elif head in RELEASES:
+        commands.append((RELEASES[head], 0))
     else:
-        if 'u' in notation:
-            commands.append((Command.TapUp, 0))
-        if 'd' in notation:
-            commands.append((Command.TapDown, 0))
-        if 'b' in notation:
-            commands.append((Command.TapBack, 0))
-        if 'f' in notation:
-            commands.append((Command.TapForward, 0))
-        if 'U' in notation:
-            commands.append((Command.HoldUp, 0))
-        if 'D' in notation:
-            commands.append((Command.HoldDown, 0))
-        if 'B' in notation:
-            commands.append((Command.HoldBack, 0))
-        if 'F' in notation:
-            commands.append((Command.HoldForward, 0))
-        if 'R' in notation:
-            commands.append((Command.HoldRage, 0))
-
-        commands += GetAttackCommands(notation)
+        commands += GetTermMoveCommands(term)
 
+    return commands
 
 
-    return (commands, timingOccurances + occurances)
+def GetTermMoveCommands(term:NotationTerm):
+    commands = [(command, 0) for direction, command in TAPS + HOLDS if direction in term.directions]
+    return commands + GetTermAttackCommands(term)
 
+def GetTermAttackCommands(term:NotationTerm):
+    return [(command, 0) for button, command in ATTACKS[term.attack_mode] if button in term.attacks]
 
 def GetAttackCommands(notation:str):
-    commands = []
+    return GetTermAttackCommands(GetTerm(notation.strip()))
 
-    if '*' in notation:
-        if '+1' in notation:
-            commands.append((Command.Hold1, 0))
-        if '+2' in notation:
-            commands.append((Command.Hold2, 0))
-        if '+3' in notation:
-            commands.append((Command.Hold3, 0))
-        if '+4' in notation:
-            commands.append((Command.Hold4, 0))
-
-    elif '-' in notation:
-        if '+1' in notation:
-            commands.append((Command.Release1, 0))
-        if '+2' in notation:
-            commands.append((Command.Release2, 0))
-        if '+3' in notation:
-            commands.append((Command.Release3, 0))
-        if '+4' in notation:
-            commands.append((Command.Release4, 0))
-    else:
-        if '+1' in notation:
-            commands.append((Command.Tap1, 0))
-        if '+2' in notation:
-            commands.append((Command.Tap2, 0))
-        if '+3' in notation:
-            commands.append((Command.Tap3, 0))
-        if '+4' in notation:
-            commands.append((Command.Tap4, 0))
-    return commands
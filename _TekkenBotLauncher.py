@@ -10,6 +10,7 @@ import BasicCommands
 from BotFrameTrap import BotFrameTrap
 from BotPunisher import BotPunisher
 from BotRecorder import BotRecorder
+from tekken.input_latency import InputLatencyProbe
 
 #print("ADMIN STATUS: " + str(c.windll.shell32.IsUserAnAdmin()))
 
@@ -17,7 +18,8 @@ from BotRecorder import BotRecorder
 class TekkenBotLauncher:
     def __init__(self, botClass, isPlayerOne):
         self.gameState = TekkenGameState.TekkenGameState()
-        self.gameController = GameInputter.GameControllerInputter()
+        self.latencyProbe = InputLatencyProbe()
+        self.gameController = GameInputter.GameControllerInputter(latencyProbe = self.latencyProbe)
         self.botCommands = BasicCommands.BotCommands(self.gameController)
         self.botBrain = botClass(self.botCommands)
         self.benchmarkTime = time.time()
@@ -35,9 +37,11 @@ class TekkenBotLauncher:
             if not self.isPlayerOne:
                 self.gameState.FlipMirror()
 
+            self.latencyProbe.update(self.gameState.stateLog[-1].frame_count, self.gameState.stateLog[-1].bot)
             self.gameController.Update(self.gameState.is_tekken_foreground_wnd(), self.gameState.IsBotOnLeft())
             self.botCommands.Update(self.gameState)
             self.botBrain.Update(self.gameState)
+            self.gameController.Flush()
 
             if not self.isPlayerOne:
                 self.gameState.FlipMirror()
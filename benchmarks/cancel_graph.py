@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2019, Alchemy Meister
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met =
+#
+#     * Redistributions of source code must retain the above copyright notice,
+#       this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice,this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its
+#       contributors may be used to endorse or promote products derived from
+#       this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Times the construction and the queries of the cancel graph over the movelist
+dumps written by TekkenGameReader.write_movelists_to_file.
+
+    python -m benchmarks.cancel_graph [dump_directory] [repetitions] [depth]
+"""
+import os
+import sys
+import time
+
+from log import LogUtils
+from tekken.parsers import MovelistParser
+
+from .movelist_parser import (
+    DEFAULT_DUMP_DIRECTORY, DEFAULT_REPETITIONS, load_dumps
+)
+
+DEFAULT_DEPTH = 3
+
+def best_time(function, repetitions):
+    """
+    Best time in seconds out of the given repetitions, and the last result.
+    """
+    best = float('inf')
+    result = None
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main(argv):
+    dump_directory = argv[1] if len(argv) > 1 else DEFAULT_DUMP_DIRECTORY
+    repetitions = int(argv[2]) if len(argv) > 2 else DEFAULT_REPETITIONS
+    depth = int(argv[3]) if len(argv) > 3 else DEFAULT_DEPTH
+    LogUtils(open(os.devnull, 'w'))
+
+    print(
+        '{:<20} {:>6} {:>7} {:>10} {:>12} {:>14}'.format(
+            'movelist', 'moves', 'edges', 'build ms', 'succ. us/mv',
+            'depth {} ms'.format(depth)
+        )
+    )
+    for name, movelist_bytes, movelist_address in load_dumps(dump_directory):
+        movelist_parser = MovelistParser(movelist_bytes, movelist_address)
+        build_time, cancel_graph = best_time(
+            movelist_parser.build_cancel_graph, repetitions
+        )
+        successors_time, _ = best_time(
+            lambda: [
+                cancel_graph.get_successors(move_id)
+                for move_id in range(len(cancel_graph))
+            ],
+            repetitions
+        )
+        continuations_time, _ = best_time(
+            lambda: [
+                cancel_graph.get_continuations(move_id, depth)
+                for move_id in cancel_graph.neutral_move_ids
+            ],
+            repetitions
+        )
+        print(
+            '{:<20} {:>6} {:>7} {:>10.2f} {:>12.3f} {:>14.2f}'.format(
+                name, len(cancel_graph), len(cancel_graph.successor_ids),
+                build_time * 1000,
+                successors_time * 1e6 / max(len(cancel_graph), 1),
+                continuations_time * 1000
+            )
+        )
+
+if __name__ == '__main__':
+    main(sys.argv)
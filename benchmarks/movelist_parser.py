@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2019, Alchemy Meister
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met =
+#
+#     * Redistributions of source code must retain the above copyright notice,
+#       this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice,this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its
+#       contributors may be used to endorse or promote products derived from
+#       this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Times MovelistParser over the movelist dumps written by
+TekkenGameReader.write_movelists_to_file.
+
+    python -m benchmarks.movelist_parser [dump_directory] [repetitions]
+"""
+import glob
+import os
+import sys
+import time
+
+from log import LogUtils
+from tekken.parsers import MovelistParser
+
+DEFAULT_DUMP_DIRECTORY = 'RawData'
+DEFAULT_REPETITIONS = 5
+
+def load_dumps(dump_directory):
+    """
+    Yields the name, bytes and address of every movelist dump.
+    """
+    for path in sorted(glob.glob(os.path.join(dump_directory, '*.dat'))):
+        name, _, address = (
+            os.path.splitext(os.path.basename(path))[0].rpartition('_')
+        )
+        with open(path, 'rb') as dump_file:
+            yield name, dump_file.read(), int(address, 16)
+
+def time_parse(movelist_bytes, movelist_address, repetitions):
+    """
+    Best parse time in seconds out of the given repetitions.
+    """
+    best_time = float('inf')
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        MovelistParser(movelist_bytes, movelist_address)
+        best_time = min(best_time, time.perf_counter() - start)
+    return best_time
+
+def main(argv):
+    dump_directory = argv[1] if len(argv) > 1 else DEFAULT_DUMP_DIRECTORY
+    repetitions = int(argv[2]) if len(argv) > 2 else DEFAULT_REPETITIONS
+    LogUtils(open(os.devnull, 'w'))
+
+    total_time = 0
+    for name, movelist_bytes, movelist_address in load_dumps(dump_directory):
+        parse_time = time_parse(movelist_bytes, movelist_address, repetitions)
+        total_time += parse_time
+        print('{:<20} {:>10.2f} ms'.format(name, parse_time * 1000))
+    print('{:<20} {:>10.2f} ms'.format('TOTAL', total_time * 1000))
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2019, Alchemy Meister
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met =
+#
+#     * Redistributions of source code must retain the above copyright notice,
+#       this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice,this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its
+#       contributors may be used to endorse or promote products derived from
+#       this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Measures how many transitions per second the offline DQN training pipeline of
+AiStuff/dqn moves on the CPU: stepping the replay environments in lockstep,
+inserting into the experience replay and sampling a minibatch per step.
+
+    python -m benchmarks.offline_training recording [recording ...]
+        [--envs N] [--steps N] [--batch N] [--prioritized] [--p2]
+"""
+import os
+import sys
+import time
+
+from AiStuff.dqn.offline_env import VectorReplayEnv, load_frame_history
+from AiStuff.dqn.replay_buffer import PrioritizedReplayBuffer, ReplayBuffer
+from log import LogUtils
+
+def parse_arguments(argv):
+    options = {'--envs': 32, '--steps': 10000, '--batch': 32}
+    flags = set()
+    recordings = []
+    arguments = iter(argv[1:])
+    for argument in arguments:
+        if argument in options:
+            options[argument] = int(next(arguments))
+        elif argument.startswith('--'):
+            flags.add(argument)
+        else:
+            recordings.append(argument)
+    return recordings, options, flags
+
+def main(argv):
+    recordings, options, flags = parse_arguments(argv)
+    if not recordings:
+        print(__doc__)
+        return
+    number_of_envs = options['--envs']
+    steps = options['--steps']
+    batch_size = options['--batch']
+    prioritized = '--prioritized' in flags
+    LogUtils(open(os.devnull, 'w'))
+
+    start = time.perf_counter()
+    histories = [
+        load_frame_history(recording, is_player_one='--p2' not in flags)
+        for recording in recordings
+    ]
+    load_time = time.perf_counter() - start
+    frames = sum(len(history.actions) for history in histories)
+    print('{} frames loaded in {:.3f} s'.format(frames, load_time))
+
+    env = VectorReplayEnv(histories, number_of_envs)
+    buffer_class = PrioritizedReplayBuffer if prioritized else ReplayBuffer
+    replay = buffer_class(max(frames, 100000), env.observation_shape)
+
+    observations = env.reset()
+    start = time.perf_counter()
+    for _ in range(steps):
+        next_observations, rewards, terminals, actions = env.step()
+        replay.add_batch(
+            observations, actions, rewards, next_observations, terminals
+        )
+        observations = next_observations
+        minibatch = replay.sample(batch_size)
+        if prioritized:
+            # stands in for the TD errors of a training step
+            replay.update_priorities(minibatch[5], minibatch[3])
+    elapsed = time.perf_counter() - start
+
+    transitions = steps * number_of_envs
+    print(
+        '{} transitions in {:.3f} s, {:.0f} transitions/s, '
+        '{:.0f} sampled/s'.format(
+            transitions, elapsed, transitions / elapsed,
+            steps * batch_size / elapsed
+        )
+    )
+
+if __name__ == '__main__':
+    main(sys.argv)
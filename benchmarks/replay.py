@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2019, Alchemy Meister
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met =
+#
+#     * Redistributions of source code must retain the above copyright notice,
+#       this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice,this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its
+#       contributors may be used to endorse or promote products derived from
+#       this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Replays a frame recording written by FrameRecorder through TekkenGameState and
+TekkenEncyclopedia, then reports the throughput of every stage. The frame data
+output of the replay is discarded unless --print is given.
+
+    python -m benchmarks.replay recording [start_frame] [end_frame] [--print]
+"""
+import contextlib
+import os
+import sys
+
+from log import LogUtils
+from tekken.replay_driver import ReplayDriver
+
+def main(argv):
+    print_output = '--print' in argv
+    argv = [argument for argument in argv if argument != '--print']
+    if len(argv) < 2:
+        print(__doc__)
+        return
+    start_frame = int(argv[2]) if len(argv) > 2 else None
+    end_frame = int(argv[3]) if len(argv) > 3 else None
+    LogUtils(open(os.devnull, 'w'))
+
+    replay_driver = ReplayDriver(argv[1])
+    with open(os.devnull, 'w') as null_output:
+        with contextlib.ExitStack() as stack:
+            if not print_output:
+                stack.enter_context(contextlib.redirect_stdout(null_output))
+            replay_driver.run(start_frame, end_frame)
+
+    report = replay_driver.get_report()
+    print(
+        '{} frames in {:.3f} s, {:.0f} frames/s'.format(
+            report.frames, report.seconds,
+            report.frames / report.seconds if report.seconds else 0
+        )
+    )
+    for stage, seconds in report.stage_seconds.items():
+        print(
+            '{:<14} {:>10.3f} s {:>10.2f} us/frame'.format(
+                stage, seconds, seconds * 1e6 / max(report.frames, 1)
+            )
+        )
+    timings = {
+        timing.name: timing for timing in replay_driver.analyzers.get_timings()
+    }
+    for name, seconds in report.analyzer_seconds.items():
+        print(
+            '  {:<18} {:>10.3f} s {:>10.2f} us/frame, skipped {}/{}'.format(
+                name, seconds, seconds * 1e6 / max(report.frames, 1),
+                timings[name].skips, timings[name].runs + timings[name].skips
+            )
+        )
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2019, Alchemy Meister
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met =
+#
+#     * Redistributions of source code must retain the above copyright notice,
+#       this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice,this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its
+#       contributors may be used to endorse or promote products derived from
+#       this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Replays frame recordings, meant to be throw heavy sessions, and reports the
+per-frame cost of every analyzer, the throw break ones next to the
+encyclopedia ones, along with the throw break statistics they gathered.
+
+    python -m benchmarks.throw_break recording [recording ...]
+"""
+import contextlib
+import os
+import sys
+
+from log import LogUtils
+from tekken.replay_driver import ReplayDriver
+
+def main(argv):
+    if len(argv) < 2:
+        print(__doc__)
+        return
+    LogUtils(open(os.devnull, 'w'))
+
+    for recording in argv[1:]:
+        replay_driver = ReplayDriver(recording)
+        with open(os.devnull, 'w') as null_output:
+            with contextlib.redirect_stdout(null_output):
+                replay_driver.run()
+
+        report = replay_driver.get_report()
+        frames = max(report.frames, 1)
+        print('{}: {} frames'.format(recording, report.frames))
+        for name, seconds in report.analyzer_seconds.items():
+            print('{:<18} {:>10.2f} us/frame'.format(name, seconds * 1e6 / frames))
+        for player, analyzer in (
+                ('p1', replay_driver.throw_breaks_p1),
+                ('p2', replay_driver.throw_breaks_p2)
+        ):
+            statistics = analyzer.get_statistics()
+            print(
+                '{} {} throws, {} breakable, {} broken, '
+                'reaction {} frames (median {}, stdev {})'.format(
+                    player, analyzer.total_events, statistics.breakable,
+                    statistics.broken,
+                    format_frames(statistics.mean_reaction_frames),
+                    format_frames(statistics.median_reaction_frames),
+                    format_frames(statistics.stdev_reaction_frames)
+                )
+            )
+
+def format_frames(frames):
+    return '-' if frames is None else '{:.1f}'.format(frames)
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -36,4 +36,6 @@ from .punish_result import PunishResult
 from .rounds import BattleRounds
 from .side import BattleSide
 from .stages import BattleStages
+from .technical_state import TechnicalState
+from .throw_break_result import ThrowBreakResult
 from .timer import BattleTime
@@ -29,4 +29,5 @@
 
 from .game_state import GameStateEvent
 from .graphic_settings_change import GraphicSettingsChangeEvent
+from .movelist import MovelistEvent
 from .punish_window import PunishWindowEvent
@@ -262,7 +262,12 @@ class TekkenBotPrimeController():
             )
 
     def __post_console_initialization(self):
-        self.launcher = Launcher(self.root, extended_print=False)
+        self.launcher = Launcher(
+            self.root, extended_print=False,
+            record_frames=self.reloadable_initial_settings.config[
+                'DEFAULT'
+            ].get('frame_recording_enable')
+        )
 
         self.launcher.game_state.graphic_settings_publisher.register(
             GraphicSettingsChangeEvent.SCREEN_MODE, Subscriber(),
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2019, Alchemy Meister
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     * Redistributions of source code must retain the above copyright notice,
+#       this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice,this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its
+#       contributors may be used to endorse or promote products derived from
+#       this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+The interface of the analyzers AnalyzerPipeline runs on every new frame.
+"""
+from abc import ABC, abstractmethod
+
+class Analyzer(ABC):
+    """
+    fields are the GameSnapshot attribute paths the analyzer reads, such as
+    'bot.move_id', and history how many frames before the last one it looks
+    back at. When those fields stayed the same over that many frames and the
+    analyzer is idle, running it would change nothing and the pipeline skips
+    it. fields of None means the analyzer is never skipped.
+
+    budget is the time in seconds the analyzer may take per frame before the
+    pipeline moves it, along with every analyzer of the same group, to the
+    background worker.
+    """
+    DEFAULT_BUDGET = 0.002
+
+    name = None
+    fields = None
+    history = 0
+    budget = DEFAULT_BUDGET
+    group = None
+
+    @abstractmethod
+    def update(self, game_state):
+        pass
+
+    def is_idle(self, game_state):
+        """
+        Whether the analyzer has nothing in progress that advances with every
+        frame, such as a counter or an open event.
+        """
+        return True
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2019, Alchemy Meister
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     * Redistributions of source code must retain the above copyright notice,
+#       this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice,this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its
+#       contributors may be used to endorse or promote products derived from
+#       this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+The three parts of TekkenEncyclopedia.update as separate analyzers. They share
+the encyclopedia as their group, so they always run on the same thread.
+"""
+from .analyzer import Analyzer
+
+class EncyclopediaAnalyzer(Analyzer):
+    """
+    Runs one part of an encyclopedia from its player's point of view, as
+    TekkenEncyclopedia.update does.
+    """
+    PART = None
+
+    def __init__(self, cyclopedia):
+        self.cyclopedia = cyclopedia
+        self.group = cyclopedia
+        self.name = '{} {}'.format(
+            'p1' if cyclopedia.is_player_one else 'p2', self.PART
+        )
+
+    def update(self, game_state):
+        if self.cyclopedia.is_player_one:
+            game_state.flip_mirror()
+        try:
+            self.analyze(game_state)
+        finally:
+            if self.cyclopedia.is_player_one:
+                game_state.flip_mirror()
+
+    def analyze(self, game_state):
+        pass
+
+    @staticmethod
+    def for_encyclopedia(cyclopedia):
+        """
+        The analyzers of an encyclopedia in the order update runs them.
+        """
+        return [
+            FrameDataAnalyzer(cyclopedia),
+            GameStatsAnalyzer(cyclopedia),
+            CoachingAnalyzer(cyclopedia),
+        ]
+
+class FrameDataAnalyzer(EncyclopediaAnalyzer):
+    """
+    A frame data entry starts when the move id or the move timer of the bot
+    changes from one frame to the next.
+    """
+    PART = 'frame data'
+    fields = ('bot.move_id', 'bot.move_timer', 'opp.move_id', 'opp.move_timer')
+    history = 1
+    budget = 0.003
+
+    def analyze(self, game_state):
+        self.cyclopedia.determine_frame_data(game_state)
+
+    def is_idle(self, game_state):
+        return self.cyclopedia.active_frame_wait == 1
+
+class GameStatsAnalyzer(EncyclopediaAnalyzer):
+    """
+    Game events start and end on combo counter changes four frames back and
+    armored hits are damage taken five frames back, a fight reset is a frame
+    count going back, which the pipeline never skips.
+    """
+    PART = 'game stats'
+    fields = (
+        'bot.combo_counter', 'opp.combo_counter',
+        'bot.damage_taken', 'opp.damage_taken',
+    )
+    history = 5
+
+    def analyze(self, game_state):
+        self.cyclopedia.determine_game_stats(game_state)
+
+    def is_idle(self, game_state):
+        return (
+            self.cyclopedia.current_game_event is None
+            and self.cyclopedia.was_fight_being_reacquired
+            == game_state.get_reader().reacquire_names
+        )
+
+class CoachingAnalyzer(EncyclopediaAnalyzer):
+    """
+    Only acts on a new frame data entry or an open punish window.
+    """
+    PART = 'coaching'
+    fields = ()
+    budget = 0.001
+
+    def analyze(self, game_state):
+        self.cyclopedia.determine_coaching_tips(game_state)
+
+    def is_idle(self, game_state):
+        return (
+            self.cyclopedia.current_punish_window is None
+            and self.cyclopedia.previous_frame_data_entry
+            == self.cyclopedia.current_frame_data_entry
+        )
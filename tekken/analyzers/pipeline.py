@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2019, Alchemy Meister
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     * Redistributions of source code must retain the above copyright notice,
+#       this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice,this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its
+#       contributors may be used to endorse or promote products derived from
+#       this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Runs the registered analyzers on every frame TekkenGameState appends.
+
+Each analyzer is timed per frame and skipped while the fields it declares did
+not change. An analyzer that keeps going over its budget is moved, with its
+group, to a background worker that runs it on a copy of the game state, so
+the frame pipeline keeps its deadline as analyses are added.
+"""
+from collections import OrderedDict, deque, namedtuple
+import copy
+from operator import attrgetter
+import queue
+import sys
+import threading
+import time
+import traceback
+
+from log import LogUtils
+
+AnalyzerTiming = namedtuple(
+    'AnalyzerTiming',
+    [
+        'name', 'runs', 'skips', 'dropped', 'is_deferred', 'seconds',
+        'mean_ms', 'max_ms', 'last_ms'
+    ]
+)
+
+class AnalyzerSlot:
+    """
+    An analyzer with its input tracking and timing.
+    """
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+        self.name = analyzer.name or analyzer.__class__.__name__
+        if analyzer.fields is None:
+            self.get_inputs = None
+        elif analyzer.fields:
+            self.get_inputs = attrgetter(*analyzer.fields)
+        else:
+            self.get_inputs = lambda _: ()
+        self.inputs = None
+        self.unchanged_frames = 0
+        self.is_deferred = False
+        self.runs = 0
+        self.skips = 0
+        self.dropped = 0
+        self.seconds = 0
+        self.max_seconds = 0
+        self.last_seconds = 0
+        self.overruns = 0
+
+    def track_inputs(self, last_state, restarted):
+        """
+        Returns whether the inputs stayed the same over the frames the
+        analyzer looks back at.
+        """
+        if self.get_inputs is None:
+            return False
+        inputs = self.get_inputs(last_state)
+        if restarted or inputs != self.inputs:
+            self.inputs = inputs
+            self.unchanged_frames = 0
+            return False
+        self.unchanged_frames += 1
+        return self.unchanged_frames >= self.analyzer.history
+
+    def run(self, game_state, inputs_unchanged):
+        if inputs_unchanged and self.analyzer.is_idle(game_state):
+            self.skips += 1
+            self.last_seconds = 0
+            return
+        start = time.perf_counter()
+        try:
+            self.analyzer.update(game_state)
+        except:
+            traceback.print_exc()
+            if game_state.futurestate_log is not None:
+                game_state.return_to_present()
+        elapsed = time.perf_counter() - start
+        self.runs += 1
+        self.seconds += elapsed
+        self.last_seconds = elapsed
+        self.max_seconds = max(self.max_seconds, elapsed)
+        if elapsed > self.analyzer.budget:
+            self.overruns += 1
+        else:
+            self.overruns = 0
+
+    def get_timing(self):
+        return AnalyzerTiming(
+            self.name, self.runs, self.skips, self.dropped, self.is_deferred,
+            self.seconds, 1000 * self.seconds / max(self.runs, 1),
+            1000 * self.max_seconds, 1000 * self.last_seconds
+        )
+
+class DeferredOutput:
+    """
+    Stands in for sys.stdout while the worker runs. What the worker thread
+    writes is held until the frame pipeline writes it from its own thread,
+    the GUI stream redirectors are not thread safe.
+    """
+    def __init__(self, stream):
+        self.stream = stream
+        self.thread = None
+        self.pending = deque()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+    def write(self, text):
+        if threading.current_thread() is self.thread:
+            self.pending.append(text)
+        else:
+            self.stream.write(text)
+
+    def flush(self):
+        if threading.current_thread() is not self.thread:
+            self.stream.flush()
+
+    def write_pending(self):
+        while self.pending:
+            self.stream.write(self.pending.popleft())
+
+class AnalyzerWorker:
+    """
+    Runs the deferred analyzers frame by frame, in the order they were
+    submitted. A frame that finds the queue full is dropped.
+    """
+    MAX_QUEUED_FRAMES = 120
+
+    def __init__(self, max_queued_frames=MAX_QUEUED_FRAMES):
+        self.queue = queue.Queue(max_queued_frames)
+        self.output = DeferredOutput(sys.stdout)
+        self.thread = threading.Thread(
+            target=self.__run, name='AnalyzerWorker', daemon=True
+        )
+        self.output.thread = self.thread
+        sys.stdout = self.output
+        self.thread.start()
+
+    def submit(self, game_state, deferred_slots):
+        view = copy.copy(game_state)
+        view.state_log = list(game_state.state_log)
+        view.mirrored_state_log = list(game_state.mirrored_state_log)
+        view.futurestate_log = None
+        view.edge_triggers = game_state.edge_triggers.copy()
+        try:
+            self.queue.put_nowait((view, deferred_slots))
+        except queue.Full:
+            for slot, _ in deferred_slots:
+                slot.dropped += 1
+
+    def write_output(self):
+        self.output.write_pending()
+
+    def stop(self):
+        self.queue.put(None)
+        self.thread.join()
+        self.output.write_pending()
+        if sys.stdout is self.output:
+            sys.stdout = self.output.stream
+
+    def __run(self):
+        while True:
+            job = self.queue.get()
+            if job is None:
+                return
+            view, deferred_slots = job
+            for slot, inputs_unchanged in deferred_slots:
+                slot.run(view, inputs_unchanged)
+
+class AnalyzerPipeline:
+    """
+    Analyzers run in the order they were registered. With background set to
+    False nothing is ever deferred, as in a replay, where there is no
+    deadline and results have to be deterministic.
+    """
+    FRAME_DEADLINE = 1 / 60
+    OVERRUNS_TO_DEFER = 3
+
+    __logger = None
+
+    def __init__(self, background=True, frame_deadline=FRAME_DEADLINE):
+        if AnalyzerPipeline.__logger is None:
+            AnalyzerPipeline.__logger = LogUtils.initialize_module_logger(
+                __name__
+            )
+        self.background = background
+        self.frame_deadline = frame_deadline
+        self.frames = 0
+        self.late_frames = 0
+        self.last_frame_seconds = 0
+        self.__slots = []
+        self.__worker = None
+        self.__frame_count = None
+        self.__frame_overruns = 0
+
+    def register(self, analyzer):
+        self.__slots.append(AnalyzerSlot(analyzer))
+        return analyzer
+
+    def unregister(self, analyzer):
+        self.__slots = [
+            slot for slot in self.__slots if slot.analyzer is not analyzer
+        ]
+
+    def get_analyzers(self):
+        return [slot.analyzer for slot in self.__slots]
+
+    def update(self, game_state):
+        start = time.perf_counter()
+        last_state = game_state.state_log[-1]
+        restarted = (
+            self.__frame_count is None
+            or last_state.frame_count <= self.__frame_count
+        )
+        self.__frame_count = last_state.frame_count
+
+        deferred_slots = []
+        for slot in self.__slots:
+            inputs_unchanged = slot.track_inputs(last_state, restarted)
+            if slot.is_deferred:
+                deferred_slots.append((slot, inputs_unchanged))
+            else:
+                slot.run(game_state, inputs_unchanged)
+        if deferred_slots:
+            self.__worker.submit(game_state, deferred_slots)
+            self.__worker.write_output()
+
+        self.frames += 1
+        self.last_frame_seconds = time.perf_counter() - start
+        if self.last_frame_seconds > self.frame_deadline:
+            self.late_frames += 1
+            self.__frame_overruns += 1
+        else:
+            self.__frame_overruns = 0
+        if self.background:
+            self.__defer_overrunning()
+
+    def get_timings(self):
+        return [slot.get_timing() for slot in self.__slots]
+
+    def get_seconds(self):
+        """
+        Seconds spent per analyzer, in the order they run.
+        """
+        return OrderedDict(
+            (slot.name, slot.seconds) for slot in self.__slots
+        )
+
+    def stop(self):
+        if self.__worker is not None:
+            self.__worker.stop()
+            self.__worker = None
+            for slot in self.__slots:
+                slot.is_deferred = False
+
+    def __defer_overrunning(self):
+        foreground = [slot for slot in self.__slots if not slot.is_deferred]
+        for slot in foreground:
+            if slot.overruns >= AnalyzerPipeline.OVERRUNS_TO_DEFER:
+                self.__defer(slot)
+        if(
+                self.__frame_overruns >= AnalyzerPipeline.OVERRUNS_TO_DEFER
+                and foreground
+        ):
+            self.__defer(
+                max(foreground, key=lambda slot: slot.last_seconds)
+            )
+            self.__frame_overruns = 0
+
+    def __defer(self, overrunning_slot):
+        if overrunning_slot.is_deferred:
+            return
+        group = overrunning_slot.analyzer.group
+        for slot in self.__slots:
+            if slot is overrunning_slot or (
+                    group is not None and slot.analyzer.group is group
+            ):
+                slot.is_deferred = True
+                slot.overruns = 0
+                self.__logger.info(
+                    '%s deferred to the background, %s took %.2f ms for a '
+                    '%.2f ms budget', slot.name, overrunning_slot.name,
+                    1000 * overrunning_slot.last_seconds,
+                    1000 * overrunning_slot.analyzer.budget
+                )
+        if self.__worker is None:
+            self.__worker = AnalyzerWorker()
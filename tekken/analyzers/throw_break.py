@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2019, Alchemy Meister
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     * Redistributions of source code must retain the above copyright notice,
+#       this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice,this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its
+#       contributors may be used to endorse or promote products derived from
+#       this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Throw break and reaction analysis over the frames TekkenGameState appends.
+
+A throw event opens on the frame the bot starts being thrown. Its throw tech,
+the button that breaks it, is taken with get_bot_throw_tech. The reaction is
+the first 1 or 2 the bot presses after that, counted in frames from the start
+of the throw.
+"""
+from collections import deque, namedtuple
+import statistics
+
+from constants.battle import ThrowBreakResult
+from constants.input import InputAttack
+from MoveInfoEnums import ThrowTechs
+
+from ..game_state import TekkenGameState
+from .analyzer import Analyzer
+
+ThrowBreakEvent = namedtuple(
+    'ThrowBreakEvent',
+    [
+        'frame_count', 'throw_tech', 'opp_move_id', 'result',
+        'reaction_frames', 'input_button'
+    ]
+)
+ThrowBreakStatistics = namedtuple(
+    'ThrowBreakStatistics',
+    [
+        'events', 'breakable', 'broken', 'break_rate', 'reactions',
+        'mean_reaction_frames', 'median_reaction_frames',
+        'stdev_reaction_frames'
+    ]
+)
+
+class ThrowBreakAnalyzer(Analyzer):
+    """
+    Looks at the last two frames of the state log only, so its cost per frame
+    does not depend on the length of the log. While no throw is open, only an
+    attack type change can start one. Both sides are listed, the pipeline
+    reads them before the log is flipped for player one.
+    """
+    fields = ('bot.attack_type', 'opp.attack_type')
+    history = 1
+    budget = 0.0005
+
+    BREAK_WINDOW = 20
+    ROLLING_EVENTS = 50
+
+    BREAK_BUTTONS = {
+        ThrowTechs.TE1: InputAttack.B_1.value,
+        ThrowTechs.TE2: InputAttack.B_2.value,
+        ThrowTechs.TE1_2: InputAttack.B_1_PLUS_2.value,
+    }
+    REACTION_BUTTONS = InputAttack.B_1_PLUS_2.value
+
+    def __init__(
+            self, is_player_one=False, break_window=BREAK_WINDOW,
+            rolling_events=ROLLING_EVENTS
+    ):
+        self.is_player_one = is_player_one
+        self.name = '{} throw breaks'.format('p1' if is_player_one else 'p2')
+        self.break_window = break_window
+        self.events = deque(maxlen=rolling_events)
+        self.total_events = 0
+        self.__throw_frame_count = None
+        self.__throw_tech = ThrowTechs.NONE
+        self.__opp_move_id = None
+
+    def update(self, game_state: TekkenGameState):
+        if self.is_player_one:
+            game_state.flip_mirror()
+        try:
+            self.__determine_throw_break(game_state)
+        finally:
+            if self.is_player_one:
+                game_state.flip_mirror()
+
+    def is_idle(self, game_state):
+        return self.__throw_frame_count is None
+
+    def __determine_throw_break(self, game_state):
+        state_log = game_state.state_log
+        if len(state_log) < 2:
+            return
+        last_state = state_log[-1]
+
+        if self.__throw_frame_count is None:
+            if game_state.is_bot_started_being_thrown():
+                self.__throw_frame_count = last_state.frame_count
+                self.__throw_tech = game_state.get_bot_throw_tech(1)
+                self.__opp_move_id = last_state.opp.move_id
+            return
+
+        frames = last_state.frame_count - self.__throw_frame_count
+        if frames < 0:
+            # the frame count went back, a new battle started
+            self.__throw_frame_count = None
+            return
+        if self.__throw_tech == ThrowTechs.NONE:
+            self.__throw_tech = game_state.get_bot_throw_tech(1)
+
+        pressed = (
+            last_state.bot.input_button.value
+            & ~state_log[-2].bot.input_button.value
+            & ThrowBreakAnalyzer.REACTION_BUTTONS
+        )
+        if pressed:
+            held = last_state.bot.input_button.value
+            if self.__throw_tech == ThrowTechs.NONE:
+                result = ThrowBreakResult.UNBREAKABLE
+            else:
+                break_buttons = (
+                    ThrowBreakAnalyzer.BREAK_BUTTONS[self.__throw_tech]
+                )
+                if held & break_buttons != break_buttons:
+                    result = ThrowBreakResult.WRONG_BUTTON
+                elif frames > self.break_window:
+                    result = ThrowBreakResult.LATE
+                else:
+                    result = ThrowBreakResult.BROKEN
+            self.__close_event(
+                result, frames, last_state.bot.input_button
+            )
+        elif frames > self.break_window and (
+                not game_state.is_bot_being_thrown()
+        ):
+            self.__close_event(
+                ThrowBreakResult.NO_REACTION
+                if self.__throw_tech != ThrowTechs.NONE
+                else ThrowBreakResult.UNBREAKABLE,
+                None, None
+            )
+
+    def __close_event(self, result, reaction_frames, input_button):
+        self.events.append(ThrowBreakEvent(
+            self.__throw_frame_count, self.__throw_tech, self.__opp_move_id,
+            result, reaction_frames, input_button
+        ))
+        self.total_events += 1
+        self.__throw_frame_count = None
+        self.__throw_tech = ThrowTechs.NONE
+
+    def get_last_event(self):
+        return self.events[-1] if self.events else None
+
+    def get_statistics(self):
+        """
+        Statistics over the last rolling_events throws. Reaction times count
+        every throw the bot pressed a button for, break_rate only the
+        breakable ones.
+        """
+        breakable = [
+            event for event in self.events
+            if event.result != ThrowBreakResult.UNBREAKABLE
+        ]
+        broken = sum(
+            1 for event in breakable
+            if event.result == ThrowBreakResult.BROKEN
+        )
+        reactions = [
+            event.reaction_frames for event in self.events
+            if event.result.is_reaction
+        ]
+        return ThrowBreakStatistics(
+            len(self.events), len(breakable), broken,
+            broken / len(breakable) if breakable else None,
+            len(reactions),
+            statistics.mean(reactions) if reactions else None,
+            statistics.median(reactions) if reactions else None,
+            statistics.pstdev(reactions) if reactions else None
+        )
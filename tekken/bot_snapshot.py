@@ -30,11 +30,13 @@
 """
 """
 
-from constants.battle import BattleSide, CharacterIDs
+from constants.battle import BattleSide, CharacterIDs, TechnicalState
 from constants.input import InputAttack, InputDirection
 
 from log import LogUtils
 
+from .move_chain import MoveChain
+
 # pylint: disable=unused-wildcard-import,wildcard-import
 from MoveInfoEnums import *  # NOQA
 
@@ -132,6 +134,12 @@ class BotSnapshot:
             data_dict['PlayerDataAddress.x'], data_dict['PlayerDataAddress.y'],
             data_dict['PlayerDataAddress.z']
         )
+        # the last joint of the skeleton is used as the position of the player
+        self.position = (self.skeleton[0][-1], self.skeleton[2][-1])
+        self.center = (
+            sum(self.skeleton[0]) / len(self.skeleton[0]),
+            sum(self.skeleton[2]) / len(self.skeleton[2])
+        )
 
         self.active_xyz = (
             data_dict['PlayerDataAddress.activebox_x'],
@@ -167,6 +175,7 @@ class BotSnapshot:
 
         self.use_opponents_movelist = data_dict['use_opponent_movelist']
         self.movelist_parser = data_dict['movelist_parser']
+        self.move_chain = None
 
         try:
             self.character_name = CharacterIDs(
@@ -175,11 +184,55 @@ class BotSnapshot:
         except KeyError:
             self.character_name = "UNKNOWN"
 
+        self.technical_states = self.__pack_technical_states()
+
     # def print_y_info(self):
     #     print('{:.4f}, {:.4f}, {:.4f}'.format(
     #         self.highest_y, self.lowest_y, self.highest_y - self.lowest_y)
     #     )
 
+    def __pack_technical_states(self):
+        technical_states = 0
+        if self.is_technical_crouch():
+            technical_states |= TechnicalState.TC.value
+        if self.is_technical_jump():
+            technical_states |= TechnicalState.TJ.value
+        if self.is_bufferable:
+            technical_states |= TechnicalState.BUF.value
+        if self.is_cancelable:
+            technical_states |= TechnicalState.CANCEL.value
+        if self.is_power_crush:
+            technical_states |= TechnicalState.PC.value
+        if self.is_homing1():
+            technical_states |= TechnicalState.HOM1.value
+        if self.is_homing2():
+            technical_states |= TechnicalState.HOM2.value
+        if self.is_parry1:
+            technical_states |= TechnicalState.PY1.value
+        if self.is_parry2:
+            technical_states |= TechnicalState.PY2.value
+        return technical_states
+
+    def update_move_timer_transition(self, previous_bot):
+        """
+        Packs how the move timer moved since the previous frame of the same
+        player into the technical states.
+        """
+        if self.move_timer != previous_bot.move_timer + 1:
+            self.technical_states |= TechnicalState.SKIP.value
+        if self.move_timer == previous_bot.move_timer:
+            self.technical_states |= TechnicalState.FROZEN.value
+
+    def update_move_chain(self, previous_bot=None):
+        """
+        Extends the move chain of the previous frame of the same player with
+        the current move.
+        """
+        self.move_chain = MoveChain.advance(
+            previous_bot.move_chain if previous_bot else None,
+            self.movelist_parser, self.move_id
+        )
+
     def is_character_name_loaded(self):
         """
 
@@ -29,7 +29,6 @@
 
 """
 """
-from constants.battle import PunishResult
 from constants.event import PunishWindowEvent
 from patterns.observer import Publisher, Subscriber
 from patterns.singleton import Singleton
@@ -57,14 +56,8 @@ class PunishCoach(metaclass=Singleton):
                 cyclopedia = self.__launcher.cyclopedia_p1
 
             last_punish_window = self.__current_punish_window
-            self.__current_punish_window = next(
-                (
-                    punish_window for punish_window in reversed(
-                        cyclopedia.punish_windows
-                    )
-                    if punish_window.result != PunishResult.NOT_YET_CLOSED
-                ),
-                None
+            self.__current_punish_window = (
+                cyclopedia.punish_windows.last_closed
             )
 
             if self.__current_punish_window:
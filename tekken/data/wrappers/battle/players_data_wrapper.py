@@ -45,6 +45,8 @@ class PlayersDataWrapper(StructWrapper):
     def __get_player(self, player_flag):
         return {
             attr_name: attr_value
-            for attr_name, attr_value in vars(self).items()
+            for attr_name, attr_value in zip(
+                self.get_field_names(), self.as_tuple()
+            )
             if attr_name.startswith(player_flag)
         }
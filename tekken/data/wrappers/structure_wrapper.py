@@ -29,45 +29,34 @@
 
 """
 """
+from collections import namedtuple
 from enum import Enum
+from operator import attrgetter
 import struct
 from win32.defines import SIZE_OF, Structure, Union
 from win32.utils import type_limits
 
+StructCodec = namedtuple(
+    'StructCodec', ['struct', 'field_names', 'default_values', 'get_values']
+)
+
 class StructWrapper():
     """
     """
+    __codecs = {}
+
     def __init__(self, structure, block_bytes=None):
         self.__structure = structure
+        self.__codec = StructWrapper.get_codec(structure)
         if block_bytes:
-            offset = 0
-            for field in StructWrapper.__flatten(
-                    StructWrapper.__get_all_structure_primitive_fields(
-                        structure
-                    )
-            ):
-                size = offset + SIZE_OF(field[1])
-                if not field[0].startswith('_'):
-                    t_bytes = block_bytes[offset:size]
-                    struct_format = type_limits.C_ALL_TYPES_FORMAT[field[1]]
-                    setattr(
-                        self,
-                        field[0],
-                        struct.unpack(struct_format, t_bytes)[0]
-                    )
-                offset = size
+            values = self.__codec.struct.unpack_from(memoryview(block_bytes))
         else:
-            self.__default_attributes_initialization(
-                StructWrapper.__get_all_structure_primitive_fields(structure),
-                structure()
-            )
+            values = self.__codec.default_values
+        vars(self).update(zip(self.__codec.field_names, values))
 
     def __eq__(self, wrapper):
         if isinstance(wrapper, self.__class__):
-            return all(
-                getattr(wrapper, attr_name) == attr_value
-                for attr_name, attr_value in vars(self).items()
-            )
+            return self.as_tuple() == wrapper.as_tuple()
         return NotImplemented
 
     def __ne__(self, wrapper):
@@ -89,22 +78,62 @@ class StructWrapper():
             )
         )
 
+    def as_tuple(self):
+        """
+        Current values of the structure fields, in structure order.
+        """
+        return self.__codec.get_values(self)
+
+    def get_field_names(self):
+        return self.__codec.field_names
+
     def get_structure_size(self):
         return SIZE_OF(self.__structure)
 
-    def __default_attributes_initialization(self, dictionary, structure=None):
-        for key, value in dictionary.items():
-            if isinstance(value, dict):
-                self.__default_attributes_initialization(
-                    value, getattr(structure, key)
-                )
-            elif isinstance(value, list):
-                for sub_value in value:
-                    self.__default_attributes_initialization(
-                        sub_value, getattr(structure, key)
-                    )
+    @staticmethod
+    def get_codec(structure):
+        """
+        Returns the codec of the structure, compiled on its first use.
+        """
+        codec = StructWrapper.__codecs.get(structure)
+        if codec is None:
+            codec = StructWrapper.__compile_codec(structure)
+            StructWrapper.__codecs[structure] = codec
+        return codec
+
+    @staticmethod
+    def __compile_codec(structure):
+        # fields are laid out back to back, private fields become pad bytes
+        struct_format = ['<']
+        field_names = []
+        padding = 0
+        for field_name, field_type in StructWrapper.__flatten(
+                StructWrapper.__get_all_structure_primitive_fields(structure)
+        ):
+            if field_name.startswith('_'):
+                padding += SIZE_OF(field_type)
             else:
-                setattr(self, key, getattr(structure, key))
+                if padding:
+                    struct_format.append('{}x'.format(padding))
+                    padding = 0
+                struct_format.append(
+                    type_limits.C_ALL_TYPES_FORMAT[field_type][1:]
+                )
+                field_names.append(field_name)
+        compiled_struct = struct.Struct(''.join(struct_format))
+
+        if len(field_names) > 1:
+            get_values = attrgetter(*field_names)
+        else:
+            get_field_values = attrgetter(*field_names) if field_names else None
+            get_values = lambda wrapper: (
+                (get_field_values(wrapper),) if get_field_values else ()
+            )
+
+        return StructCodec(
+            compiled_struct, tuple(field_names),
+            compiled_struct.unpack(bytes(compiled_struct.size)), get_values
+        )
 
     @staticmethod
     def __flatten(dictionary):
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2019, Alchemy Meister
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     * Redistributions of source code must retain the above copyright notice,
+#       this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice,this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its
+#       contributors may be used to endorse or promote products derived from
+#       this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Edge triggers over the frames TekkenGameState appends.
+
+An EdgeRule is a transition declared once, as a predicate over snapshot fields
+taken at frame offsets, 0 being the frame just appended and 1 the one before.
+EdgeTriggers compiles the rules so every field they read is taken once per
+appended frame, for the game's point of view and the mirrored one alike, then
+evaluates every rule on those values. The frames a rule fired on are kept for
+as long as the state log holds them, so asking if it fired some frames ago
+does not read the log again.
+"""
+from collections import deque
+from operator import attrgetter, itemgetter
+
+from patterns.observer import Publisher
+
+class EdgeRule:
+    """
+    terms are (field, offset) pairs, a field being a snapshot attribute path
+    such as 'opp.combo_counter', or a method path ending with '()' such as
+    'bot.is_getting_hit()'. predicate takes the values of the terms in order.
+    """
+    def __init__(self, name, terms, predicate):
+        self.name = name
+        self.terms = tuple(terms)
+        self.predicate = predicate
+        self.history = max(offset for _, offset in self.terms) + 1
+
+    def __repr__(self):
+        return 'EdgeRule({!r}, {!r})'.format(self.name, self.terms)
+
+class EdgeTriggers:
+    """
+    Fed with every snapshot appended to the state log, as the game sees it.
+    The mirrored point of view, where bot and opp are swapped, is the one
+    TekkenGameState.flip_mirror switches to.
+
+    A subscriber registered on a rule name with publisher, or with
+    mirrored_publisher, is called with the snapshot the rule fired on.
+    """
+    PLAYERS = ('bot.', 'opp.')
+
+    def __init__(self, rules, log_length):
+        self.rules = tuple(rules)
+        self.publisher = Publisher(*(rule.name for rule in self.rules))
+        self.mirrored_publisher = Publisher(
+            *(rule.name for rule in self.rules)
+        )
+        self.is_mirrored = False
+        self.log_length = log_length
+        self.__rule_indices = {
+            rule.name: index for index, rule in enumerate(self.rules)
+        }
+        self.__frame = 0
+        self.__frames_offsets = [0, 0]
+        self.__fired = [
+            [set() for _ in self.rules], [set() for _ in self.rules]
+        ]
+        self.__firings = deque()
+
+        fields = []
+        for rule in self.rules:
+            for field, _ in rule.terms:
+                for player_field in (field, EdgeTriggers.__mirror(field)):
+                    if player_field not in fields:
+                        fields.append(player_field)
+        self.__getters = tuple(
+            EdgeTriggers.__compile_field(field) for field in fields
+        )
+        self.__history = max((rule.history for rule in self.rules), default=1)
+        self.__values = deque(maxlen=self.__history)
+        self.__compiled_rules = tuple(
+            tuple(
+                (
+                    index, rule.history, rule.predicate,
+                    EdgeTriggers.__compile_terms(
+                        tuple(
+                            offset * len(fields) + fields.index(
+                                EdgeTriggers.__mirror(field)
+                                if is_mirrored else field
+                            )
+                            for field, offset in rule.terms
+                        )
+                    )
+                )
+                for index, rule in enumerate(self.rules)
+            )
+            for is_mirrored in (False, True)
+        )
+
+    def update(self, snapshot, mirrored_snapshot):
+        values = self.__values
+        values.appendleft(tuple(getter(snapshot) for getter in self.__getters))
+        available_frames = len(values)
+        window = sum(values, ())
+        self.__frame += 1
+        frame = self.__frame
+
+        firings = self.__firings
+        while firings and firings[0][0] <= frame - self.log_length + 1:
+            old_frame, is_mirrored, index = firings.popleft()
+            self.__fired[is_mirrored][index].discard(old_frame)
+
+        for is_mirrored, compiled_rules in enumerate(self.__compiled_rules):
+            fired = self.__fired[is_mirrored]
+            for index, history, predicate, get_terms in compiled_rules:
+                if(
+                        available_frames >= history
+                        and predicate(*get_terms(window))
+                ):
+                    firings.append((frame, is_mirrored, index))
+                    fired[index].add(frame)
+                    if is_mirrored:
+                        self.mirrored_publisher.dispatch(
+                            self.rules[index].name, mirrored_snapshot
+                        )
+                    else:
+                        self.publisher.dispatch(
+                            self.rules[index].name, snapshot
+                        )
+
+    def fired(self, name, frames_ago=1):
+        """
+        Whether the rule fired on the frame that is now frames_ago frames from
+        the end of the state log, 1 being its last frame.
+        """
+        frames_ago += self.__frames_offsets[self.is_mirrored]
+        return (
+            frames_ago < self.log_length
+            and self.__frame - frames_ago + 1
+            in self.__fired[self.is_mirrored][self.__rule_indices[name]]
+        )
+
+    def flip_mirror(self):
+        self.is_mirrored = not self.is_mirrored
+
+    def back_to_the_future(self, frames):
+        self.__frames_offsets[self.is_mirrored] = frames
+
+    def return_to_present(self):
+        self.__frames_offsets[self.is_mirrored] = 0
+
+    def copy(self):
+        """
+        A copy that keeps what fired so far and is not updated any more. The
+        publishers are shared.
+        """
+        edge_triggers = object.__new__(EdgeTriggers)
+        edge_triggers.__dict__.update(self.__dict__)
+        edge_triggers.__frames_offsets = list(self.__frames_offsets)
+        edge_triggers.__fired = [
+            [set(frames) for frames in fired] for fired in self.__fired
+        ]
+        edge_triggers.__firings = deque()
+        edge_triggers.__values = deque(self.__values, self.__history)
+        return edge_triggers
+
+    @staticmethod
+    def __mirror(field):
+        bot, opp = EdgeTriggers.PLAYERS
+        if field.startswith(bot):
+            return opp + field[len(bot):]
+        if field.startswith(opp):
+            return bot + field[len(opp):]
+        return field
+
+    @staticmethod
+    def __compile_field(field):
+        if field.endswith('()'):
+            method_getter = attrgetter(field[:-2])
+            return lambda snapshot: method_getter(snapshot)()
+        return attrgetter(field)
+
+    @staticmethod
+    def __compile_terms(positions):
+        if len(positions) == 1:
+            position = positions[0]
+            return lambda window: (window[position],)
+        return itemgetter(*positions)
@@ -3,6 +3,7 @@ Collects information from tekken_game_state over time in hopes of synthesizing
 it and presenting it in a more useful way.
 
 """
+from collections import Counter, deque
 from enum import Enum
 import sys
 import time
@@ -37,7 +38,7 @@ class TekkenEncyclopedia:
             self.load_stats()
 
         self.current_punish_window = None
-        self.punish_windows = []
+        self.punish_windows = PunishWindowHistory()
         self.current_frame_data_entry = None
         self.previous_frame_data_entry = None
 
@@ -234,12 +235,16 @@ class TekkenEncyclopedia:
                         and startup <= BAD_PUNISH_THRESHOLD
                 ):
                     self.close_punish_window(
-                        PunishResult.NO_LAUNCH_ON_LAUNCHABLE
+                        PunishResult.NO_LAUNCH_ON_LAUNCHABLE, leeway=leeway
                     )
                 elif frame_advantage >= LAUNCH_PUNISHIBLE:
-                    self.close_punish_window(PunishResult.LAUNCH_ON_LAUNCHABLE)
+                    self.close_punish_window(
+                        PunishResult.LAUNCH_ON_LAUNCHABLE, leeway=leeway
+                    )
                 else:
-                    self.close_punish_window(PunishResult.JAB_ON_NOT_LAUNCHABLE)
+                    self.close_punish_window(
+                        PunishResult.JAB_ON_NOT_LAUNCHABLE, leeway=leeway
+                    )
             elif(
                     game_state.has_opp_returned_to_neutral_from_move_id(
                         self.current_punish_window.move_id
@@ -262,8 +267,11 @@ class TekkenEncyclopedia:
                 #   game_state.was_bot_move_on_last_frame_x_frames_ago(2)
                 # )
 
-    def close_punish_window(self, result, do_close_frame_data_entries=True):
-        self.current_punish_window.close_window(result)
+    def close_punish_window(
+            self, result, do_close_frame_data_entries=True, leeway=None
+    ):
+        self.current_punish_window.close_window(result, leeway)
+        self.punish_windows.close(self.current_punish_window)
         self.current_punish_window = None
         if do_close_frame_data_entries:
             self.previous_frame_data_entry = None
@@ -575,7 +583,12 @@ class TekkenEncyclopedia:
                             frame_data_entry.startup
                         )
                     )
-                    # print(game_state.get_range_of_move())
+                    _, frame_data_entry.range = (
+                        game_state.get_range_of_move()
+                    )
+                    frame_data_entry.whiff_distance = (
+                        game_state.get_opp_whiff_distance()
+                    )
                     game_state.return_to_present()
 
                     # frame_data_entry.throwTech = (
@@ -656,6 +669,8 @@ class FrameDataEntry:
         self.hitRecovery = '??'
         self.throwTech = None
         self.tracking = ComplexMoveStates.F_MINUS
+        self.range = None
+        self.whiff_distance = None
 
     def WithPlusIfNeeded(self, value):
         try:
@@ -700,7 +715,10 @@ class FrameDataEntry:
                     notes += str(report)
         nerd_string = ""
         if self.print_extended:
-            pass
+            if self.range is not None:
+                notes += 'range {:.2f} whiff {:.2f} '.format(
+                    self.range, self.whiff_distance
+                )
             #notes += ' stun {}'.format(self.blockRecovery)
             #notes += ' a_recovery {}'.format(self.hitRecovery)
             #notes += "Total:" + str(self.recovery) + "f "
@@ -842,6 +860,7 @@ class PunishWindow:
         self.upcoming_lock = False
         self.frames_locked = 0
         self.result = PunishResult.NOT_YET_CLOSED
+        self.leeway = None
 
     def get_frame_advantage(self):
         if not self.is_window_locked:
@@ -874,9 +893,55 @@ class PunishWindow:
             )
             self.original_diff = self.get_frame_advantage()
 
-    def close_window(self, result: PunishResult):
+    def close_window(self, result: PunishResult, leeway=None):
         self.result = result
+        self.leeway = leeway
         if result != PunishResult.NO_WINDOW:
             sys.stdout.write(
                 'Closing punish window, result: {}'.format(self.result.name)
             )
+
+class PunishWindowHistory:
+    """
+    Keeps the latest punish windows of a session in a fixed size ring,
+    together with a pointer to the most recently closed one and counters that
+    summarize every window closed so far.
+    """
+    MAX_PUNISH_WINDOWS = 64
+
+    def __init__(self, max_punish_windows=MAX_PUNISH_WINDOWS):
+        self.__punish_windows = deque(maxlen=max_punish_windows)
+        self.last_closed = None
+        self.result_counter = Counter()
+        self.__total_leeway = 0
+        self.__leeway_count = 0
+
+    def __len__(self):
+        return len(self.__punish_windows)
+
+    def __iter__(self):
+        return iter(self.__punish_windows)
+
+    def __reversed__(self):
+        return reversed(self.__punish_windows)
+
+    def append(self, punish_window):
+        self.__punish_windows.append(punish_window)
+
+    def close(self, punish_window):
+        self.last_closed = punish_window
+        self.result_counter[punish_window.result] += 1
+        if punish_window.leeway is not None:
+            self.__total_leeway += punish_window.leeway
+            self.__leeway_count += 1
+
+    def count(self, result: PunishResult):
+        return self.result_counter[result]
+
+    def get_missed_launch_punishes(self):
+        return self.result_counter[PunishResult.NO_LAUNCH_ON_LAUNCHABLE]
+
+    def get_average_leeway(self):
+        if self.__leeway_count:
+            return self.__total_leeway / self.__leeway_count
+        return None
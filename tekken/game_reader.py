@@ -30,12 +30,16 @@
 """
 
 """
+from concurrent.futures import ThreadPoolExecutor
 import traceback
 import sys
 import struct
 
 from constants.battle.side import BattleSide
 from constants.battle.main_menus import MainMenus
+from constants.event import MovelistEvent
+
+from patterns.observer import Publisher
 
 # pylint: disable=unused-wildcard-import,wildcard-import
 from win32.defines import *  #NOQA
@@ -55,8 +59,9 @@ from .data.wrappers.graphic_settings import (
 )
 from .bot_snapshot import BotSnapshot
 from .game_snapshot import GameSnapshot
-from .parsers import MovelistParser
+from .parsers import MovelistCache, MovelistParser
 from .process_identifier import ProcessIO
+from .recording import FrameRecorder
 
 class TekkenGameReader(ProcessIO):
     """
@@ -80,6 +85,13 @@ class TekkenGameReader(ProcessIO):
         self.p2_movelist_parser = None
         self.p1_movelist_names = None
         self.p2_movelist_names = None
+        self.movelist_cache = MovelistCache()
+        self.movelist_publisher = Publisher(MovelistEvent)
+        self.__movelist_executor = ThreadPoolExecutor(max_workers=2)
+        self.__movelist_futures = None
+        self.movelist_identity = ()
+        self.frame_recorder = None
+        self.record_frames = False
 
         self.game_mode = None
         self.is_in_battle = False
@@ -95,6 +107,7 @@ class TekkenGameReader(ProcessIO):
         self.reacquire_game_state = True
         self.reacquire_names = True
         self.window_handle = 0
+        self.__movelist_futures = None
 
     def get_value_from_address(
             self, address, is_float=False, is_64bit=False, is_string=False
@@ -371,6 +384,8 @@ class TekkenGameReader(ProcessIO):
                     #     self.get_players_pad_controller_input()
                     # )
 
+                self.__collect_movelists()
+
                 player_data_base_address = self.module_address
                 for i, offset in enumerate(self.player_data_pointer_offset):
                     player_data_base_address = self.get_pointer_value(
@@ -385,6 +400,8 @@ class TekkenGameReader(ProcessIO):
                             'No fight detected. Gamestate not updated.'
                         )
                         self.is_in_battle = False
+                        if self.record_frames:
+                            self.stop_frame_recording()
                     self.reacquire_game_state = True
                     self.reacquire_names = True
                     try:
@@ -447,6 +464,14 @@ class TekkenGameReader(ProcessIO):
                         self.config['GameDataAddress']['timer_in_frames']
                     )
                     p1_bot, p2_bot = self.initialize_bots(player_data_frame)
+                    if self.record_frames and self.reacquire_game_state:
+                        self.start_frame_recording()
+                    frame_recorder = self.frame_recorder
+                    if frame_recorder is not None:
+                        frame_recorder.record(
+                            player_data_frame, best_frame_count,
+                            timer_in_frames, self.movelist_identity
+                        )
 
                     if self.reacquire_game_state:
                         self.reacquire_game_state = False
@@ -489,38 +514,9 @@ class TekkenGameReader(ProcessIO):
                                 p2_bot.get_movelist_to_use()
                             )
 
-                            p1_movelist_block, p1_movelist_address = (
-                                self.populate_movelists('p1_movelist')
+                            self.request_movelists(
+                                p1_bot.character_name, p2_bot.character_name
                             )
-                            p2_movelist_block, p2_movelist_address = (
-                                self.populate_movelists('p2_movelist')
-                            )
-
-                            self.p1_movelist_parser = (
-                                MovelistParser(
-                                    p1_movelist_block, p1_movelist_address
-                                )
-                            )
-                            self.p2_movelist_parser = (
-                                MovelistParser(
-                                    p2_movelist_block, p2_movelist_address
-                                )
-                            )
-
-                            # self.write_movelists_to_file(
-                            #    p1_movelist_block, p1_bot.character_name
-                            # )
-                            # self.write_movelists_to_file(
-                            #    p2_movelist_block, p2_bot.character_name
-                            # )
-                            # TODO: figure out the actual size of the name
-                            # movelist
-                            self.p1_movelist_names = p1_movelist_block[
-                                0x2E8:200000
-                            ].split(b'\00')
-                            self.p2_movelist_names = p2_movelist_block[
-                                0x2E8:200000
-                            ].split(b'\00')
                             #sys.stdout.write(p1_movelist_names[(1572 * 2)])
 
                             self.reacquire_names = False
@@ -639,25 +635,129 @@ class TekkenGameReader(ProcessIO):
 
         return p1_bot, p2_bot
 
-    def write_movelists_to_file(self, movelist, name):
+    def write_movelists_to_file(self, movelist, movelist_address, name):
         """
+        The movelist address is kept in the file name, the parser needs it to
+        resolve the header pointers.
         """
-        with open('RawData/' + name + ".dat", 'wb') as file:
+        file_name = '{}_{:x}.dat'.format(name, movelist_address)
+        with open('RawData/' + file_name, 'wb') as file:
             file.write(movelist)
 
-    def populate_movelists(self, data_type):
+    def request_movelists(self, p1_character_name, p2_character_name):
         """
+        Reads both movelists in the background. Frames are delivered without
+        movelist parsers until both are ready.
         """
-        movelist_trail = self.config["NonPlayerDataAddresses"][data_type]
-        movelist_address = self.get_value_from_address(
-            self.module_address + movelist_trail[0],
-            is_64bit=True
+        self.p1_movelist_parser = None
+        self.p2_movelist_parser = None
+        self.p1_movelist_names = None
+        self.p2_movelist_names = None
+        self.movelist_identity = ()
+        self.__movelist_futures = (
+            self.__movelist_executor.submit(
+                self.load_movelist, 'p1_movelist', p1_character_name
+            ),
+            self.__movelist_executor.submit(
+                self.load_movelist, 'p2_movelist', p2_character_name
+            ),
+        )
+
+    def __collect_movelists(self):
+        if self.__movelist_futures is None or not all(
+                future.done() for future in self.__movelist_futures
+        ):
+            return
+        p1_future, p2_future = self.__movelist_futures
+        self.__movelist_futures = None
+        try:
+            p1_movelist_parser, p1_movelist_identity = p1_future.result()
+            p2_movelist_parser, p2_movelist_identity = p2_future.result()
+        except (OSError, struct.error, TypeError, ValueError, IndexError):
+            traceback.print_exc()
+            self.reacquire_names = True
+            return
+
+        self.p1_movelist_parser = p1_movelist_parser
+        self.p2_movelist_parser = p2_movelist_parser
+        self.p1_movelist_names = p1_movelist_parser.names
+        self.p2_movelist_names = p2_movelist_parser.names
+        self.movelist_identity = (p1_movelist_identity, p2_movelist_identity)
+        self.movelist_publisher.dispatch(
+            MovelistEvent.LOADED, p1_movelist_parser, p2_movelist_parser
+        )
+
+    def load_movelist(self, data_type, character_name):
+        """
+        Movelist worker, it reads through its own process handle. Returns the
+        parser and the identity of the movelist in the movelist cache.
+        """
+        process_handle = kernel32.open_process(
+            kernel32.PROCESS_VM_READ, False, self.pid
+        )
+        try:
+            return self.acquire_movelist(
+                process_handle, data_type, character_name
+            )
+        finally:
+            kernel32.close_handle(process_handle)
+
+    def acquire_movelist(self, process_handle, data_type, character_name):
+        """
+        Only the movelist header is read when the movelist has already been
+        parsed and cached, the whole movelist is read and parsed otherwise.
+        Returns the parser and the identity of the movelist in the cache.
+        """
+        movelist_address = self.get_movelist_address(process_handle, data_type)
+        if not movelist_address:
+            raise OSError('{} address not found'.format(data_type))
+        movelist_size = self.config["MemoryAddressOffsets"]["movelist_size"]
+        header_hash = MovelistCache.get_header_hash(
+            kernel32.read_process_memory(
+                process_handle, movelist_address, MovelistParser.HEADER_LENGTH
+            ),
+            movelist_address, movelist_size
+        )
+        movelist_parser = self.movelist_cache.load(
+            character_name, header_hash
+        )
+        if movelist_parser is None:
+            movelist_block = kernel32.read_process_memory(
+                process_handle, movelist_address, movelist_size
+            )
+            movelist_parser = MovelistParser(movelist_block, movelist_address)
+            # self.write_movelists_to_file(
+            #    movelist_block, movelist_address, character_name
+            # )
+            self.movelist_cache.save(
+                movelist_parser, character_name, header_hash
+            )
+        return movelist_parser, MovelistCache.get_movelist_identity(
+            character_name, header_hash
         )
-        movelist_block = self.get_block_data(
-            movelist_address,
-            self.config["MemoryAddressOffsets"]["movelist_size"]
+
+    def start_frame_recording(self, file_path=None, compression='zlib'):
+        """
+        Records every player data frame read during battle, see FrameRecorder.
+        With record_frames set, a recording is started on every fight
+        detected and stopped when the fight is over.
+        """
+        self.stop_frame_recording()
+        self.frame_recorder = FrameRecorder(file_path, compression)
+        return self.frame_recorder.file_path
+
+    def stop_frame_recording(self):
+        if self.frame_recorder is not None:
+            self.frame_recorder.stop()
+            self.frame_recorder = None
+
+    def get_movelist_address(self, process_handle, data_type):
+        """
+        """
+        movelist_trail = self.config["NonPlayerDataAddresses"][data_type]
+        return self.get_pointer_value(
+            process_handle, self.module_address + movelist_trail[0]
         )
-        return movelist_block, movelist_address
 
     def is_state_reacquisition_required(self):
         """
@@ -52,6 +52,9 @@ class GameSnapshot:
         self.is_player_player_one = is_player_player_one
         # self.side_menu_selection = side_menu_selection
         self.game_mode = game_mode
+        self.distance = math.hypot(
+            bot.position[0] - opp.position[0], bot.position[1] - opp.position[1]
+        )
 
     def from_mirrored(self):
         """
@@ -73,13 +76,4 @@ class GameSnapshot:
     def get_distance(self):
         """
         """
-        # print(
-        #     '{}, {} : {}, {}'.format(
-        #         self.bot.skeleton[0][22], self.opp.skeleton[0][22],
-        #         self.bot.skeleton[2][22], self.opp.skeleton[2][22]
-        #     )
-        # )
-        return math.hypot(
-            self.bot.skeleton[0][22] - self.opp.skeleton[0][22],
-            self.bot.skeleton[2][22] - self.opp.skeleton[2][22]
-        )
+        return self.distance
@@ -19,7 +19,6 @@ from __future__ import annotations
 
 from collections import Counter, defaultdict
 import logging
-import math
 import typing
 import sys
 
@@ -28,6 +27,7 @@ from MoveInfoEnums import *  # NOQA
 from MoveDataReport import MoveDataReport
 import MovelistParser
 
+from constants.battle import TechnicalState
 from constants.event import GameStateEvent
 from constants.input import InputAttack, InputDirection
 from constants.event import GraphicSettingsChangeEvent
@@ -40,6 +40,8 @@ from patterns.observer import Publisher
 import win32.kernel32 as kernel32
 import win32.user32 as user32
 
+from . import spacing
+from .edge_triggers import EdgeRule, EdgeTriggers
 from .process_io_manager import ProcessIOManager
 
 if typing.TYPE_CHECKING:
@@ -48,8 +50,110 @@ if typing.TYPE_CHECKING:
 class TekkenGameState:
     """
     """
-    def __init__(self):
-        self.game_io_manager = ProcessIOManager()
+    OPP_TECHNICAL_STATE_REPORTS = (
+        ('TC', TechnicalState.TC),
+        ('TJ', TechnicalState.TJ),
+        ('BUF', TechnicalState.BUF),
+        ('xx', TechnicalState.CANCEL),
+        ('PC', TechnicalState.PC),
+        ('HOM1', TechnicalState.HOM1),
+        ('HOM2', TechnicalState.HOM2),
+        ('SKIP', TechnicalState.SKIP),
+        ('FROZ', TechnicalState.FROZEN),
+        # ('PY1', TechnicalState.PY1),
+        # ('PY2', TechnicalState.PY2),
+    )
+    STATE_LOG_LENGTH = 300
+
+    EDGE_RULES = (
+        EdgeRule(
+            'opp_combo_counter_start',
+            (('opp.combo_counter', 0), ('opp.combo_counter', 1)),
+            lambda counter, previous_counter: (
+                counter == 1 and previous_counter == 0
+            )
+        ),
+        EdgeRule(
+            'opp_combo_counter_end',
+            (('opp.combo_counter', 0), ('opp.combo_counter', 1)),
+            lambda counter, previous_counter: (
+                counter == 0 and previous_counter > 0
+            )
+        ),
+        EdgeRule(
+            'bot_start_getting_hit',
+            (('bot.is_getting_hit()', 0), ('bot.is_getting_hit()', 1)),
+            lambda hit, previous_hit: hit and not previous_hit
+        ),
+        EdgeRule(
+            'opp_start_getting_hit',
+            (('opp.is_getting_hit()', 0), ('opp.is_getting_hit()', 1)),
+            lambda hit, previous_hit: hit and not previous_hit
+        ),
+        EdgeRule(
+            'bot_start_being_thrown',
+            (('opp.is_in_throwing()', 0), ('opp.is_in_throwing()', 1)),
+            lambda throwing, previous_throwing: (
+                throwing and not previous_throwing
+            )
+        ),
+        EdgeRule(
+            'bot_come_out_of_block',
+            (('bot.is_blocking()', 0), ('bot.is_blocking()', 1)),
+            lambda blocking, previous_blocking: (
+                previous_blocking and not blocking
+            )
+        ),
+        EdgeRule(
+            'bot_just_grounded',
+            (
+                ('bot.is_on_ground()', 0), ('bot.is_on_ground()', 1),
+                ('bot.is_being_juggled()', 1),
+                ('bot.is_being_knocked_down()', 1)
+            ),
+            lambda grounded, previous_grounded, juggled, knocked_down: (
+                grounded and not previous_grounded
+                and not juggled and not knocked_down
+            )
+        ),
+        EdgeRule(
+            'bot_start_being_juggled',
+            (('bot.is_being_juggled()', 0), ('bot.is_being_juggled()', 1)),
+            lambda juggled, previous_juggled: juggled and not previous_juggled
+        ),
+        EdgeRule(
+            'bot_timer_interrupt',
+            (('bot.move_timer', 0), ('bot.move_timer', 1)),
+            lambda timer, previous_timer: timer < previous_timer
+        ),
+        EdgeRule(
+            'bot_move_id_change',
+            (('bot.move_id', 0), ('bot.move_id', 1)),
+            lambda move_id, previous_move_id: move_id != previous_move_id
+        ),
+        EdgeRule(
+            'opp_move_id_change',
+            (('opp.move_id', 0), ('opp.move_id', 1)),
+            lambda move_id, previous_move_id: move_id != previous_move_id
+        ),
+        EdgeRule(
+            'timer_reset',
+            (('timer_frames_remaining', 0), ('timer_frames_remaining', 1)),
+            lambda timer, previous_timer: timer > previous_timer
+        ),
+        EdgeRule(
+            'fight_reset',
+            (('frame_count', 0), ('frame_count', 1)),
+            lambda frame_count, previous_frame_count: (
+                frame_count < previous_frame_count and previous_frame_count > 0
+            )
+        ),
+    )
+
+    def __init__(self, game_io_manager=None):
+        if game_io_manager is None:
+            game_io_manager = ProcessIOManager()
+        self.game_io_manager = game_io_manager
         self.duplicate_frame_obtained = 0
         self.state_log = []
         self.graphic_settings = None
@@ -57,6 +161,9 @@ class TekkenGameState:
         self.mirrored_state_log = []
         self.is_mirrored = False
         self.futurestate_log = None
+        self.edge_triggers = EdgeTriggers(
+            TekkenGameState.EDGE_RULES, TekkenGameState.STATE_LOG_LENGTH
+        )
 
         logging_handler = logging.StreamHandler(sys.stdout)
         logging_handler.setFormatter(Formatter())
@@ -84,6 +191,7 @@ class TekkenGameState:
         self.state_log, self.mirrored_state_log = (
             self.mirrored_state_log, self.state_log
         )
+        self.edge_triggers.flip_mirror()
         self.is_mirrored = not self.is_mirrored
 
     def back_to_the_future(self, frames):
@@ -94,6 +202,7 @@ class TekkenGameState:
             )
         self.futurestate_log = self.state_log[0 - frames:]
         self.state_log = self.state_log[:0 - frames]
+        self.edge_triggers.back_to_the_future(frames)
 
     def return_to_present(self):
         if self.futurestate_log is None:
@@ -101,6 +210,7 @@ class TekkenGameState:
                 "We're already in the present, Marty, what are you doing?")
         self.state_log += self.futurestate_log
         self.futurestate_log = None
+        self.edge_triggers.return_to_present()
 
     def is_game_happening(self):
         return (
@@ -128,20 +238,10 @@ class TekkenGameState:
         return self.state_log[-1].get_distance()
 
     def did_opp_combo_counter_just_start_x_frames_ago(self, frames_ago):
-        if len(self.state_log) > frames_ago:
-            return (
-                self.state_log[0 - frames_ago].opp.combo_counter == 1
-                and self.state_log[0 - frames_ago - 1].opp.combo_counter == 0
-            )
-        return False
+        return self.edge_triggers.fired('opp_combo_counter_start', frames_ago)
 
     def did_opp_combo_counter_just_end_x_frames_ago(self, frames_ago):
-        if len(self.state_log) > frames_ago:
-            return (
-                self.state_log[0 - frames_ago].opp.combo_counter == 0
-                and self.state_log[0 - frames_ago - 1].opp.combo_counter > 0
-            )
-        return False
+        return self.edge_triggers.fired('opp_combo_counter_end', frames_ago)
 
     def get_opp_combo_damage_x_frames_ago(self, frames_ago):
         if len(self.state_log) > frames_ago:
@@ -207,27 +307,19 @@ class TekkenGameState:
         return self.state_log[-1].opp.is_hitting()
 
     def is_bot_started_getting_hit(self):
-        if len(self.state_log) > 2:
-            return (
-                self.is_bot_getting_hit() and
-                not self.state_log[-2].bot.is_getting_hit()
-            )
-        return False
+        return (
+            len(self.state_log) > 2
+            and self.edge_triggers.fired('bot_start_getting_hit')
+        )
 
     def is_bot_started_being_thrown(self):
-        if len(self.state_log) > 2:
-            return (
-                self.is_bot_being_thrown()
-                and not self.state_log[-2].opp.is_in_throwing()
-            )
-        return False
+        return (
+            len(self.state_log) > 2
+            and self.edge_triggers.fired('bot_start_being_thrown')
+        )
 
     def is_bot_coming_out_of_block(self):
-        if len(self.state_log) >= 2:
-            previous_state = self.state_log[-2].bot.is_blocking()
-            current_state = self.state_log[-1].bot.is_blocking()
-            return previous_state and not current_state
-        return False
+        return self.edge_triggers.fired('bot_come_out_of_block')
 
     def get_recovery_of_move_id(self, move_id):
         largest_time = -1
@@ -362,12 +454,10 @@ class TekkenGameState:
         )
 
     def is_bot_move_changed(self):
-        if len(self.state_log) > 2:
-            return (
-                self.state_log[-1].bot.move_id
-                != self.state_log[-2].bot.move_id
-            )
-        return False
+        return (
+            len(self.state_log) > 2
+            and self.edge_triggers.fired('bot_move_id_change')
+        )
 
     def is_bot_whiffing_alt(self):
         current_bot = self.state_log[-1].bot
@@ -489,25 +579,19 @@ class TekkenGameState:
         return (0, 0)
 
     def is_bot_just_grounded(self):
-        if len(self.state_log) > 2:
-            return (
-                self.state_log[-1].bot.is_on_ground()
-                and not self.state_log[-2].bot.is_on_ground()
-                and not self.state_log[-2].bot.is_being_juggled()
-                and not self.state_log[-2].bot.is_being_knocked_down()
-            )
-        return False
+        return (
+            len(self.state_log) > 2
+            and self.edge_triggers.fired('bot_just_grounded')
+        )
 
     def is_bot_being_juggled(self):
         return self.state_log[-1].bot.is_being_juggled()
 
     def is_bot_started_being_juggled(self):
-        if len(self.state_log) > 2:
-            return (
-                self.state_log[-1].bot.is_being_juggled()
-                and not self.state_log[-2].bot.is_being_juggled()
-            )
-        return False
+        return (
+            len(self.state_log) > 2
+            and self.edge_triggers.fired('bot_start_being_juggled')
+        )
 
     def is_bot_being_thrown(self):
         return self.state_log[-1].opp.is_in_throwing()
@@ -545,44 +629,19 @@ class TekkenGameState:
         return False
 
     def did_bot_timer_interrupt_x_moves_ago(self, frames_ago):
-        if len(self.state_log) > frames_ago:
-            return (
-                self.state_log[0 - frames_ago].bot.move_timer
-                < self.state_log[0 - frames_ago - 1].bot.move_timer
-            )
-        return False
+        return self.edge_triggers.fired('bot_timer_interrupt', frames_ago)
 
     def did_bot_start_getting_hit_x_frames_ago(self, frames_ago):
-        if len(self.state_log) > frames_ago:
-            return (
-                self.state_log[0 - frames_ago].bot.is_getting_hit()
-                and not self.state_log[0 - frames_ago - 1].bot.is_getting_hit()
-            )
-        return False
+        return self.edge_triggers.fired('bot_start_getting_hit', frames_ago)
 
     def did_opp_start_getting_hit_x_frames_ago(self, frames_ago):
-        if len(self.state_log) > frames_ago:
-            return (
-                self.state_log[0 - frames_ago].opp.is_getting_hit()
-                and not self.state_log[0 - frames_ago - 1].opp.is_getting_hit()
-            )
-        return False
+        return self.edge_triggers.fired('opp_start_getting_hit', frames_ago)
 
     def did_bot_id_change_x_moves_ago(self, frames_ago):
-        if len(self.state_log) > frames_ago:
-            return (
-                self.state_log[0 - frames_ago].bot.move_id
-                != self.state_log[0 - frames_ago - 1].bot.move_id
-            )
-        return False
+        return self.edge_triggers.fired('bot_move_id_change', frames_ago)
 
     def did_opp_id_change_x_moves_ago(self, frames_ago):
-        if len(self.state_log) > frames_ago:
-            return (
-                self.state_log[0 - frames_ago].opp.move_id
-                != self.state_log[0 - frames_ago - 1].opp.move_id
-            )
-        return False
+        return self.edge_triggers.fired('opp_move_id_change', frames_ago)
 
     def get_bot_elapsed_frames_of_rage_move(self, rage_move_startup):
         frozenFrames = 0
@@ -634,49 +693,10 @@ class TekkenGameState:
         return [(InputDirectionCodes.N, InputAttack.NULL, False)]
 
     def get_current_opp_move_string(self):
-        if self.state_log[-1].opp.movelist_parser != None:
-            move_id = self.state_log[-1].opp.move_id
-            previous_move_id = -1
-
-            input_array = []
-
-            i = len(self.state_log)
-
-            while True:
-                next_move, last_move_was_empty_cancel = (
-                    self.get_opp_move_string(
-                        move_id, previous_move_id
-                    )
-                )
-                next_move = str(next_move)
-
-                if last_move_was_empty_cancel:
-                    input_array[-1] = ''
-
-                input_array.append(next_move)
-
-                if(
-                        self.state_log[-1].opp.movelist_parser
-                        .can_be_done_from_neutral(move_id)
-                ):
-                    break
-
-                while True:
-                    i -= 1
-                    if i < 0:
-                        break
-                    if self.state_log[i].opp.move_id != move_id:
-                        previous_move_id = move_id
-                        move_id = self.state_log[i].opp.move_id
-                        break
-                if i < 0:
-                    break
-
-            clean_input_array = reversed(
-                [a for a in input_array if len(a) > 0])
-            return ','.join(clean_input_array)
-        else:
-            return 'N/A'
+        move_chain = self.state_log[-1].opp.move_chain
+        if move_chain is not None:
+            return move_chain.move_string
+        return 'N/A'
 
     def get_opp_move_string(self, move_id, previous_move_id):
         return self.state_log[-1].opp.movelist_parser.input_for_move(
@@ -687,8 +707,11 @@ class TekkenGameState:
         for state in reversed(self.state_log):
             if state.opp.move_id == move_id:
                 return False
-            if state.opp.movelist_parser.can_be_done_from_neutral(
-                    state.opp.move_id
+            if(
+                    state.opp.movelist_parser is None
+                    or state.opp.movelist_parser.can_be_done_from_neutral(
+                        state.opp.move_id
+                    )
             ):
                 return True
         return True
@@ -778,98 +801,49 @@ class TekkenGameState:
             return ComplexMoveStates.F_MINUS
 
     def get_opp_technical_states(self, startup):
-
-        #opp_id = self.state_log[-1].opp.move_id
-        tc_frames = []
-        tj_frames = []
-        cancel_frames = []
-        buffer_frames = []
-        pc_frames = []
-        homing_frames1 = []
-        homing_frames2 = []
-        parryable_frames1 = []
-        parryable_frames2 = []
-        startup_frames = []
-        frozen_frames = []
-
-        previous_state = None
+        packed_frames = []
+        newer_state = None
         skipped_frames_counter = 0
-        frozen_frames_counter = 0
         for i, state in enumerate(reversed(self.state_log[-startup:])):
-            if previous_state != None:
-                is_skipped = (
-                    state.opp.move_timer != previous_state.opp.move_timer - 1
+            packed = state.opp.technical_states & TechnicalState.STATIC.value
+            if newer_state is not None:
+                packed |= (
+                    newer_state.opp.technical_states
+                    & TechnicalState.SKIP.value
                 )
-                if is_skipped:
-                    skipped_frames_counter += 1
-                is_frozen = (
-                    state.bot.move_timer == previous_state.bot.move_timer
+                packed |= (
+                    newer_state.bot.technical_states
+                    & TechnicalState.FROZEN.value
                 )
-                if is_frozen:
-                    frozen_frames_counter += 1
-            else:
-                is_skipped = False
-                is_frozen = False
-            if skipped_frames_counter + i <= startup:
-                tc_frames.append(state.opp.is_technical_crouch())
-                tj_frames.append(state.opp.is_technical_jump())
-                cancel_frames.append(state.opp.is_cancelable)
-                buffer_frames.append(state.opp.is_bufferable)
-                pc_frames.append(state.opp.is_power_crush)
-                homing_frames1.append(state.opp.is_homing1())
-                homing_frames2.append(state.opp.is_homing2())
-                parryable_frames1.append(state.opp.is_parry1)
-                parryable_frames2.append(state.opp.is_parry2)
-                startup_frames.append(is_skipped)
-                frozen_frames.append(is_frozen)
-
-            previous_state = state
-
-        parryable1 = MoveDataReport('PY1', parryable_frames1)
-        parryable2 = MoveDataReport('PY2', parryable_frames2)
-        unparryable = MoveDataReport(
-            'NO PARRY?', [
-                not parryable1.is_present() and not parryable2.is_present()
-            ]
-        )
+                if packed & TechnicalState.SKIP.value:
+                    skipped_frames_counter += 1
+            if skipped_frames_counter + i > startup:
+                break
+            packed_frames.append(packed)
+            newer_state = state
+        packed_frames.reverse()
 
-        return [
-            MoveDataReport('TC', tc_frames),
-            MoveDataReport('TJ', tj_frames),
-            MoveDataReport('BUF', buffer_frames),
-            MoveDataReport('xx', cancel_frames),
-            MoveDataReport('PC', pc_frames),
-            MoveDataReport('HOM1', homing_frames1),
-            MoveDataReport('HOM2', homing_frames2),
-            MoveDataReport('SKIP', startup_frames),
-            MoveDataReport('FROZ', frozen_frames),
-            # parryable1,
-            # parryable2,
-            # unparryable
-        ]
+        return MoveDataReport.from_packed_frames(
+            packed_frames, TekkenGameState.OPP_TECHNICAL_STATE_REPORTS
+        )
 
     def is_fight_over(self):
         return self.duplicate_frame_obtained > 5
 
     def was_timer_reset(self):
-        if len(self.state_log) > 2:
-            return (
-                self.state_log[-1].timer_frames_remaining
-                > self.state_log[-2].timer_frames_remaining
-            )
-        return False
+        return (
+            len(self.state_log) > 2
+            and self.edge_triggers.fired('timer_reset')
+        )
 
     def did_timer_start_ticking(self, buffer):
         return self.state_log[-1].timer_frames_remaining == 3600 - 1 - buffer
 
     def was_fight_reset(self):
-        false_reset_buffer = 0
-        if len(self.state_log) > 2:
-            return (
-                self.state_log[-1].frame_count < self.state_log[-2].frame_count
-                and self.state_log[-2].frame_count > false_reset_buffer
-            )
-        return False
+        return (
+            len(self.state_log) > 2
+            and self.edge_triggers.fired('fight_reset')
+        )
 
     def get_timer(self, frames_ago):
         if len(self.state_log) > frames_ago:
@@ -887,48 +861,18 @@ class TekkenGameState:
         return (0, 0)
 
     def get_range_of_move(self):
-        move_timer = self.state_log[-1].opp.move_timer
-        opp_id = self.state_log[-1].opp.move_id
-        for state in reversed(self.state_log):
-            starting_skeleton = state.opp.skeleton
-            bot_skeleton = state.bot.skeleton
-            old_dist = state.get_distance()
-            if move_timer < state.opp.move_timer:
-                break
-            if opp_id != state.opp.move_id:
-                break
-            move_timer = state.opp.move_timer
-        ending_skeleton = self.state_log[-1].opp.skeleton
-
-        avg_ss_x = sum(starting_skeleton[0]) / len(starting_skeleton[0])
-        avg_ss_z = sum(starting_skeleton[2]) / len(starting_skeleton[2])
-        avg_bs_x = sum(bot_skeleton[0]) / len(bot_skeleton[0])
-        avg_bs_z = sum(bot_skeleton[2]) / len(bot_skeleton[2])
+        return spacing.get_range_of_move(self.state_log)
 
-        vector_towards_bot = (avg_bs_x - avg_ss_x, avg_bs_z - avg_ss_z)
+    def get_opp_whiff_distance(self):
+        return spacing.get_whiff_distance(self.state_log)
 
-        toward_bot_magnitude = math.sqrt(
-            pow(vector_towards_bot[0], 2) + pow(vector_towards_bot[1], 2))
-        unit_vector_towards_bot = (
-            vector_towards_bot[0] / toward_bot_magnitude,
-            vector_towards_bot[1] / toward_bot_magnitude
-        )
-
-        movements = [
-            (ai_x - bi_x, ai_z - bi_z) for ai_x, bi_x, ai_z, bi_z in zip(
-                ending_skeleton[0], starting_skeleton[0],
-                ending_skeleton[2], starting_skeleton[2])
-        ]
-        dotproducts = []
-        for movement in movements:
-            dotproducts.append(
-                movement[0] * unit_vector_towards_bot[0]
-                + movement[1] * unit_vector_towards_bot[1]
-            )
+    def get_opp_approach_velocity(
+            self, frames=spacing.APPROACH_VELOCITY_FRAMES
+    ):
+        return spacing.get_opp_approach_velocity(self.state_log, frames)
 
-        max_product = max(dotproducts)
-        max_index = dotproducts.index(max_product)
-        return max_index, max_product
+    def get_distances(self, frames):
+        return spacing.get_distances(self.state_log, frames)
 
     def is_bot_using_opp_movelist(self):
         return self.state_log[-1].bot.use_opponents_movelist
@@ -953,32 +897,31 @@ class TekkenGameState:
         if move_id > 30000:
             return 'Universal_{}'.format(move_id)
 
-        try:
-            if (
-                    not self.is_mirrored and not is_for_bot
-                    or self.is_mirrored and is_for_bot
-            ):
-                if not use_opponents_movelist:
-                    movelist = (
-                        self.game_io_manager.process_reader.p2_movelist_names
-                    )
-                else:
-                    movelist = (
-                        self.game_io_manager.process_reader.p1_movelist_names
-                    )
+        if (
+                not self.is_mirrored and not is_for_bot
+                or self.is_mirrored and is_for_bot
+        ):
+            if not use_opponents_movelist:
+                movelist_names = (
+                    self.game_io_manager.process_reader.p2_movelist_names
+                )
             else:
-                if not use_opponents_movelist:
-                    movelist = (
-                        self.game_io_manager.process_reader.p1_movelist_names
-                    )
-                else:
-                    movelist = (
-                        self.game_io_manager.process_reader.p2_movelist_names
-                    )
+                movelist_names = (
+                    self.game_io_manager.process_reader.p1_movelist_names
+                )
+        else:
+            if not use_opponents_movelist:
+                movelist_names = (
+                    self.game_io_manager.process_reader.p1_movelist_names
+                )
+            else:
+                movelist_names = (
+                    self.game_io_manager.process_reader.p2_movelist_names
+                )
 
-            return movelist[(move_id * 2) + 4].decode('utf-8')
-        except:
-            return "ERROR"
+        if movelist_names is None:
+            return 'ERROR'
+        return movelist_names.get_name(move_id, 'ERROR')
 
     def is_tekken_foreground_wnd(self):
         return self.game_io_manager.process_reader.is_tekken_foreground_wnd()
@@ -987,16 +930,31 @@ class TekkenGameState:
         return self.game_io_manager.process_reader.is_in_battle
 
     def __append_game_data(self, game_data: GameSnapshot):
+        if self.state_log:
+            if not self.is_mirrored:
+                previous_game_data = self.state_log[-1]
+            else:
+                previous_game_data = self.mirrored_state_log[-1]
+            game_data.bot.update_move_timer_transition(previous_game_data.bot)
+            game_data.opp.update_move_timer_transition(previous_game_data.opp)
+            game_data.bot.update_move_chain(previous_game_data.bot)
+            game_data.opp.update_move_chain(previous_game_data.opp)
+        else:
+            game_data.bot.update_move_chain()
+            game_data.opp.update_move_chain()
+
+        mirrored_game_data = game_data.from_mirrored()
         if not self.is_mirrored:
             self.state_log.append(game_data)
-            self.mirrored_state_log.append(game_data.from_mirrored())
+            self.mirrored_state_log.append(mirrored_game_data)
         else:
-            self.state_log.append(game_data.from_mirrored())
+            self.state_log.append(mirrored_game_data)
             self.mirrored_state_log.append(game_data)
 
-        if len(self.state_log) > 300:
+        if len(self.state_log) > TekkenGameState.STATE_LOG_LENGTH:
             self.state_log.pop(0)
             self.mirrored_state_log.pop(0)
+        self.edge_triggers.update(game_data, mirrored_game_data)
 
     def __compare_controllers(self, controllers):
         if(
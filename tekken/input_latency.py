@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2019, Alchemy Meister
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     * Redistributions of source code must retain the above copyright notice,
+#       this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice,this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its
+#       contributors may be used to endorse or promote products derived from
+#       this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Measures the delay between a key transition leaving GameControllerInputter and
+the game reporting it in the bot's input_direction and input_button, in frames
+and in milliseconds.
+"""
+from collections import Counter, deque, namedtuple
+import statistics
+import time
+
+from constants.input import InputAttack, InputDirection
+
+LatencySample = namedtuple(
+    'LatencySample', ['input', 'is_release', 'frames', 'milliseconds']
+)
+LatencySummary = namedtuple(
+    'LatencySummary',
+    [
+        'samples', 'missed', 'median_frames', 'p95_frames', 'median_ms',
+        'p95_ms'
+    ]
+)
+
+class InputLatencyProbe:
+    """
+    Every transition handed to on_keys_sent waits until a later frame shows it
+    in the bot snapshot. Transitions the snapshot already showed when they
+    were sent, such as releasing a key that was not pressed, can't be observed
+    and are not sampled.
+    """
+    MAX_PENDING_FRAMES = 30
+    HISTORY_SIZE = 600
+
+    DIRECTION_GROUPS = {
+        InputDirection.BACK: frozenset([
+            InputDirection.BACK, InputDirection.DOWN_BACK,
+            InputDirection.UP_BACK
+        ]),
+        InputDirection.FORWARD: frozenset([
+            InputDirection.FORWARD, InputDirection.DOWN_FORWARD,
+            InputDirection.UP_FORWARD
+        ]),
+        InputDirection.UP: frozenset([
+            InputDirection.UP, InputDirection.UP_BACK,
+            InputDirection.UP_FORWARD
+        ]),
+        InputDirection.DOWN: frozenset([
+            InputDirection.DOWN, InputDirection.DOWN_BACK,
+            InputDirection.DOWN_FORWARD
+        ]),
+    }
+
+    def __init__(
+            self, max_pending_frames=MAX_PENDING_FRAMES,
+            history_size=HISTORY_SIZE
+    ):
+        self.max_pending_frames = max_pending_frames
+        self.samples = deque(maxlen=history_size)
+        self.missed = 0
+        self.__pending = []
+        self.__frame_count = None
+        self.__bot = None
+
+    def reset(self):
+        self.samples.clear()
+        self.missed = 0
+        self.__pending = []
+
+    def on_keys_sent(self, transitions, sent_time=None):
+        """
+        transitions is a list of (input, is_release) pairs, where input is the
+        InputDirection or InputAttack member the key stands for.
+        """
+        if self.__frame_count is None:
+            return
+        if sent_time is None:
+            sent_time = time.perf_counter()
+        for game_input, is_release in transitions:
+            if game_input not in InputLatencyProbe.DIRECTION_GROUPS and (
+                    not isinstance(game_input, InputAttack)
+            ):
+                continue
+            if not InputLatencyProbe.__is_shown(
+                    self.__bot, game_input, is_release
+            ):
+                self.__pending.append(
+                    (game_input, is_release, self.__frame_count, sent_time)
+                )
+
+    def update(self, frame_count, bot, observed_time=None):
+        """
+        Feeds the newest frame of the bot that receives the inputs.
+        """
+        if frame_count == self.__frame_count:
+            return
+        self.__frame_count = frame_count
+        self.__bot = bot
+        if not self.__pending:
+            return
+        if observed_time is None:
+            observed_time = time.perf_counter()
+
+        pending = []
+        for entry in self.__pending:
+            game_input, is_release, sent_frame, sent_time = entry
+            frames = frame_count - sent_frame
+            if frames <= 0 or frames > self.max_pending_frames:
+                self.missed += 1
+            elif InputLatencyProbe.__is_shown(bot, game_input, is_release):
+                self.samples.append(LatencySample(
+                    game_input, is_release, frames,
+                    1000 * (observed_time - sent_time)
+                ))
+            else:
+                pending.append(entry)
+        self.__pending = pending
+
+    def get_frame_histogram(self):
+        return dict(sorted(Counter(
+            sample.frames for sample in self.samples
+        ).items()))
+
+    def get_millisecond_histogram(self, bin_size=4):
+        """
+        Counts the samples per bin_size milliseconds, keyed by the start of
+        each bin.
+        """
+        return dict(sorted(Counter(
+            int(sample.milliseconds // bin_size) * bin_size
+            for sample in self.samples
+        ).items()))
+
+    def get_summary(self):
+        if not self.samples:
+            return LatencySummary(0, self.missed, None, None, None, None)
+        frames = sorted(sample.frames for sample in self.samples)
+        milliseconds = sorted(sample.milliseconds for sample in self.samples)
+        return LatencySummary(
+            len(frames), self.missed,
+            statistics.median(frames), InputLatencyProbe.__p95(frames),
+            statistics.median(milliseconds),
+            InputLatencyProbe.__p95(milliseconds)
+        )
+
+    def get_measured_input_delay(self):
+        """
+        The median delay in whole frames, the measured value of
+        NotationParser.INPUT_DELAY on this machine, or None without samples.
+        """
+        summary = self.get_summary()
+        if summary.median_frames is None:
+            return None
+        return int(round(summary.median_frames))
+
+    def get_overlay_text(self):
+        summary = self.get_summary()
+        if not summary.samples:
+            return 'input latency\nno samples\nmissed {}'.format(
+                summary.missed
+            )
+        return (
+            'input latency\n{:.1f}f {:.1f}ms\np95 {}f {:.1f}ms\n'
+            'n {} missed {}'
+        ).format(
+            summary.median_frames, summary.median_ms, summary.p95_frames,
+            summary.p95_ms, summary.samples, summary.missed
+        )
+
+    @staticmethod
+    def __p95(sorted_values):
+        return sorted_values[
+            min(len(sorted_values) - 1, int(0.95 * len(sorted_values)))
+        ]
+
+    @staticmethod
+    def __is_shown(bot, game_input, is_release):
+        if isinstance(game_input, InputAttack):
+            if game_input == InputAttack.B_RAGE:
+                pressed = bot.rage_button_flag
+            else:
+                pressed = bool(bot.input_button.value & game_input.value)
+        else:
+            pressed = (
+                bot.input_direction
+                in InputLatencyProbe.DIRECTION_GROUPS[game_input]
+            )
+        return pressed != is_release
@@ -31,13 +31,15 @@
 """
 import enum
 import logging
-import traceback
 import sys
 
 from log import Formatter
 from patterns.observer import Publisher
 from win32.utils import os_time
 
+from .analyzers import (
+    AnalyzerPipeline, EncyclopediaAnalyzer, ThrowBreakAnalyzer
+)
 from .encyclopedia import TekkenEncyclopedia
 from .game_state import TekkenGameState
 
@@ -52,7 +54,7 @@ class Launcher:
     INITIAL_SHORT_DELAY = 2
     INITIAL_LONG_DELAY = 8
 
-    def __init__(self, view, extended_print=False):
+    def __init__(self, view, extended_print=False, record_frames=False):
         self.view = view
         self.extended_print = extended_print
 
@@ -64,12 +66,21 @@ class Launcher:
         self.initialized = False
         self.publisher = Publisher(Launcher.Event)
         self.game_state = TekkenGameState()
+        self.game_state.get_reader().record_frames = record_frames
         self.cyclopedia_p1 = TekkenEncyclopedia(
             True, print_extended_frame_data=self.extended_print
         )
         self.cyclopedia_p2 = TekkenEncyclopedia(
             False, print_extended_frame_data=self.extended_print
         )
+        self.throw_breaks_p1 = ThrowBreakAnalyzer(True)
+        self.throw_breaks_p2 = ThrowBreakAnalyzer(False)
+        self.analyzers = AnalyzerPipeline()
+        for cyclopedia in (self.cyclopedia_p1, self.cyclopedia_p2):
+            for analyzer in EncyclopediaAnalyzer.for_encyclopedia(cyclopedia):
+                self.analyzers.register(analyzer)
+        self.analyzers.register(self.throw_breaks_p1)
+        self.analyzers.register(self.throw_breaks_p2)
 
     def start(self):
         self.__update_launcher()
@@ -78,11 +89,7 @@ class Launcher:
         start = os_time.now(resolution=os_time.Resolution.MILLI)
         sucessful = self.game_state.update()
         if sucessful:
-            try:
-                self.cyclopedia_p1.update(self.game_state)
-                self.cyclopedia_p2.update(self.game_state)
-            except:
-                traceback.print_exc()
+            self.analyzers.update(self.game_state)
         end = os_time.now(resolution=os_time.Resolution.MILLI)
         elapsed_time = (end - start)
         if self.game_state.is_pid_valid():
@@ -100,6 +107,8 @@ class Launcher:
                 self.__update_launcher
             )
         else:
+            self.analyzers.stop()
+            self.game_state.get_reader().stop_frame_recording()
             if self.initialized:
                 self.initialized = False
                 self.publisher.dispatch(Launcher.Event.CLOSED)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2019, Alchemy Meister
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met =
+#
+#     * Redistributions of source code must retain the above copyright notice,
+#       this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice,this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its
+#       contributors may be used to endorse or promote products derived from
+#       this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+"""
+
+class MoveChain:
+    """
+    Input string of the moves a player has chained since the last move that
+    can be done from neutral. Every snapshot keeps the chain of its own frame,
+    built from the chain of the previous frame, so the string is never rebuilt
+    from the state log.
+    """
+    __slots__ = ('movelist_parser', 'move_id', 'move_string')
+
+    def __init__(self, movelist_parser, move_id, move_string):
+        self.movelist_parser = movelist_parser
+        self.move_id = move_id
+        self.move_string = move_string
+
+    @staticmethod
+    def advance(previous_chain, movelist_parser, move_id):
+        """
+        Chain of a frame, given the chain of the previous frame of the same
+        player.
+        """
+        if movelist_parser is None:
+            return None
+        if(
+                previous_chain is not None
+                and previous_chain.movelist_parser is movelist_parser
+                and previous_chain.move_id == move_id
+        ):
+            return previous_chain
+
+        move_input, _ = movelist_parser.input_for_move(move_id, -1)
+        if(
+                previous_chain is None
+                or previous_chain.movelist_parser is not movelist_parser
+                or movelist_parser.can_be_done_from_neutral(move_id)
+        ):
+            return MoveChain(movelist_parser, move_id, move_input)
+
+        # the input of an empty cancel is not part of the string
+        if movelist_parser.is_empty_cancel(previous_chain.move_id, move_id):
+            move_input = ''
+        return MoveChain(
+            movelist_parser, move_id,
+            ','.join(
+                move_string
+                for move_string in (previous_chain.move_string, move_input)
+                if move_string
+            )
+        )
@@ -27,4 +27,8 @@
 # ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 # POSSIBILITY OF SUCH DAMAGE.
 
+from .cancel_graph import CancelGraph
+from .move_name_table import MoveNameTable
+from .move_node_table import MoveNodeTable
 from .movelist_parser import MovelistParser
+from .movelist_cache import MovelistCache
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2019, Alchemy Meister
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met =
+#
+#     * Redistributions of source code must retain the above copyright notice,
+#       this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice,this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its
+#       contributors may be used to endorse or promote products derived from
+#       this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+"""
+from array import array
+import struct
+
+from constants.movelist import MovelistInput
+
+from .move_node_table import MoveNodeTable
+
+class CancelGraph:
+    """
+    Cancel transitions between the moves of a movelist, stored as compressed
+    sparse rows: the successors of move i are
+    successor_ids[successor_offsets[i]:successor_offsets[i + 1]].
+    """
+    OFFSET_TYPECODE = 'I'
+    MOVE_ID_TYPECODE = 'H'
+    MOVE_SIZE = 0xB0
+    MOVE_CANCEL_POINTER = struct.Struct('<Q')
+    MOVE_CANCEL_POINTER_OFFSET = 0x20
+
+    def __init__(
+            self, successor_offsets, successor_ids,
+            can_move_be_done_from_neutral
+    ):
+        self.successor_offsets = successor_offsets
+        self.successor_ids = successor_ids
+        self.neutral_move_ids = array(
+            CancelGraph.MOVE_ID_TYPECODE,
+            sorted(
+                move_id for move_id, can_be_done
+                in can_move_be_done_from_neutral.items() if can_be_done
+            )
+        )
+        self.__neutral_move_ids = frozenset(self.neutral_move_ids)
+
+    @classmethod
+    def from_movelist(
+            cls, moves_raw, move_nodes, move_nodes_address,
+            can_move_be_done_from_neutral
+    ):
+        """
+        Follows the cancel pointer of every move to its list of move nodes,
+        which ends with a node whose direction is MovelistInput.END.
+        """
+        node_size = MoveNodeTable.NODE_FORMAT.size
+        node_count = len(move_nodes)
+        move_count = len(moves_raw) // CancelGraph.MOVE_SIZE
+        moves_view = memoryview(moves_raw)
+        end_direction = MovelistInput.END.value
+
+        successor_offsets = array(CancelGraph.OFFSET_TYPECODE, [0])
+        successor_ids = array(CancelGraph.MOVE_ID_TYPECODE)
+        cancel_lists = {}
+        for move_id in range(move_count):
+            node_offset = CancelGraph.MOVE_CANCEL_POINTER.unpack_from(
+                moves_view,
+                move_id * CancelGraph.MOVE_SIZE
+                + CancelGraph.MOVE_CANCEL_POINTER_OFFSET
+            )[0] - move_nodes_address
+            cancel_list = cancel_lists.get(node_offset)
+            if cancel_list is None:
+                cancel_list = []
+                if(
+                        0 <= node_offset < node_count * node_size
+                        and node_offset % node_size == 0
+                ):
+                    for node_index in range(
+                            node_offset // node_size, node_count
+                    ):
+                        if move_nodes.direction[node_index] == end_direction:
+                            break
+                        successor = move_nodes.move_id[node_index]
+                        if(
+                                successor < move_count
+                                and successor not in cancel_list
+                        ):
+                            cancel_list.append(successor)
+                cancel_lists[node_offset] = cancel_list
+            successor_ids.extend(cancel_list)
+            successor_offsets.append(len(successor_ids))
+
+        return cls(
+            successor_offsets, successor_ids, can_move_be_done_from_neutral
+        )
+
+    def __len__(self):
+        return len(self.successor_offsets) - 1
+
+    def get_successors(self, move_id):
+        """
+        Moves the move can be canceled into.
+        """
+        if 0 <= move_id < len(self):
+            return self.successor_ids[
+                self.successor_offsets[move_id]:
+                self.successor_offsets[move_id + 1]
+            ]
+        return array(CancelGraph.MOVE_ID_TYPECODE)
+
+    def get_continuations(self, move_id, depth):
+        """
+        Every chain of up to depth cancels that can follow the move, without
+        repeating a move within a chain.
+        """
+        continuations = []
+        chains = [(move_id,)]
+        while chains:
+            chain = chains.pop()
+            if len(chain) > 1:
+                continuations.append(chain[1:])
+            if len(chain) <= depth:
+                chains.extend(
+                    chain + (successor,)
+                    for successor in reversed(self.get_successors(chain[-1]))
+                    if successor not in chain
+                )
+        return continuations
+
+    def is_neutral_startable(self, move_id):
+        return move_id in self.__neutral_move_ids
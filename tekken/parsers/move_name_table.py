@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2019, Alchemy Meister
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met =
+#
+#     * Redistributions of source code must retain the above copyright notice,
+#       this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice,this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its
+#       contributors may be used to endorse or promote products derived from
+#       this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+"""
+import sys
+
+class MoveNameTable:
+    """
+    Move names of a movelist indexed by move id, decoded once into interned
+    strings.
+    """
+    # the names region starts with two unrelated strings and then stores two
+    # strings per move, the move name and an alternative one
+    SKIPPED_STRINGS = 4
+
+    def __init__(self, names_raw=b''):
+        strings = names_raw.split(b'\00')[MoveNameTable.SKIPPED_STRINGS:]
+        self.__names = [
+            sys.intern(strings[index].decode('utf-8'))
+            for index in range(0, len(strings) - 1, 2)
+        ]
+        self.__move_ids = {}
+        for move_id, name in enumerate(self.__names):
+            self.__move_ids.setdefault(name, []).append(move_id)
+
+    def __len__(self):
+        return len(self.__names)
+
+    def __getitem__(self, move_id):
+        return self.__names[move_id]
+
+    def __iter__(self):
+        return iter(self.__names)
+
+    def get_name(self, move_id, default=None):
+        """
+        Name of the move, or default when the move id is not in the movelist.
+        """
+        if 0 <= move_id < len(self.__names):
+            return self.__names[move_id]
+        return default
+
+    def get_move_ids(self, name):
+        """
+        Every move id sharing the given name.
+        """
+        return tuple(self.__move_ids.get(name, ()))
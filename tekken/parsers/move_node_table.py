@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2019, Alchemy Meister
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met =
+#
+#     * Redistributions of source code must retain the above copyright notice,
+#       this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice,this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its
+#       contributors may be used to endorse or promote products derived from
+#       this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+"""
+from array import array
+import struct
+
+from constants.movelist import (
+    MovelistActive, MovelistInput, MovelistButtonInput, MovelistButtonState
+)
+from tekken.data.structures.movelist import MoveNodeStruct
+from tekken.data.wrappers.movelist import MoveNodeWrapper
+from win32.defines import SIZE_OF
+
+class MoveNodeTable:
+    """
+    Column oriented table of the move nodes of a movelist, decoded in a single
+    pass over the node region.
+    """
+    NODE_FORMAT = struct.Struct('<HHHHQQIIIHBx')
+    COLUMNS = (
+        ('direction', 'H'),
+        ('unknown_input_dir', 'H'),
+        ('button_input', 'H'),
+        ('button_state', 'H'),
+        ('unknown_pointer_1', 'Q'),
+        ('unknown_pointer_2', 'Q'),
+        ('unknown_bool', 'I'),
+        ('cancel_window_1', 'I'),
+        ('cancel_window_2', 'I'),
+        ('move_id', 'H'),
+        ('active', 'B'),
+    )
+
+    def __init__(self, move_nodes_raw, names=None):
+        if MoveNodeTable.NODE_FORMAT.size != SIZE_OF(MoveNodeStruct):
+            raise ValueError(
+                'node format does not match {}'.format(MoveNodeStruct.__name__)
+            )
+        node_size = MoveNodeTable.NODE_FORMAT.size
+        node_count = len(move_nodes_raw) // node_size
+        self.__raw = memoryview(move_nodes_raw)[:node_count * node_size]
+        self.names = names or []
+
+        columns = (
+            list(zip(*MoveNodeTable.NODE_FORMAT.iter_unpack(self.__raw)))
+            or [()] * len(MoveNodeTable.COLUMNS)
+        )
+        for (column_name, typecode), column in zip(
+                MoveNodeTable.COLUMNS, columns
+        ):
+            setattr(self, column_name, array(typecode, column))
+
+    def __len__(self):
+        return len(self.move_id)
+
+    def __getitem__(self, index):
+        node_size = MoveNodeTable.NODE_FORMAT.size
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('move node index out of range')
+        return MoveNodeWrapper(
+            bytes(self.__raw[index * node_size:(index + 1) * node_size]),
+            self.names
+        )
+
+    def __iter__(self):
+        return (self[index] for index in range(len(self)))
+
+    def get_inputs(self):
+        """
+        (direction, button_input, button_state) of every node, decoded to
+        their enums once per distinct raw value.
+        """
+        directions = MoveNodeTable.__decode_column(
+            self.direction, MovelistInput
+        )
+        button_inputs = MoveNodeTable.__decode_column(
+            self.button_input, MovelistButtonInput
+        )
+        button_states = MoveNodeTable.__decode_column(
+            self.button_state, MovelistButtonState
+        )
+        return zip(directions, button_inputs, button_states)
+
+    def get_actives(self):
+        return MoveNodeTable.__decode_column(self.active, MovelistActive)
+
+    @staticmethod
+    def __decode_column(column, enum_class):
+        decoded_values = {}
+        for raw_value in set(column):
+            try:
+                decoded_values[raw_value] = enum_class(raw_value)
+            except ValueError:
+                decoded_values[raw_value] = raw_value
+        return [decoded_values[raw_value] for raw_value in column]
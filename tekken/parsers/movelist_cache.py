@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2019, Alchemy Meister
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met =
+#
+#     * Redistributions of source code must retain the above copyright notice,
+#       this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice,this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its
+#       contributors may be used to endorse or promote products derived from
+#       this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Disk cache of parsed movelists.
+
+A movelist never changes for a given character and game version, so once it
+has been parsed its relevant regions are stored in a compact binary file,
+keyed by the character name and a hash of the movelist header. The header is
+hashed with its pointers made relative to the movelist address, so the same
+movelist loaded somewhere else in memory maps to the same file.
+"""
+from array import array
+import contextlib
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+
+from config.config_reader import ConfigReader
+from constants.movelist import (
+    MovelistButtonInput, MovelistButtonState, MovelistInput
+)
+from log import LogUtils
+
+from .cancel_graph import CancelGraph
+from .movelist_parser import MovelistParser
+
+class MovelistCache:
+    """
+    """
+    DEFAULT_DIRECTORY = os.path.join(
+        ConfigReader.DATA_FOLDER, 'cache', 'movelists'
+    )
+    FILE_EXTENSION = '.tbml'
+    MAGIC = b'TBML'
+    VERSION = 2
+    # magic, version, char name, names, move nodes and linked nodes lengths,
+    # neutral and input entry counts, cancel graph offset and successor counts
+    FILE_HEADER = struct.Struct('<4sIIIIIIIII')
+    NEUTRAL_ENTRY = struct.Struct('<HH')
+    INPUT_ENTRY = struct.Struct('<HHHH')
+    SECTION_ALIGNMENT = 8
+
+    __logger = None
+
+    def __init__(self, directory=DEFAULT_DIRECTORY):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self.__statistics_lock = threading.Lock()
+
+        if MovelistCache.__logger is None:
+            MovelistCache.__logger = LogUtils.initialize_module_logger(
+                __name__
+            )
+
+    @staticmethod
+    def get_header_hash(header_bytes, movelist_address, movelist_size):
+        """
+        Hash of the movelist header, with every pointer into the movelist
+        replaced by its offset.
+        """
+        header_hash = hashlib.sha1()
+        for (header_value,) in struct.iter_unpack('<Q', header_bytes):
+            if movelist_address <= header_value < (
+                    movelist_address + movelist_size
+            ):
+                header_value -= movelist_address
+            header_hash.update(struct.pack('<Q', header_value))
+        return header_hash.hexdigest()
+
+    @staticmethod
+    def get_movelist_identity(char_name, header_hash):
+        return '{}_{}'.format(char_name, header_hash)
+
+    @staticmethod
+    def split_movelist_identity(movelist_identity):
+        char_name, _, header_hash = movelist_identity.rpartition('_')
+        return char_name, header_hash
+
+    def get_file_path(self, char_name, header_hash):
+        return os.path.join(
+            self.directory,
+            MovelistCache.get_movelist_identity(char_name, header_hash)
+            + MovelistCache.FILE_EXTENSION
+        )
+
+    def load(self, char_name, header_hash):
+        """
+        Returns the cached parser of the movelist, or None when it has not been
+        cached yet or its file can not be read.
+        """
+        file_path = self.get_file_path(char_name, header_hash)
+        movelist_parser = None
+        if os.path.isfile(file_path):
+            try:
+                with open(file_path, 'rb') as cache_file, mmap.mmap(
+                        cache_file.fileno(), 0, access=mmap.ACCESS_READ
+                ) as cache_map:
+                    movelist_parser = MovelistCache.__decode(cache_map)
+            except (OSError, ValueError, struct.error):
+                self.__logger.exception(
+                    'Unable to read cached movelist %s', file_path
+                )
+
+        with self.__statistics_lock:
+            if movelist_parser is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            self.__logger.info(
+                'Movelist cache %s for %s (hits: %d, misses: %d)',
+                'miss' if movelist_parser is None else 'hit', char_name,
+                self.hits, self.misses
+            )
+        return movelist_parser
+
+    def save(self, movelist_parser, char_name, header_hash):
+        """
+        Stores the parsed movelist. A failed write is logged, the cache is
+        never required to read a movelist. Every save writes its own
+        temporary file, both movelist workers may save the same movelist at
+        once.
+        """
+        file_path = self.get_file_path(char_name, header_hash)
+        temporary_path = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            file_descriptor, temporary_path = tempfile.mkstemp(
+                suffix='.tmp', prefix=os.path.basename(file_path) + '.',
+                dir=self.directory
+            )
+            with os.fdopen(file_descriptor, 'wb') as cache_file:
+                cache_file.write(MovelistCache.__encode(movelist_parser))
+            os.replace(temporary_path, file_path)
+        except OSError:
+            self.__logger.exception(
+                'Unable to write cached movelist %s', file_path
+            )
+            if temporary_path is not None:
+                with contextlib.suppress(OSError):
+                    os.remove(temporary_path)
+
+    @staticmethod
+    def __encode(movelist_parser):
+        char_name = movelist_parser.char_name.encode('utf-8')
+        neutral_entries = b''.join(
+            MovelistCache.NEUTRAL_ENTRY.pack(move_id, can_be_done)
+            for move_id, can_be_done
+            in movelist_parser.can_move_be_done_from_neutral.items()
+        )
+        input_entries = b''.join(
+            MovelistCache.INPUT_ENTRY.pack(
+                move_id, *(
+                    getattr(move_input, 'value', move_input)
+                    for move_input in move_tuple
+                )
+            )
+            for move_id, move_tuple
+            in movelist_parser.move_id_to_input.items()
+        )
+        cancel_graph = movelist_parser.cancel_graph
+        sections = (
+            char_name, movelist_parser.names_raw,
+            movelist_parser.move_nodes_raw, movelist_parser.linked_nodes_raw,
+            neutral_entries, input_entries,
+            cancel_graph.successor_offsets.tobytes(),
+            cancel_graph.successor_ids.tobytes()
+        )
+        encoded = bytearray(
+            MovelistCache.FILE_HEADER.pack(
+                MovelistCache.MAGIC, MovelistCache.VERSION,
+                len(char_name), len(movelist_parser.names_raw),
+                len(movelist_parser.move_nodes_raw),
+                len(movelist_parser.linked_nodes_raw),
+                len(movelist_parser.can_move_be_done_from_neutral),
+                len(movelist_parser.move_id_to_input),
+                len(cancel_graph.successor_offsets),
+                len(cancel_graph.successor_ids)
+            )
+        )
+        for section in sections:
+            encoded += b'\00' * MovelistCache.__get_padding(len(encoded))
+            encoded += section
+        return bytes(encoded)
+
+    @staticmethod
+    def __decode(cache_map):
+        (
+            magic, version, char_name_length, names_length, move_nodes_length,
+            linked_nodes_length, neutral_count, input_count,
+            successor_offset_count, successor_id_count
+        ) = MovelistCache.FILE_HEADER.unpack_from(cache_map)
+        if magic != MovelistCache.MAGIC or version != MovelistCache.VERSION:
+            raise ValueError('unsupported movelist cache file')
+
+        sections = []
+        offset = MovelistCache.FILE_HEADER.size
+        for section_length in (
+                char_name_length, names_length, move_nodes_length,
+                linked_nodes_length,
+                neutral_count * MovelistCache.NEUTRAL_ENTRY.size,
+                input_count * MovelistCache.INPUT_ENTRY.size,
+                successor_offset_count * array(
+                    CancelGraph.OFFSET_TYPECODE
+                ).itemsize,
+                successor_id_count * array(
+                    CancelGraph.MOVE_ID_TYPECODE
+                ).itemsize
+        ):
+            offset += MovelistCache.__get_padding(offset)
+            if offset + section_length > len(cache_map):
+                raise ValueError('truncated movelist cache file')
+            sections.append(cache_map[offset:offset + section_length])
+            offset += section_length
+        (
+            char_name, names_raw, move_nodes_raw, linked_nodes_raw,
+            neutral_entries, input_entries, successor_offsets, successor_ids
+        ) = sections
+
+        can_move_be_done_from_neutral = {
+            move_id: bool(can_be_done)
+            for move_id, can_be_done
+            in MovelistCache.NEUTRAL_ENTRY.iter_unpack(neutral_entries)
+        }
+        move_id_to_input = {}
+        for move_id, direction, button_input, button_state in (
+                MovelistCache.INPUT_ENTRY.iter_unpack(input_entries)
+        ):
+            move_id_to_input[move_id] = (
+                MovelistCache.__decode_value(direction, MovelistInput),
+                MovelistCache.__decode_value(button_input, MovelistButtonInput),
+                MovelistCache.__decode_value(button_state, MovelistButtonState)
+            )
+
+        cancel_graph = CancelGraph(
+            array(CancelGraph.OFFSET_TYPECODE, successor_offsets),
+            array(CancelGraph.MOVE_ID_TYPECODE, successor_ids),
+            can_move_be_done_from_neutral
+        )
+
+        return MovelistParser.from_parsed_data(
+            char_name.decode('utf-8'), names_raw, move_nodes_raw,
+            linked_nodes_raw, can_move_be_done_from_neutral, move_id_to_input,
+            cancel_graph
+        )
+
+    @staticmethod
+    def __decode_value(raw_value, enum_class):
+        try:
+            return enum_class(raw_value)
+        except ValueError:
+            return raw_value
+
+    @staticmethod
+    def __get_padding(offset):
+        return -offset % MovelistCache.SECTION_ALIGNMENT
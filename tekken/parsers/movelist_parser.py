@@ -27,7 +27,8 @@
 # ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 # POSSIBILITY OF SUCH DAMAGE.
 
-from collections import Counter, defaultdict, OrderedDict
+from collections import defaultdict
+from functools import lru_cache
 from pprint import pformat
 import struct
 
@@ -36,13 +37,18 @@ from constants.movelist import (
 )
 from log import LogUtils
 from tekken.data.structures.movelist import MoveNodeStruct
-from tekken.data.wrappers.movelist import MoveNodeWrapper
 from win32.defines import SIZE_OF
 
+from .cancel_graph import CancelGraph
+from .move_name_table import MoveNameTable
+from .move_node_table import MoveNodeTable
+
 class MovelistParser:
 
+    HEADER_LENGTH = 0x2e8
     MOVE_NODE_SIZE = SIZE_OF(MoveNodeStruct)
     EMPTY_CANCEL_STRINGS = ['b', '_B', '_R_D', 'y', 'Rv', '_R', '_D', 'Y']
+    MOVE_INPUT_CACHE_SIZE = 1024
     __logger = None
 
     def __init__(self, movelist_bytes, movelist_pointer):
@@ -56,8 +62,40 @@ class MovelistParser:
 
         self.parse_header()
 
+    @classmethod
+    def from_parsed_data(
+            cls, char_name, names_raw, move_nodes_raw, linked_nodes_raw,
+            can_move_be_done_from_neutral, move_id_to_input, cancel_graph
+    ):
+        """
+        Rebuilds a parser out of the data of a previously parsed movelist,
+        without the movelist bytes.
+        """
+        movelist_parser = cls.__new__(cls)
+        movelist_parser.bytes = None
+        movelist_parser.pointer = None
+        movelist_parser.char_name = char_name
+        movelist_parser.set_names(names_raw)
+        movelist_parser.move_nodes_raw = move_nodes_raw
+        movelist_parser.move_nodes = MoveNodeTable(
+            move_nodes_raw, movelist_parser.names
+        )
+        movelist_parser.linked_nodes_raw = linked_nodes_raw
+        movelist_parser.linked_nodes = []
+        movelist_parser.can_move_be_done_from_neutral = (
+            can_move_be_done_from_neutral
+        )
+        movelist_parser.move_id_to_input = move_id_to_input
+        movelist_parser.cancel_graph = cancel_graph
+        movelist_parser.__initialize_move_input_lookups()
+        return movelist_parser
+
+    def set_names(self, names_raw):
+        self.names_raw = names_raw
+        self.names = MoveNameTable(names_raw)
+
     def parse_header(self):
-        header_length = 0x2e8
+        header_length = MovelistParser.HEADER_LENGTH
         header_bytes = self.bytes[0:header_length]
         identifier = self.header_line(0)
         char_name_address = self.header_line(1)
@@ -77,27 +115,13 @@ class MovelistParser:
             #print(unknown_regions[i])
 
         #self.names = self.bytes[timestamp_address:unknown_regions[42]]
-        self.names_double = self.bytes[
-            header_length:unknown_regions[42]
-        ].split(b'\00')[4:]
-        self.names = []
-        for i in range(0, len(self.names_double) - 1, 2):
-            self.names.append(self.names_double[i].decode('utf-8'))
-            # + '/' + self.names_double[i+1].decode('utf-8'))
+        self.set_names(self.bytes[header_length:unknown_regions[42]])
 
         #there's two regions of move nodes, first one might be blocks????
-        move_nodes_raw = self.bytes[unknown_regions[54]:unknown_regions[58]]
-        self.move_nodes = [
-            MoveNodeWrapper(
-                move_nodes_raw[
-                    index:index + MovelistParser.MOVE_NODE_SIZE
-                ],
-                self.names
-            )
-            for index in range(
-                0, len(move_nodes_raw), MovelistParser.MOVE_NODE_SIZE
-            )
+        self.move_nodes_raw = self.bytes[
+            unknown_regions[54]:unknown_regions[58]
         ]
+        self.move_nodes = MoveNodeTable(self.move_nodes_raw, self.names)
         # self.__logger.debug('movelist nodes: %s', pformat(self.move_nodes))
 
         self.linked_nodes_raw = self.bytes[
@@ -132,21 +156,23 @@ class MovelistParser:
             #if node.unknown_buton_press == 4:
                 #print(node)
         self.can_move_be_done_from_neutral = {}
+        for move_id, cancel_window_1 in zip(
+                self.move_nodes.move_id, self.move_nodes.cancel_window_1
+        ):
+            if not self.can_move_be_done_from_neutral.get(move_id, False):
+                self.can_move_be_done_from_neutral[move_id] = (
+                    cancel_window_1 >= 0x7FFF
+                )
 
-        for node in self.move_nodes:
-            move_id = node.move_id
-            if not move_id in self.can_move_be_done_from_neutral:
-                self.can_move_be_done_from_neutral[move_id] = False
-            if node.cancel_window_1 >= 0x7FFF:
-                self.can_move_be_done_from_neutral[move_id] = True
+        self.cancel_graph = self.build_cancel_graph()
 
         self.democratically_chosen_input = {}
-        for node in self.move_nodes:
-            if not node.move_id in self.democratically_chosen_input:
-                self.democratically_chosen_input[node.move_id] = []
-            self.democratically_chosen_input[node.move_id].append(
-                (node.direction, node.button_input, node.button_state)
-            )
+        for move_id, node_input in zip(
+                self.move_nodes.move_id, self.move_nodes.get_inputs()
+        ):
+            if not move_id in self.democratically_chosen_input:
+                self.democratically_chosen_input[move_id] = []
+            self.democratically_chosen_input[move_id].append(node_input)
 
         sort_directions = defaultdict(lambda: 0, {})
         sort_attacks = defaultdict(lambda: 0, {})
@@ -169,37 +195,57 @@ class MovelistParser:
         sort_presses[MovelistButtonState.PRESS] = 100
         sort_presses[MovelistButtonState.NULL] = -2
 
+        # max returns the first candidate with the highest key, the same one
+        # a stable descending sort would put first. Repeated candidates count
+        # once
         self.move_id_to_input = {}
         for move_id, candidates in self.democratically_chosen_input.items():
-            candidates = list(OrderedDict.fromkeys(candidates))
+            candidates = dict.fromkeys(candidates)
 
-            directions = sorted(
+            directions = max(
                 candidates,
                 key=lambda candidate_tuple: (
                     sort_directions[candidate_tuple[0]],
                     sort_presses[candidate_tuple[2]]
-                ),
-                reverse=True
-            )[0]
-            inputs = sorted(
+                )
+            )
+            inputs = max(
                 candidates,
-                key=lambda candidate_tuple, values=candidates: (
+                key=lambda candidate_tuple: (
                     sort_presses[candidate_tuple[2]],
-                    Counter(values)[candidate_tuple],
                     sort_attacks[candidate_tuple[1]]
-                ),
-                reverse=True
-            )[0]
-            button_states = sorted(
+                )
+            )
+            button_states = max(
                 candidates,
-                key=lambda candidate_tuple: sort_presses[candidate_tuple[2]],
-                reverse=True
-            )[0]
+                key=lambda candidate_tuple: sort_presses[candidate_tuple[2]]
+            )
 
             self.move_id_to_input[move_id] = (
                 directions[0], inputs[1], button_states[2]
             )
         # self.logger.debug('move_id_to_input: %s', self.move_id_to_input)
+        self.__initialize_move_input_lookups()
+
+    def __initialize_move_input_lookups(self):
+        self.get_move_input = lru_cache(
+            maxsize=MovelistParser.MOVE_INPUT_CACHE_SIZE
+        )(self.__get_move_input)
+        self.__empty_cancels = None
+
+    def build_cancel_graph(self):
+        """
+        The moves region goes from the 66th to the 68th header line, the move
+        nodes of their cancel lists start at the 54th.
+        """
+        moves_start, moves_end = self.header_line(66), self.header_line(68)
+        if not 0 <= moves_start <= moves_end <= len(self.bytes):
+            moves_start = moves_end = 0
+        return CancelGraph.from_movelist(
+            self.bytes[moves_start:moves_end], self.move_nodes,
+            self.pointer + self.header_line(54),
+            self.can_move_be_done_from_neutral
+        )
 
     def header_line(self, line):
         line_bytes = self.bytes[line * 8:(line+1) * 8]
@@ -212,58 +258,62 @@ class MovelistParser:
 
     def input_for_move(self, move_id, previous_move_id):
         if move_id in self.move_id_to_input:
-            str_input = ''
-            last_move_was_empty_cancel = False
-
-            move_tuple = self.move_id_to_input[move_id]
-            if not move_tuple[0] in (MovelistInput.NULL, MovelistInput.NEUTRAL):
-                if(
-                        -1 < move_id < len(self.names)
-                        and '66' in self.names[move_id]
-                        and not '666' in self.names[move_id]
-                ):
-                # and (
-                # '66' in self.names[previous_move_id]
-                # or 'DASH' in self.names[previous_move_id]
-                # ):
-                    str_input += 'ff'
-                else:
-                    try:
-                        str_input += move_tuple[0].printable_name
-                    except AttributeError:
-                        str_input += str(move_tuple[0])
+            return (
+                self.get_move_input(move_id),
+                self.is_empty_cancel(move_id, previous_move_id)
+            )
+        return 'N/A', False
 
+    def is_empty_cancel(self, move_id, previous_move_id):
+        """
+        Whether the move previous_move_id is an empty cancel of move_id.
+        """
+        if self.__empty_cancels is None:
+            self.__empty_cancels = set()
+            for cancel_move_id, name in enumerate(self.names):
+                for empty_cancel_string in MovelistParser.EMPTY_CANCEL_STRINGS:
+                    if name.endswith(empty_cancel_string):
+                        self.__empty_cancels.update(
+                            (canceled_move_id, cancel_move_id)
+                            for canceled_move_id in self.names.get_move_ids(
+                                name[:-len(empty_cancel_string)]
+                            )
+                        )
+        return (move_id, previous_move_id) in self.__empty_cancels
+
+    def __get_move_input(self, move_id):
+        str_input = ''
+        move_tuple = self.move_id_to_input[move_id]
+        if not move_tuple[0] in (MovelistInput.NULL, MovelistInput.NEUTRAL):
             if(
-                    isinstance(move_tuple[2], MovelistButtonState)
-                    and MovelistButtonState.RELEASE.name in move_tuple[2].name
+                    -1 < move_id < len(self.names)
+                    and '66' in self.names[move_id]
+                    and not '666' in self.names[move_id]
             ):
-                str_input += '*'
-            #input += move_tuple[2]
-
-            if not move_tuple[1] in (MovelistButtonInput.NULL,):
+            # and (
+            # '66' in self.names[previous_move_id]
+            # or 'DASH' in self.names[previous_move_id]
+            # ):
+                str_input += 'ff'
+            else:
                 try:
-                    str_input += move_tuple[1].printable_name
+                    str_input += move_tuple[0].printable_name
                 except AttributeError:
-                    pass
-
-            if(
-                    -1 < previous_move_id < len(self.names)
-                    and -1 < move_id < len(self.names)
-            ):
-                if self.names[previous_move_id] in (
-                        [
-                            self.names[move_id] + s
-                            for s in MovelistParser.EMPTY_CANCEL_STRINGS
-                        ]
-                ):
-                    # print(
-                    # '{} : {}'.format(
-                    #     self.names[previous_move_id], self.names[move_id])
-                    # )
-                    last_move_was_empty_cancel = True
-
-            return str_input, last_move_was_empty_cancel
-        return 'N/A', False
+                    str_input += str(move_tuple[0])
+
+        if(
+                isinstance(move_tuple[2], MovelistButtonState)
+                and MovelistButtonState.RELEASE.name in move_tuple[2].name
+        ):
+            str_input += '*'
+        #input += move_tuple[2]
+
+        if not move_tuple[1] in (MovelistButtonInput.NULL,):
+            try:
+                str_input += move_tuple[1].printable_name
+            except AttributeError:
+                pass
+        return str_input
 
     def print_nodes(self, node_id):
         for node in self.move_nodes:
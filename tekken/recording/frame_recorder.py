@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2019, Alchemy Meister
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met =
+#
+#     * Redistributions of source code must retain the above copyright notice,
+#       this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice,this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its
+#       contributors may be used to endorse or promote products derived from
+#       this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Append-only recording of the player data frames read during battle.
+
+A recording file starts with a header and is followed by independent chunks.
+Every chunk holds a run of frames, each one stored as the XOR against the
+previous frame of the chunk, compressed as a whole. The first frame of a chunk
+is XORed against nothing, so any chunk can be decoded on its own.
+"""
+from collections import deque, namedtuple
+import lzma
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+
+from config.config_reader import ConfigReader
+from log import LogUtils
+
+FrameRecord = namedtuple(
+    'FrameRecord',
+    ['frame_count', 'timer_in_frames', 'movelist_identity', 'frame_bytes']
+)
+
+class FrameRecorder:
+    """
+    Compresses and writes the recorded frames on a background thread, record
+    only queues the frame. A frame that finds the queue full is dropped, and
+    nothing is queued any more once the writer has stopped on an error.
+    """
+    DEFAULT_DIRECTORY = os.path.join(ConfigReader.DATA_FOLDER, 'recordings')
+    FILE_EXTENSION = '.tbfr'
+    MAGIC = b'TBFR'
+    VERSION = 1
+    COMPRESSIONS = {
+        'zlib': (1, zlib.compress, zlib.decompress),
+        'lzma': (2, lzma.compress, lzma.decompress),
+    }
+    # magic, version, compression id
+    FILE_HEADER = struct.Struct('<4sHH')
+    CHUNK_MAGIC = b'TBFC'
+    # magic, records, first frame count, raw and compressed lengths
+    CHUNK_HEADER = struct.Struct('<4sIQII')
+    # frame count, timer, frame length, movelist identity length
+    RECORD_HEADER = struct.Struct('<QIIH')
+    SAME_MOVELIST_IDENTITY = 0xFFFF
+    MOVELIST_IDENTITY_SEPARATOR = '\0'
+    DEFAULT_CHUNK_FRAMES = 240
+    # a player data frame is about 120 KB
+    MAX_QUEUED_FRAMES = 2 * DEFAULT_CHUNK_FRAMES
+    RECENT_FRAME_COUNTS = 16
+
+    __logger = None
+
+    def __init__(
+            self, file_path=None, compression='zlib',
+            chunk_frames=DEFAULT_CHUNK_FRAMES,
+            max_queued_frames=MAX_QUEUED_FRAMES
+    ):
+        if compression not in FrameRecorder.COMPRESSIONS:
+            raise ValueError('unknown compression {}'.format(compression))
+        if FrameRecorder.__logger is None:
+            FrameRecorder.__logger = LogUtils.initialize_module_logger(
+                __name__
+            )
+        self.file_path = file_path or os.path.join(
+            FrameRecorder.DEFAULT_DIRECTORY,
+            time.strftime('frames_%Y%m%d_%H%M%S')
+            + FrameRecorder.FILE_EXTENSION
+        )
+        self.compression = compression
+        self.chunk_frames = chunk_frames
+        self.recorded_frames = 0
+        self.dropped_frames = 0
+        self.written_bytes = 0
+
+        self.__recent_frame_counts = deque(
+            maxlen=FrameRecorder.RECENT_FRAME_COUNTS
+        )
+        self.__queue = queue.Queue(max_queued_frames)
+        self.__writer = threading.Thread(
+            target=self.__write_chunks, name='frame recorder', daemon=True
+        )
+        self.__writer.start()
+
+    def record(
+            self, frame_bytes, frame_count, timer_in_frames,
+            movelist_identity=()
+    ):
+        """
+        Queues a frame, frames already recorded recently are skipped.
+        """
+        if(
+                frame_count in self.__recent_frame_counts
+                or not self.__writer.is_alive()
+        ):
+            return
+        self.__recent_frame_counts.append(frame_count)
+        try:
+            self.__queue.put_nowait(
+                FrameRecord(
+                    frame_count, timer_in_frames, tuple(movelist_identity),
+                    bytes(frame_bytes)
+                )
+            )
+            self.recorded_frames += 1
+        except queue.Full:
+            self.dropped_frames += 1
+
+    def is_alive(self):
+        return self.__writer.is_alive()
+
+    def stop(self):
+        """
+        Writes the pending frames and waits for the writer to finish.
+        """
+        while self.__writer.is_alive():
+            try:
+                self.__queue.put(None, timeout=0.1)
+                break
+            except queue.Full:
+                pass
+        self.__writer.join()
+        if self.dropped_frames:
+            self.__logger.warning(
+                '%d frames dropped from frame recording %s',
+                self.dropped_frames, self.file_path
+            )
+
+    def __write_chunks(self):
+        compression_id, compress, _ = (
+            FrameRecorder.COMPRESSIONS[self.compression]
+        )
+        try:
+            os.makedirs(
+                os.path.dirname(self.file_path) or os.curdir, exist_ok=True
+            )
+            with open(self.file_path, 'ab') as recording_file:
+                if not recording_file.tell():
+                    recording_file.write(
+                        FrameRecorder.FILE_HEADER.pack(
+                            FrameRecorder.MAGIC, FrameRecorder.VERSION,
+                            compression_id
+                        )
+                    )
+                running = True
+                while running:
+                    records = [self.__queue.get()]
+                    while records[-1] is not None and (
+                            len(records) < self.chunk_frames
+                    ):
+                        records.append(self.__queue.get())
+                    if records[-1] is None:
+                        running = False
+                        records.pop()
+                    if records:
+                        self.written_bytes += recording_file.write(
+                            FrameRecorder.__encode_chunk(records, compress)
+                        )
+                        recording_file.flush()
+        except OSError:
+            self.__logger.exception(
+                'Unable to write frame recording %s', self.file_path
+            )
+
+    @staticmethod
+    def __encode_chunk(records, compress):
+        raw_chunk = bytearray()
+        previous_frame = 0
+        previous_length = None
+        previous_identity = None
+        for record in records:
+            identity = FrameRecorder.MOVELIST_IDENTITY_SEPARATOR.join(
+                record.movelist_identity
+            ).encode('utf-8')
+            frame = int.from_bytes(record.frame_bytes, 'little')
+            if len(record.frame_bytes) != previous_length:
+                previous_frame = 0
+                previous_length = len(record.frame_bytes)
+            raw_chunk += FrameRecorder.RECORD_HEADER.pack(
+                record.frame_count, record.timer_in_frames,
+                len(record.frame_bytes),
+                FrameRecorder.SAME_MOVELIST_IDENTITY
+                if identity == previous_identity else len(identity)
+            )
+            if identity != previous_identity:
+                raw_chunk += identity
+                previous_identity = identity
+            raw_chunk += (frame ^ previous_frame).to_bytes(
+                len(record.frame_bytes), 'little'
+            )
+            previous_frame = frame
+        compressed_chunk = compress(bytes(raw_chunk))
+        return FrameRecorder.CHUNK_HEADER.pack(
+            FrameRecorder.CHUNK_MAGIC, len(records), records[0].frame_count,
+            len(raw_chunk), len(compressed_chunk)
+        ) + compressed_chunk
+
+class FrameRecording:
+    """
+    Reads back a file written by FrameRecorder.
+    """
+    def __init__(self, file_path):
+        self.file_path = file_path
+        with open(file_path, 'rb') as recording_file:
+            magic, version, compression_id = (
+                FrameRecorder.FILE_HEADER.unpack(
+                    recording_file.read(FrameRecorder.FILE_HEADER.size)
+                )
+            )
+        if magic != FrameRecorder.MAGIC or version != FrameRecorder.VERSION:
+            raise ValueError('{} is not a frame recording'.format(file_path))
+        self.__decompress = next(
+            decompress
+            for identifier, _, decompress
+            in FrameRecorder.COMPRESSIONS.values()
+            if identifier == compression_id
+        )
+
+    def get_chunks(self):
+        """
+        File offset, record count and first frame count of every chunk, read
+        from the chunk headers only.
+        """
+        chunks = []
+        with open(self.file_path, 'rb') as recording_file:
+            offset = FrameRecorder.FILE_HEADER.size
+            recording_file.seek(offset)
+            header = recording_file.read(FrameRecorder.CHUNK_HEADER.size)
+            while len(header) == FrameRecorder.CHUNK_HEADER.size:
+                magic, record_count, first_frame_count, _, compressed_length = (
+                    FrameRecorder.CHUNK_HEADER.unpack(header)
+                )
+                if magic != FrameRecorder.CHUNK_MAGIC:
+                    raise ValueError('corrupted chunk at {}'.format(offset))
+                chunks.append((offset, record_count, first_frame_count))
+                offset += FrameRecorder.CHUNK_HEADER.size + compressed_length
+                recording_file.seek(offset)
+                header = recording_file.read(FrameRecorder.CHUNK_HEADER.size)
+        return chunks
+
+    def read_chunk(self, offset):
+        """
+        Every FrameRecord of the chunk at the given file offset.
+        """
+        with open(self.file_path, 'rb') as recording_file:
+            recording_file.seek(offset)
+            magic, _, _, raw_length, compressed_length = (
+                FrameRecorder.CHUNK_HEADER.unpack(
+                    recording_file.read(FrameRecorder.CHUNK_HEADER.size)
+                )
+            )
+            if magic != FrameRecorder.CHUNK_MAGIC:
+                raise ValueError('corrupted chunk at {}'.format(offset))
+            raw_chunk = memoryview(
+                self.__decompress(recording_file.read(compressed_length))
+            )
+        if len(raw_chunk) != raw_length:
+            raise ValueError('truncated chunk at {}'.format(offset))
+
+        records = []
+        position = 0
+        previous_frame = 0
+        previous_length = None
+        movelist_identity = ()
+        while position < raw_length:
+            frame_count, timer_in_frames, frame_length, identity_length = (
+                FrameRecorder.RECORD_HEADER.unpack_from(raw_chunk, position)
+            )
+            position += FrameRecorder.RECORD_HEADER.size
+            if identity_length != FrameRecorder.SAME_MOVELIST_IDENTITY:
+                identity = bytes(
+                    raw_chunk[position:position + identity_length]
+                ).decode('utf-8')
+                movelist_identity = tuple(
+                    identity.split(FrameRecorder.MOVELIST_IDENTITY_SEPARATOR)
+                ) if identity else ()
+                position += identity_length
+            if frame_length != previous_length:
+                previous_frame = 0
+                previous_length = frame_length
+            frame = int.from_bytes(
+                raw_chunk[position:position + frame_length], 'little'
+            ) ^ previous_frame
+            position += frame_length
+            previous_frame = frame
+            records.append(
+                FrameRecord(
+                    frame_count, timer_in_frames, movelist_identity,
+                    frame.to_bytes(frame_length, 'little')
+                )
+            )
+        return records
+
+    def __iter__(self):
+        for offset, _, _ in self.get_chunks():
+            yield from self.read_chunk(offset)
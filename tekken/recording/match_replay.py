@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2019, Alchemy Meister
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met =
+#
+#     * Redistributions of source code must retain the above copyright notice,
+#       this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice,this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its
+#       contributors may be used to endorse or promote products derived from
+#       this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Replay container for the notation written by MatchRecorder.
+
+A replay is a text file. A header line holds the characters, the players, the
+date and the number of rounds. Every round is then two notation lines, player
+one first, each one readable by NotationParser.ParseMoveList. A footer holds
+the offset of every round, and a fixed length trailer holds the offset of the
+footer, so any round is read without reading the ones before it.
+
+    #TBR 1|0003|ALISA|KING|p1 player|p2 player|2017-07-20T22:15:36
+    <round 1 player one notation>
+    <round 1 player two notation>
+    ...
+    #INDEX 61 1022 2377
+    #END 0000000000003604
+"""
+from collections import namedtuple
+import json
+import os
+import time
+
+ReplayHeader = namedtuple(
+    'ReplayHeader',
+    ['p1_char', 'p2_char', 'p1_player', 'p2_player', 'date', 'rounds']
+)
+
+class MatchReplay:
+    """
+    Reads a replay, only its header and footer are read when it is opened.
+    Replays written before the container are read as a single round without
+    a header.
+    """
+    FILE_EXTENSION = '.tbr'
+    ENCODING = 'utf-8'
+    HEADER_PREFIX = '#TBR 1|'
+    ROUNDS_FORMAT = '{:04d}'
+    MAX_ROUNDS = 9999
+    FIELD_SEPARATOR = '|'
+    INDEX_PREFIX = '#INDEX'
+    TRAILER_FORMAT = '#END {:016d}\n'
+    TRAILER_LENGTH = len(TRAILER_FORMAT.format(0))
+    DATE_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        with open(file_path, 'rb') as replay_file:
+            header_line = replay_file.readline()
+            if header_line.startswith(
+                    MatchReplay.HEADER_PREFIX.encode(MatchReplay.ENCODING)
+            ):
+                self.header = MatchReplay.decode_header(header_line)
+                self.round_offsets = (
+                    MatchReplay.__read_index(replay_file, len(header_line))
+                    or MatchReplay.__scan_rounds(
+                        replay_file, len(header_line)
+                    )
+                )
+                self.header = self.header._replace(
+                    rounds=len(self.round_offsets)
+                )
+            else:
+                self.header = None
+                self.round_offsets = [0]
+
+    def __len__(self):
+        return len(self.round_offsets)
+
+    def read_round(self, round_index):
+        """
+        Player one and player two notation of the round.
+        """
+        with open(self.file_path, 'rb') as replay_file:
+            replay_file.seek(self.round_offsets[round_index])
+            return tuple(
+                replay_file.readline().decode(MatchReplay.ENCODING).strip()
+                for _ in range(2)
+            )
+
+    @staticmethod
+    def encode_header(header):
+        fields = [MatchReplay.ROUNDS_FORMAT.format(header.rounds)] + [
+            ' '.join(
+                str(field).replace(MatchReplay.FIELD_SEPARATOR, ' ').split()
+            )
+            for field in header[:-1]
+        ]
+        return (
+            MatchReplay.HEADER_PREFIX
+            + MatchReplay.FIELD_SEPARATOR.join(fields) + '\n'
+        ).encode(MatchReplay.ENCODING)
+
+    @staticmethod
+    def decode_header(header_line):
+        fields = header_line.decode(MatchReplay.ENCODING)[
+            len(MatchReplay.HEADER_PREFIX):
+        ].rstrip('\n').split(MatchReplay.FIELD_SEPARATOR)
+        if len(fields) != len(ReplayHeader._fields):
+            raise ValueError('corrupted replay header')
+        return ReplayHeader(*fields[1:], rounds=int(fields[0]))
+
+    @staticmethod
+    def __read_index(replay_file, header_length):
+        replay_file.seek(0, os.SEEK_END)
+        file_size = replay_file.tell()
+        if file_size < header_length + MatchReplay.TRAILER_LENGTH:
+            return None
+        replay_file.seek(file_size - MatchReplay.TRAILER_LENGTH)
+        trailer = replay_file.read().decode(MatchReplay.ENCODING)
+        try:
+            index_offset = int(trailer.split()[1])
+        except (IndexError, ValueError):
+            return None
+        if not trailer.startswith('#END ') or index_offset >= file_size:
+            return None
+        replay_file.seek(index_offset)
+        index = replay_file.readline().decode(MatchReplay.ENCODING).split()
+        if not index or index[0] != MatchReplay.INDEX_PREFIX:
+            return None
+        return [int(offset) for offset in index[1:]]
+
+    @staticmethod
+    def __scan_rounds(replay_file, header_length):
+        """
+        Offsets of the complete rounds of a replay that was never closed.
+        """
+        round_offsets = []
+        replay_file.seek(header_length)
+        while True:
+            offset = replay_file.tell()
+            p1_line = replay_file.readline()
+            if not p1_line or p1_line.startswith(b'#'):
+                break
+            if not replay_file.readline().endswith(b'\n'):
+                break
+            round_offsets.append(offset)
+        return round_offsets
+
+class MatchReplayWriter:
+    """
+    Appends rounds to a new replay as they end. The footer is written and the
+    replay is added to the catalog on close.
+    """
+    COPY_SIZE = 64 * 1024
+
+    def __init__(
+            self, file_path, p1_char, p2_char, p1_player='UNKNOWN',
+            p2_player='UNKNOWN', date=None, catalog=None
+    ):
+        self.file_path = file_path
+        self.header = ReplayHeader(
+            p1_char, p2_char, p1_player, p2_player,
+            date or time.strftime(MatchReplay.DATE_FORMAT), 0
+        )
+        self.catalog = catalog
+        self.round_offsets = []
+
+        os.makedirs(os.path.dirname(file_path) or os.curdir, exist_ok=True)
+        self.__file = open(file_path, 'wb')
+        self.__file.write(MatchReplay.encode_header(self.header))
+
+    def write_round(self, p1_notation, p2_notation):
+        """
+        Notations are strings, or text files read from their position.
+        """
+        if len(self.round_offsets) == MatchReplay.MAX_ROUNDS:
+            raise ValueError('too many rounds in {}'.format(self.file_path))
+        self.round_offsets.append(self.__file.tell())
+        for notation in (p1_notation, p2_notation):
+            if isinstance(notation, str):
+                self.__file.write(notation.encode(MatchReplay.ENCODING))
+            else:
+                for text in iter(
+                        lambda: notation.read(MatchReplayWriter.COPY_SIZE), ''
+                ):
+                    self.__file.write(text.encode(MatchReplay.ENCODING))
+            self.__file.write(b'\n')
+        self.__file.flush()
+
+    def close(self):
+        if self.__file.closed:
+            return
+        self.header = self.header._replace(rounds=len(self.round_offsets))
+        index_offset = self.__file.tell()
+        self.__file.write(
+            (
+                ' '.join(
+                    [MatchReplay.INDEX_PREFIX]
+                    + [str(offset) for offset in self.round_offsets]
+                ) + '\n'
+                + MatchReplay.TRAILER_FORMAT.format(index_offset)
+            ).encode(MatchReplay.ENCODING)
+        )
+        self.__file.seek(len(MatchReplay.HEADER_PREFIX))
+        self.__file.write(
+            MatchReplay.ROUNDS_FORMAT.format(self.header.rounds).encode(
+                MatchReplay.ENCODING
+            )
+        )
+        self.__file.close()
+        if self.catalog is not None:
+            self.catalog.add(self.file_path, self.header)
+
+class ReplayCatalog:
+    """
+    Headers of every replay of a directory, kept in one file so replays are
+    queried without opening them. Writers append to it, refresh catches up
+    with replays added, changed or removed by other means.
+    """
+    FILE_NAME = 'catalog.jsonl'
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.file_path = os.path.join(directory, ReplayCatalog.FILE_NAME)
+        self.__entries = None
+
+    def add(self, file_path, header):
+        entry = ReplayCatalog.__get_entry(file_path, header)
+        if self.__entries is not None:
+            self.__entries[entry['file']] = entry
+        with open(
+                self.file_path, 'a', encoding=MatchReplay.ENCODING
+        ) as catalog_file:
+            catalog_file.write(json.dumps(entry) + '\n')
+
+    def refresh(self):
+        """
+        Reads the header of every replay missing from the catalog or modified
+        since it was cataloged, and drops the replays that no longer exist.
+        """
+        entries = self.__load()
+        changed = False
+        file_names = {
+            file_name for file_name in os.listdir(self.directory)
+            if file_name.endswith(MatchReplay.FILE_EXTENSION)
+        }
+        for file_name in set(entries) - file_names:
+            del entries[file_name]
+            changed = True
+        for file_name in file_names:
+            file_path = os.path.join(self.directory, file_name)
+            status = os.stat(file_path)
+            entry = entries.get(file_name)
+            if entry is not None and (
+                    entry['mtime'] == status.st_mtime
+                    and entry['size'] == status.st_size
+            ):
+                continue
+            try:
+                header = MatchReplay(file_path).header
+            except (OSError, ValueError):
+                continue
+            if header is not None:
+                entries[file_name] = ReplayCatalog.__get_entry(
+                    file_path, header
+                )
+                changed = True
+        if changed:
+            temporary_path = self.file_path + '.tmp'
+            with open(
+                    temporary_path, 'w', encoding=MatchReplay.ENCODING
+            ) as catalog_file:
+                for entry in entries.values():
+                    catalog_file.write(json.dumps(entry) + '\n')
+            os.replace(temporary_path, self.file_path)
+
+    def find(
+            self, p1_char=None, p2_char=None, player=None, since=None,
+            until=None, either_side=True
+    ):
+        """
+        File path and header of the cataloged replays that match every given
+        criterion, oldest first. Dates are compared as DATE_FORMAT strings.
+        With either_side, the characters match in both orders.
+        """
+        sides = [(p1_char, p2_char)]
+        if either_side:
+            sides.append((p2_char, p1_char))
+        replays = []
+        for entry in self.__load().values():
+            header = ReplayHeader(
+                *(entry[field] for field in ReplayHeader._fields)
+            )
+            if not any(
+                    first in (None, header.p1_char)
+                    and second in (None, header.p2_char)
+                    for first, second in sides
+            ):
+                continue
+            if player is not None and player not in (
+                    header.p1_player, header.p2_player
+            ):
+                continue
+            if since is not None and header.date < since:
+                continue
+            if until is not None and header.date > until:
+                continue
+            replays.append(
+                (os.path.join(self.directory, entry['file']), header)
+            )
+        replays.sort(key=lambda replay: replay[1].date)
+        return replays
+
+    def __load(self):
+        if self.__entries is None:
+            self.__entries = {}
+            try:
+                with open(
+                        self.file_path, encoding=MatchReplay.ENCODING
+                ) as catalog_file:
+                    for line in catalog_file:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            continue
+                        self.__entries[entry['file']] = entry
+            except FileNotFoundError:
+                pass
+        return self.__entries
+
+    @staticmethod
+    def __get_entry(file_path, header):
+        status = os.stat(file_path)
+        entry = {
+            'file': os.path.basename(file_path),
+            'mtime': status.st_mtime,
+            'size': status.st_size,
+        }
+        entry.update(header._asdict())
+        return entry
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2019, Alchemy Meister
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     * Redistributions of source code must retain the above copyright notice,
+#       this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice,this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its
+#       contributors may be used to endorse or promote products derived from
+#       this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Replays a frame recording through the same path as the live run, decoding the
+recorded player data frames instead of reading them from the game process.
+
+TekkenGameState.update, the analyzer pipeline and everything below them run
+unchanged, there is no sleep between frames and
+no Win32 call, so the replay runs as fast as the CPU allows.
+"""
+from collections import OrderedDict, defaultdict, namedtuple
+import itertools
+import time
+
+from config.reloadable_config_manager import ReloadableConfigManager
+from constants.event import MovelistEvent
+
+from .analyzers import (
+    AnalyzerPipeline, EncyclopediaAnalyzer, ThrowBreakAnalyzer
+)
+from .encyclopedia import TekkenEncyclopedia
+from .game_reader import TekkenGameReader
+from .game_snapshot import GameSnapshot
+from .game_state import TekkenGameState
+from .parsers import MovelistCache
+from .recording import FrameRecording
+
+ReplayReport = namedtuple(
+    'ReplayReport', ['frames', 'seconds', 'stage_seconds', 'analyzer_seconds']
+)
+
+class ReplayIOManager:
+    """
+    Stands in for ProcessIOManager. Every update serves the next recorded
+    frame, decoded by TekkenGameReader.initialize_bots as in the live run.
+
+    The opponent name and the player side are read from pointer trails that
+    are not recorded, they stay None.
+    """
+    MEMORY_CONFIG = 'memory_address.ini'
+    # the game keeps 8 rollback copies of the player data
+    ROLLBACK_FRAMES = 8
+
+    def __init__(self, memory_config=None, movelist_cache=None):
+        if memory_config is None:
+            memory_config = ReplayIOManager.get_memory_config()
+        self.memory_config = memory_config
+        self.movelist_cache = movelist_cache or MovelistCache()
+        self.process_reader = None
+        self.process_writer = None
+        self.frame_count = None
+        self.decoded_frames = 0
+        self.decode_time = 0
+        self.__movelist_parsers = {}
+        self.__records = iter(())
+        self.__next_record = None
+        self.reset()
+
+    @staticmethod
+    def get_memory_config():
+        config_manager = ReloadableConfigManager()
+        return (
+            config_manager.get_config(ReplayIOManager.MEMORY_CONFIG)
+            or config_manager.add_config(
+                ReplayIOManager.MEMORY_CONFIG, parse=True
+            )
+        )
+
+    def reset(self, records=()):
+        """
+        Starts over with a new reader, served the given records.
+        """
+        self.process_reader = TekkenGameReader(self.memory_config, -1)
+        self.process_reader.reacquire_game_state = False
+        self.frame_count = None
+        self.set_records(records)
+
+    def set_records(self, records):
+        self.__records = iter(records)
+        self.__next_record = next(self.__records, None)
+
+    def has_records(self):
+        return self.__next_record is not None
+
+    def is_pid_valid(self):
+        return self.has_records()
+
+    def update(self, rollback_frame=0):
+        record = self.__take_record()
+        if record is None:
+            return defaultdict(lambda: None)
+        if(
+                self.frame_count is not None
+                and record.frame_count
+                < self.frame_count - ReplayIOManager.ROLLBACK_FRAMES
+        ):
+            # a new battle, the live reader went through the menus
+            self.process_reader.reacquire_names = True
+        self.frame_count = record.frame_count
+        return self.decode(record)
+
+    def read_update(self, rollback_frame=0):
+        """
+        The frames the game state finds lost were recorded right after the
+        frame that revealed the loss, they are served only when they precede
+        it. A lost frame that was never recorded is lost in the replay too.
+        """
+        record = self.__next_record
+        if(
+                record is None
+                or not (
+                    self.frame_count - ReplayIOManager.ROLLBACK_FRAMES
+                    <= record.frame_count < self.frame_count
+                )
+        ):
+            return defaultdict(lambda: None)
+        return self.decode(self.__take_record())
+
+    def decode(self, record):
+        """
+        Builds the game state of a FrameRecord the way
+        TekkenGameReader.get_updated_state does.
+        """
+        start = time.perf_counter()
+        reader = self.process_reader
+        if record.movelist_identity != reader.movelist_identity:
+            self.__set_movelists(record.movelist_identity)
+
+        p1_bot, p2_bot = reader.initialize_bots(record.frame_bytes)
+        if(
+                reader.reacquire_names
+                and p1_bot.is_character_name_loaded()
+                and p2_bot.is_character_name_loaded()
+        ):
+            reader.p1_movelist_to_use = p1_bot.get_movelist_to_use()
+            reader.p2_movelist_to_use = p2_bot.get_movelist_to_use()
+            reader.reacquire_names = False
+
+        game_state = {'battle': None, 'controllers': None, 'graphics': None}
+        game_state['battle'] = GameSnapshot(
+            p1_bot, p2_bot, record.frame_count, record.timer_in_frames,
+            reader.opponent_name,
+            reader.is_player_player_one,
+            reader.game_mode,
+        )
+        self.decoded_frames += 1
+        self.decode_time += time.perf_counter() - start
+        return game_state
+
+    def __take_record(self):
+        record = self.__next_record
+        if record is not None:
+            self.__next_record = next(self.__records, None)
+        return record
+
+    def __set_movelists(self, movelist_identity):
+        reader = self.process_reader
+        if movelist_identity:
+            p1_movelist_parser, p2_movelist_parser = (
+                self.__get_movelist_parser(identity)
+                for identity in movelist_identity
+            )
+        else:
+            p1_movelist_parser = p2_movelist_parser = None
+
+        reader.p1_movelist_parser = p1_movelist_parser
+        reader.p2_movelist_parser = p2_movelist_parser
+        reader.p1_movelist_names = (
+            p1_movelist_parser.names if p1_movelist_parser else None
+        )
+        reader.p2_movelist_names = (
+            p2_movelist_parser.names if p2_movelist_parser else None
+        )
+        reader.movelist_identity = movelist_identity
+        if p1_movelist_parser and p2_movelist_parser:
+            reader.movelist_publisher.dispatch(
+                MovelistEvent.LOADED, p1_movelist_parser, p2_movelist_parser
+            )
+
+    def __get_movelist_parser(self, movelist_identity):
+        """
+        Movelists are only taken from the movelist cache, a movelist missing
+        from it is replayed without a parser.
+        """
+        if movelist_identity not in self.__movelist_parsers:
+            self.__movelist_parsers[movelist_identity] = (
+                self.movelist_cache.load(
+                    *MovelistCache.split_movelist_identity(movelist_identity)
+                )
+            )
+        return self.__movelist_parsers[movelist_identity]
+
+class ReplayDriver:
+    """
+    Feeds a frame recording to a TekkenGameState and the analyzers Launcher
+    registers, as Launcher does with the live game. The pipeline never defers
+    to the background here, so a replay always gives the same results.
+    """
+    STAGES = ('decode', 'game state', 'analyzers')
+
+    def __init__(
+            self, file_path, print_extended_frame_data=False,
+            memory_config=None, movelist_cache=None
+    ):
+        self.recording = FrameRecording(file_path)
+        self.print_extended_frame_data = print_extended_frame_data
+        self.io_manager = ReplayIOManager(memory_config, movelist_cache)
+        self.game_state = None
+        self.cyclopedia_p1 = None
+        self.cyclopedia_p2 = None
+        self.throw_breaks_p1 = None
+        self.throw_breaks_p2 = None
+        self.analyzers = None
+
+        self.frames = 0
+        self.stage_seconds = OrderedDict.fromkeys(ReplayDriver.STAGES, 0)
+        self.analyzer_seconds = OrderedDict()
+        self.__chunks = self.recording.get_chunks()
+        self.rewind()
+
+    def rewind(self):
+        self.__reset(self.__read_records(0))
+
+    def seek(self, frame_count):
+        """
+        Moves the replay to the first recorded frame with the given frame count
+        or the first one after it. The frames of its chunk that precede it are
+        fed to the game state only, so the state log has history when the
+        encyclopedias resume.
+        """
+        chunk_index = self.__find_chunk(frame_count)
+        if chunk_index == len(self.__chunks):
+            self.__reset(())
+            return
+        records = self.recording.read_chunk(self.__chunks[chunk_index][0])
+        position = next(
+            (
+                index for index, record in enumerate(records)
+                if record.frame_count >= frame_count
+            ),
+            len(records)
+        )
+        self.__reset(records[:position])
+        while self.io_manager.has_records():
+            self.game_state.update()
+        self.io_manager.set_records(
+            itertools.chain(
+                records[position:], self.__read_records(chunk_index + 1)
+            )
+        )
+
+    def run(self, start_frame=None, end_frame=None):
+        """
+        Replays from start_frame, or from the current position, until the
+        first frame at or after end_frame, or until the end of the recording.
+        Returns the number of frames fed to the game state.
+        """
+        if start_frame is not None:
+            self.seek(start_frame)
+        io_manager = self.io_manager
+        stage_seconds = self.stage_seconds
+        decoded_frames = io_manager.decoded_frames
+        previous_seconds = self.analyzers.get_seconds()
+        while io_manager.has_records():
+            decode_time = io_manager.decode_time
+            start = time.perf_counter()
+            successful = self.game_state.update()
+            middle = time.perf_counter()
+            if successful:
+                self.analyzers.update(self.game_state)
+            end = time.perf_counter()
+
+            decode_time = io_manager.decode_time - decode_time
+            stage_seconds['decode'] += decode_time
+            stage_seconds['game state'] += middle - start - decode_time
+            stage_seconds['analyzers'] += end - middle
+            if end_frame is not None and io_manager.frame_count >= end_frame:
+                break
+        for name, seconds in self.analyzers.get_seconds().items():
+            self.analyzer_seconds[name] = (
+                self.analyzer_seconds.get(name, 0)
+                + seconds - previous_seconds[name]
+            )
+        frames = io_manager.decoded_frames - decoded_frames
+        self.frames += frames
+        return frames
+
+    def get_report(self):
+        """
+        Frames replayed and seconds spent by run, in total, per stage and per
+        analyzer.
+        """
+        return ReplayReport(
+            self.frames, sum(self.stage_seconds.values()),
+            OrderedDict(self.stage_seconds),
+            OrderedDict(self.analyzer_seconds)
+        )
+
+    def reset_report(self):
+        self.frames = 0
+        self.stage_seconds = OrderedDict.fromkeys(ReplayDriver.STAGES, 0)
+        self.analyzer_seconds = OrderedDict()
+
+    def __reset(self, records):
+        self.io_manager.reset(records)
+        self.game_state = TekkenGameState(self.io_manager)
+        self.cyclopedia_p1 = TekkenEncyclopedia(
+            True, print_extended_frame_data=self.print_extended_frame_data
+        )
+        self.cyclopedia_p2 = TekkenEncyclopedia(
+            False, print_extended_frame_data=self.print_extended_frame_data
+        )
+        self.throw_breaks_p1 = ThrowBreakAnalyzer(True)
+        self.throw_breaks_p2 = ThrowBreakAnalyzer(False)
+        self.analyzers = AnalyzerPipeline(background=False)
+        for cyclopedia in (self.cyclopedia_p1, self.cyclopedia_p2):
+            for analyzer in EncyclopediaAnalyzer.for_encyclopedia(cyclopedia):
+                self.analyzers.register(analyzer)
+        self.analyzers.register(self.throw_breaks_p1)
+        self.analyzers.register(self.throw_breaks_p2)
+
+    def __find_chunk(self, frame_count):
+        """
+        Index of the first chunk that may hold the frame count. Frame counts
+        restart on every battle, a chunk holds the frame count when it starts
+        at or before it and the next chunk either starts after it or restarts
+        the count.
+        """
+        for index, (_, _, first_frame_count) in enumerate(self.__chunks):
+            if first_frame_count > frame_count:
+                continue
+            if index + 1 == len(self.__chunks):
+                return index
+            next_first_frame_count = self.__chunks[index + 1][2]
+            if(
+                    next_first_frame_count > frame_count
+                    or next_first_frame_count < first_frame_count
+            ):
+                return index
+        return len(self.__chunks)
+
+    def __read_records(self, chunk_index):
+        for offset, _, _ in self.__chunks[chunk_index:]:
+            yield from self.recording.read_chunk(offset)
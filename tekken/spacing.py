@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2019, Alchemy Meister
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met =
+#
+#     * Redistributions of source code must retain the above copyright notice,
+#       this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice,this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its
+#       contributors may be used to endorse or promote products derived from
+#       this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Spacing analytics over the snapshots of a TekkenGameState state log.
+
+Every snapshot caches the root position and the skeleton center of both
+players when it is built, so these queries only touch the frames they need
+instead of averaging whole skeletons on every call.
+"""
+from operator import itemgetter
+import math
+
+APPROACH_VELOCITY_FRAMES = 10
+
+def get_distances(state_log, frames):
+    """
+    Distance between both players for each of the last frames, from the
+    oldest to the newest one.
+    """
+    return [state.distance for state in state_log[-frames:]]
+
+def get_opp_move_start_state(state_log):
+    """
+    Latest snapshot previous to the start of the move currently being done by
+    the opponent.
+    """
+    move_timer = state_log[-1].opp.move_timer
+    move_id = state_log[-1].opp.move_id
+    start_state = state_log[-1]
+    for state in reversed(state_log):
+        start_state = state
+        if move_timer < state.opp.move_timer or move_id != state.opp.move_id:
+            break
+        move_timer = state.opp.move_timer
+    return start_state
+
+def get_range_of_move(state_log):
+    """
+    Joint that travelled the farthest towards the bot since the opponent's
+    current move started and the distance it travelled.
+    """
+    start_state = get_opp_move_start_state(state_log)
+    direction_x, direction_z = __get_unit_vector(
+        start_state.opp.center, start_state.bot.center
+    )
+    starting_skeleton = start_state.opp.skeleton
+    ending_skeleton = state_log[-1].opp.skeleton
+    return max(
+        enumerate(
+            (end_x - start_x) * direction_x + (end_z - start_z) * direction_z
+            for start_x, end_x, start_z, end_z in zip(
+                starting_skeleton[0], ending_skeleton[0],
+                starting_skeleton[2], ending_skeleton[2]
+            )
+        ),
+        key=itemgetter(1)
+    )
+
+def get_whiff_distance(state_log):
+    """
+    Distance the opponent's current move fell short of the bot. Negative
+    values mean that the move reached further than the bot.
+    """
+    _, reach = get_range_of_move(state_log)
+    return get_opp_move_start_state(state_log).distance - reach
+
+def get_opp_approach_velocity(state_log, frames=APPROACH_VELOCITY_FRAMES):
+    """
+    Average distance per frame the opponent moved towards the bot during the
+    last frames.
+    """
+    window = state_log[-(frames + 1):]
+    if len(window) < 2:
+        return 0.0
+    first_state = window[0]
+    direction_x, direction_z = __get_unit_vector(
+        first_state.opp.position, first_state.bot.position
+    )
+    last_position = window[-1].opp.position
+    return (
+        (last_position[0] - first_state.opp.position[0]) * direction_x
+        + (last_position[1] - first_state.opp.position[1]) * direction_z
+    ) / (len(window) - 1)
+
+def __get_unit_vector(origin, target):
+    vector_x = target[0] - origin[0]
+    vector_z = target[1] - origin[1]
+    magnitude = math.hypot(vector_x, vector_z)
+    if not magnitude:
+        return (0.0, 0.0)
+    return (vector_x / magnitude, vector_z / magnitude)